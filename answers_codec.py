@@ -0,0 +1,80 @@
+# answers_codec.py
+# ============================================================
+# Kompakte Speicherung der Rohantworten
+# Eine Antwort = 1 Byte (uint8) an der Position der Frage in
+# questions.json; 255 = nicht beantwortet. 77 Fragen -> 77 Bytes
+# statt ~900 Bytes JSON. Die Fragenreihenfolge wird über die
+# Version aus questions.py (QuestionSet.version) festgehalten.
+# ============================================================
+
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from questions import get_question_set
+
+MISSING = 255
+
+
+def encode_answers(answers: Dict[str, Any], qids: Sequence[str]) -> bytes:
+    """
+    Antwort-Dict -> Bytes in Fragenreihenfolge.
+    Verlustfrei nur für ganze Zahlen 0..254; alles andere -> ValueError
+    (der Aufrufer speichert dann JSON).
+    """
+    pos = {qid: i for i, qid in enumerate(qids)}
+    buf = bytearray([MISSING]) * len(qids)
+    for qid, val in answers.items():
+        i = pos.get(qid)
+        if i is None:
+            continue
+        try:
+            f = float(val)
+        except (TypeError, ValueError):
+            # build_report_data wertet das als 0.0 (beantwortet)
+            f = 0.0
+        if not f.is_integer() or not 0 <= f < MISSING:
+            raise ValueError(f"Antwort {qid}={val!r} passt nicht in ein Byte.")
+        buf[i] = int(f)
+    return bytes(buf)
+
+
+def encode_for_storage(answers: Optional[Dict[str, Any]], qs=None) -> Tuple[Optional[bytes], Optional[str], Optional[Dict[str, Any]]]:
+    """
+    -> (answers_raw, answers_version, json_fallback)
+    Genau eines von answers_raw / json_fallback ist gesetzt (oder beide None).
+    `qs`: Fragensatz, gegen den kodiert wird (Standard: der aktuelle).
+    """
+    if answers is None:
+        return None, None, None
+    qs = qs or get_question_set()
+    qids = [q["id"] for q in qs.questions]
+    try:
+        return encode_answers(answers, qids), qs.version, None
+    except ValueError:
+        return None, None, answers
+
+
+def decode_answers(raw: bytes) -> np.ndarray:
+    """Zero-Copy: uint8-Sicht auf die Bytes (read-only)."""
+    return np.frombuffer(raw, dtype=np.uint8)
+
+
+def decode_to_dict(raw: bytes, qids: Sequence[str]) -> Dict[str, str]:
+    """Zurück in das Format, das /submit bekommt (Werte als Strings)."""
+    return {qid: str(v) for qid, v in zip(qids, bytes(raw)) if v != MISSING}
+
+
+def stack_answers(raws: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Viele Blobs derselben Version -> (Werte N x Q uint8, beantwortet N x Q bool).
+    Eine einzige Kopie (join), danach nur noch Sichten.
+    Fehlende Antworten stehen in `values` als 0.
+    """
+    if not raws:
+        return np.zeros((0, 0), dtype=np.uint8), np.zeros((0, 0), dtype=bool)
+    width = len(raws[0])
+    matrix = np.frombuffer(b"".join(raws), dtype=np.uint8).reshape(len(raws), width)
+    answered = matrix != MISSING
+    values = np.where(answered, matrix, 0).astype(np.uint8)
+    return values, answered
@@ -1,27 +1,61 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
 from pathlib import Path
-import json
 from uuid import uuid4
+import asyncio
+import hashlib
+import hmac
+import json
 import os
-import requests
+import time
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, Response
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from report_builder import build_report_data
-from pdf_report import build_pdf_report
-from db import init_db, save_report, load_report
+from questions import get_question_set, QUESTIONS_PATH
+from pdf_cache import cache_key, etag_for, etag_matches
+from pdf_worker import pdf_renderer, PDF_PRERENDER, PdfRenderTimeout
+from pdf_stream import pdf_response, gzip_etag
+from compression import CompressionMiddleware, COMPRESS
+from bulk_export import zip_export_async
+from static_assets import content_script, PrerenderedPage
+from db import (
+    init_db, save_report_async, load_report_async, find_report_ids,
+    open_async_pool, close_async_pool, pool_stats, report_cache_stats,
+    claim_submit_key_async, release_submit_key_async,
+    report_writer_stats, close_report_writer
+)
 from report_content import FUNCTION_NAMES, TYPE_MAP, MEANING_CARDS
+from brevo import BREVO_API_KEY, BrevoDispatcher, build_contact
+import metrics
+from metrics import stage, SUBMIT_DEDUP
 
 # ============================================================
 # ENV
 # ============================================================
-BREVO_API_KEY = os.getenv("BREVO_API_KEY")
-BREVO_LIST_ID = int(os.getenv("BREVO_LIST_ID", "3"))
 PUBLIC_BASE_URL = os.getenv(
     "PUBLIC_BASE_URL",
     "http://127.0.0.1:8000"
 ).rstrip("/")
 
+# Fragebogen (/) einmal vorrendern statt pro Besuch Jinja (0 = wie früher)
+HOME_STATIC = os.getenv("HOME_STATIC", "1") == "1"
+
+# Content für results.html als eigenes, lange cachebares Asset (0 = eingebettet wie früher)
+RESULTS_CONTENT_ASSET = os.getenv("RESULTS_CONTENT_ASSET", "1") == "1"
+
+# Idempotenz von /submit: gleicher Key (Header Idempotency-Key, sonst
+# Hash aus E-Mail + Antworten) innerhalb von SUBMIT_DEDUP_TTL Sekunden
+# -> report_id der ersten Anfrage, ohne erneut zu rechnen/speichern/senden.
+# 0 = aus. Läuft die erste Anfrage noch, wartet ein Duplikat höchstens
+# SUBMIT_DEDUP_WAIT_S, danach 409 + Retry-After.
+SUBMIT_DEDUP_TTL = float(os.getenv("SUBMIT_DEDUP_TTL", "600"))
+SUBMIT_DEDUP_WAIT_S = float(os.getenv("SUBMIT_DEDUP_WAIT_S", "10"))
+
+# Bulk-Export (/export): ohne Token ist der Endpoint abgeschaltet
+EXPORT_TOKEN = os.getenv("EXPORT_TOKEN", "")
+EXPORT_MAX_REPORTS = int(os.getenv("EXPORT_MAX_REPORTS", "5000"))
+
 # ============================================================
 # PATHS / APP
 # ============================================================
@@ -29,7 +63,27 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 TEMPLATES_DIR = BASE_DIR / "templates"
 
-app = FastAPI()
+brevo_dispatcher = BrevoDispatcher() if BREVO_API_KEY else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_async_pool()
+    await pdf_renderer.start()
+    if HOME_STATIC:
+        await asyncio.to_thread(HOME_PAGE.asset)
+    if brevo_dispatcher:
+        brevo_dispatcher.start()
+    yield
+    if brevo_dispatcher:
+        brevo_dispatcher.stop()
+    pdf_renderer.shutdown()
+    await asyncio.to_thread(close_report_writer)
+    await close_async_pool()
+
+app = FastAPI(lifespan=lifespan)
+if COMPRESS:
+    # HTML/JSON dynamisch; PDFs und statische Seiten bringen ihre Varianten mit
+    app.add_middleware(CompressionMiddleware)
 init_db()
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
@@ -43,19 +97,120 @@ FRONTEND_CONTENT = {
     "meaning_cards": MEANING_CARDS,
 }
 
+# einmal serialisiert, ausgeliefert unter /assets/content.{version}.js
+CONTENT_ASSET = content_script(FRONTEND_CONTENT)
+ASSETS = {CONTENT_ASSET.filename: CONTENT_ASSET}
+
+# Template einmal kompiliert; pro Request nur noch die Report-Daten
+RESULTS_TEMPLATE = templates.get_template("results.html")
+# Felder, die results.html aus dem Payload liest
+RESULT_PAGE_FIELDS = ("report_id", "name", "email", "profile_type", "ranked")
+
 # ============================================================
 # HELPERS
 # ============================================================
 def load_questions() -> List[Dict[str, Any]]:
-    path = DATA_DIR / "questions.json"
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return get_question_set().questions
+
+def submit_dedup_key(headers, email: str, answers: Dict[str, Any]) -> Optional[str]:
+    """
+    Idempotenz-Key für /submit: vom Client (Idempotency-Key) oder
+    Hash aus E-Mail + Antworten. Ohne beides None (keine Deduplizierung,
+    sonst würden sich anonyme Teilnehmer Reports teilen).
+    """
+    client_key = (headers.get("idempotency-key") or "").strip()
+    if client_key:
+        return "c:" + hashlib.sha256(client_key.encode("utf-8")).hexdigest()
+    if not email:
+        return None
+    canonical = json.dumps([email.lower(), answers], sort_keys=True,
+                           ensure_ascii=False, separators=(",", ":"))
+    return "h:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+async def claim_submission(key: str, report_id: str) -> Optional[str]:
+    """
+    None: diese Anfrage bearbeitet den Key. Sonst report_id der ersten
+    Anfrage, sobald deren Report gespeichert ist ("" = nach
+    SUBMIT_DEDUP_WAIT_S noch nicht fertig).
+    """
+    deadline = time.monotonic() + SUBMIT_DEDUP_WAIT_S
+    while True:
+        owner, saved = await claim_submit_key_async(key, report_id, SUBMIT_DEDUP_TTL)
+        if owner == report_id:
+            return None
+        if owner is not None and saved:
+            return owner
+        if time.monotonic() >= deadline:
+            return ""
+        await asyncio.sleep(0.05)
+
+# Fragebogen: für alle Besucher gleich -> einmal rendern und komprimieren,
+# neu bei Änderung von questions.json oder index.html
+HOME_PAGE = PrerenderedPage(
+    "index",
+    lambda: templates.get_template("index.html").render(questions=load_questions()),
+    [QUESTIONS_PATH, TEMPLATES_DIR / "index.html"],
+)
+
+def render_result_page(payload: Dict[str, Any]) -> str:
+    if not RESULTS_CONTENT_ASSET:
+        return RESULTS_TEMPLATE.render(data=payload, content=FRONTEND_CONTENT)
+    data = {k: payload[k] for k in RESULT_PAGE_FIELDS if k in payload}
+    return RESULTS_TEMPLATE.render(data=data, content_src=f"/assets/{CONTENT_ASSET.filename}")
+
+# ============================================================
+# METRIKEN (/metrics): vorhandene Statistiken beim Abruf einsammeln
+# ============================================================
+@metrics.register_collector
+def _pdf_metrics():
+    cache = pdf_renderer.cache.stats()
+    yield ("pdf_cache_lookups_total", "counter", "PDF-Cache-Abfragen nach Ergebnis",
+           [({"result": r}, cache[k]) for r, k in
+            (("memory", "hits_memory"), ("disk", "hits_disk"), ("miss", "misses"))])
+    yield ("pdf_cache_memory_bytes", "gauge",
+           "Belegte Bytes in Stufe 1 des PDF-Caches (geteiltes Backend: gesamt)",
+           [({}, cache["memory_bytes"])])
+    stats = pdf_renderer.stats()
+    yield ("pdf_renderer_queue_depth", "gauge", "Wartende Render-Jobs", [({}, stats["queue_depth"])])
+    yield ("pdf_renderer_running", "gauge", "Laufende Render-Jobs", [({}, stats["running"])])
+    yield ("pdf_renderer_events_total", "counter", "Render-Ereignisse",
+           [({"event": k}, stats[k]) for k in
+            ("renders", "render_timeouts", "render_errors", "joined_inflight",
+             "prerender_queued", "prerender_rejected")])
+
+@metrics.register_collector
+def _report_cache_metrics():
+    stats = report_cache_stats()
+    yield ("report_cache_lookups_total", "counter", "Report-Cache-Abfragen nach Ergebnis",
+           [({"result": r}, stats[k]) for r, k in
+            (("hit", "hits"), ("negative_hit", "negative_hits"), ("miss", "misses"))])
+    yield ("report_cache_entries", "gauge", "Einträge im Report-Cache", [({}, stats["entries"])])
+
+@metrics.register_collector
+def _report_writer_metrics():
+    stats = report_writer_stats()
+    yield ("report_writer_batches_total", "counter", "Group-Commits von save_report",
+           [({}, stats["batches"])])
+    yield ("report_writer_rows_total", "counter", "Reports, die per Group-Commit geschrieben wurden",
+           [({}, stats["rows"])])
+    yield ("report_writer_queued", "gauge", "Reports, die auf den nächsten Commit warten",
+           [({}, stats["queued"])])
+
+@metrics.register_collector
+def _pool_metrics():
+    stats = pool_stats()
+    yield ("db_pool_size", "gauge", "Offene Verbindungen",
+           [({"pool": p}, st.get("pool_size", 0)) for p, st in stats.items()])
+    yield ("db_pool_available", "gauge", "Freie Verbindungen",
+           [({"pool": p}, st.get("pool_available", 0)) for p, st in stats.items()])
 
 # ============================================================
 # ROUTES
 # ============================================================
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
+    if HOME_STATIC:
+        return HOME_PAGE.response(request.headers)
     questions = load_questions()
     return templates.TemplateResponse(
         "index.html",
@@ -64,29 +219,44 @@ async def home(request: Request):
 
 @app.get("/r/{report_id}", response_class=HTMLResponse)
 async def show_result(request: Request, report_id: str):
-    payload = load_report(report_id)
-    if not payload:
-        return HTMLResponse("Report nicht gefunden.", status_code=404)
-    return templates.TemplateResponse(
-        "results.html",
-        {
-            "request": request,
-            "data": payload,
-            "content": FRONTEND_CONTENT,
-        }
-    )
+    with stage("show_result", "total"):
+        with stage("show_result", "db_load"):
+            payload = await load_report_async(report_id)
+        if not payload:
+            return HTMLResponse("Report nicht gefunden.", status_code=404)
+        with stage("show_result", "template"):
+            return HTMLResponse(render_result_page(payload))
+
+@app.get("/assets/{filename}")
+async def asset(request: Request, filename: str):
+    found = ASSETS.get(filename)
+    if found is None:
+        return Response("Nicht gefunden.", status_code=404, media_type="text/plain")
+    return found.response(request.headers)
 
 @app.get("/health")
 async def health():
     try:
-        load_report("ping")
-        return JSONResponse({"ok": True, "db": "connected"})
+        await load_report_async("ping")
+        return JSONResponse({
+            "ok": True,
+            "db": "connected",
+            "pool": pool_stats(),
+            "report_cache": report_cache_stats(),
+            "report_writer": report_writer_stats(),
+            "pdf": pdf_renderer.stats(),
+        })
     except Exception as e:
         return JSONResponse({"ok": False, "error": str(e)}, status_code=500)
 
 @app.post("/submit")
 async def submit(request: Request):
-    payload = await request.json()
+    with stage("submit", "total"):
+        return await _submit(request)
+
+async def _submit(request: Request):
+    with stage("submit", "parse"):
+        payload = await request.json()
     name = (payload.get("name") or "").strip()
     email = (payload.get("email") or "").strip()
     answers = payload.get("answers") or {}
@@ -97,13 +267,53 @@ async def submit(request: Request):
             status_code=400
         )
 
-    # ================== REPORT BERECHNEN ==================
-    result = build_report_data(answers)
     report_id = str(uuid4())
+
+    # ================== IDEMPOTENZ ==================
+    dedup_key = submit_dedup_key(request.headers, email, answers) if SUBMIT_DEDUP_TTL > 0 else None
+    if dedup_key:
+        with stage("submit", "dedup"):
+            original = await claim_submission(dedup_key, report_id)
+        if original == "":
+            SUBMIT_DEDUP.labels("in_progress").inc()
+            return JSONResponse(
+                {"ok": False, "error": "Anfrage wird noch verarbeitet, bitte erneut versuchen."},
+                status_code=409,
+                headers={"Retry-After": "1"}
+            )
+        if original:
+            SUBMIT_DEDUP.labels("duplicate").inc()
+            return JSONResponse({
+                "ok": True,
+                "report_id": original,
+                "result_url": f"{PUBLIC_BASE_URL}/r/{original}"
+            })
+        SUBMIT_DEDUP.labels("new").inc()
+    try:
+        return await _process_submission(report_id, name, email, answers)
+    except BaseException:
+        # Key freigeben, damit ein Retry neu anfangen kann
+        if dedup_key:
+            await asyncio.shield(release_submit_key_async(dedup_key, report_id))
+        raise
+
+async def _process_submission(report_id: str, name: str, email: str, answers: Dict[str, Any]):
+    # ================== REPORT BERECHNEN ==================
+    with stage("submit", "scoring"):
+        result = build_report_data(answers)
     result_url = f"{PUBLIC_BASE_URL}/r/{report_id}"
 
+    # ================== BREVO KONTAKT (Outbox) ==================
+    # Wird in derselben Transaktion wie der Report gespeichert und
+    # vom BrevoDispatcher im Hintergrund zugestellt.
+    contact = None
+    if BREVO_API_KEY and email:
+        contact = build_contact(email, result_url, result.profile_type, report_id)
+    else:
+        print("BREVO nicht ausgeführt (API-Key oder E-Mail fehlt)")
+
     # ================== REPORT SPEICHERN ==================
-    save_report(report_id, {
+    report = {
         "report_id": report_id,
         "result_url": result_url,
         "name": name,
@@ -113,34 +323,18 @@ async def submit(request: Request):
         "percents": result.percents,
         "sums": result.sums,
         "avgs": result.avgs,
-    })
+    }
+    q_to_fid = get_question_set().q_to_fid
+    raw_answers = {qid: val for qid, val in answers.items() if qid in q_to_fid}
+    with stage("submit", "db_save"):
+        await save_report_async(report_id, report, contact=contact, answers=raw_answers)
+    if contact and brevo_dispatcher:
+        brevo_dispatcher.wake()
 
-    # ================== BREVO KONTAKT ==================
-    if BREVO_API_KEY and email:
-        brevo_url = "https://api.brevo.com/v3/contacts"
-        headers = {
-            "accept": "application/json",
-            "api-key": BREVO_API_KEY,
-            "content-type": "application/json",
-        }
-        brevo_payload = {
-            "email": email,
-            "attributes": {
-                "RESULT_URL": result_url,
-                "PROFILE_TYPE": result.profile_type,
-                "REPORT_ID": report_id
-            },
-            "listIds": [BREVO_LIST_ID],
-            "updateEnabled": True
-        }
-        try:
-            r = requests.post(brevo_url, json=brevo_payload, headers=headers, timeout=10)
-            print("BREVO status:", r.status_code)
-            print("BREVO response:", r.text)
-        except Exception as e:
-            print("BREVO exception:", repr(e))
-    else:
-        print("BREVO nicht ausgeführt (API-Key oder E-Mail fehlt)")
+    # ================== PDF VORAB RENDERN (optional) ==================
+    if PDF_PRERENDER:
+        with stage("submit", "prerender"):
+            pdf_renderer.prerender(cache_key(report), report)
 
     # ================== RESPONSE ==================
     return JSONResponse({
@@ -150,18 +344,80 @@ async def submit(request: Request):
     })
 
 @app.get("/report/{report_id}.pdf")
-async def report_pdf(report_id: str):
-    payload = load_report(report_id)
+async def report_pdf(request: Request, report_id: str):
+    with stage("report_pdf", "total"):
+        return await _report_pdf(request, report_id)
+
+async def _report_pdf(request: Request, report_id: str):
+    with stage("report_pdf", "db_load"):
+        payload = await load_report_async(report_id)
     if not payload:
         return JSONResponse(
             {"ok": False, "error": "Report nicht gefunden"},
             status_code=404
         )
-    pdf_bytes = build_pdf_report(payload)
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": 'attachment; filename="Performance-Profil-Report.pdf"'
-        }
+    key = cache_key(payload)
+    headers = {
+        "ETag": etag_for(key),
+        "Cache-Control": "private, no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, headers["ETag"]) or etag_matches(if_none_match, gzip_etag(headers["ETag"])):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = 'attachment; filename="Performance-Profil-Report.pdf"'
+    for attempt in range(2):
+        try:
+            with stage("report_pdf", "pdf"):
+                source = await pdf_renderer.fetch(key, payload)
+        except PdfRenderTimeout:
+            return JSONResponse(
+                {"ok": False, "error": "PDF wird noch erstellt, bitte erneut versuchen."},
+                status_code=503,
+                headers={"Retry-After": "5"}
+            )
+        try:
+            # Cache-Datei wird gestreamt, Range-Requests -> 206
+            return pdf_response(source, request.headers, headers,
+                                gzip_path=pdf_renderer.cache.variant_path(key))
+        except FileNotFoundError:
+            # zwischen Lookup und Öffnen vom Disk-Pruning gelöscht -> neu rendern
+            if attempt:
+                raise
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus-Textformat (Werte dieses Prozesses)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/export")
+async def export_reports(request: Request):
+    """Viele PDFs als ZIP: {"report_ids": [...]} und/oder {"email_like": "%@firma.de"}."""
+    if not EXPORT_TOKEN:
+        return JSONResponse({"ok": False, "error": "Nicht gefunden"}, status_code=404)
+    auth = request.headers.get("authorization") or ""
+    if not hmac.compare_digest(auth.encode("utf-8"), f"Bearer {EXPORT_TOKEN}".encode("utf-8")):
+        return JSONResponse({"ok": False, "error": "Nicht autorisiert"}, status_code=401)
+
+    payload = await request.json()
+    ids = payload.get("report_ids") or []
+    if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+        return JSONResponse({"ok": False, "error": "report_ids muss eine Liste sein"}, status_code=400)
+    if payload.get("email_like"):
+        ids = ids + await asyncio.to_thread(
+            find_report_ids, str(payload["email_like"]), EXPORT_MAX_REPORTS + 1
+        )
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return JSONResponse({"ok": False, "error": "Keine Reports ausgewählt"}, status_code=400)
+    if len(ids) > EXPORT_MAX_REPORTS:
+        return JSONResponse(
+            {"ok": False, "error": f"Maximal {EXPORT_MAX_REPORTS} Reports pro Export"},
+            status_code=400
+        )
+
+    return StreamingResponse(
+        zip_export_async(ids, pdf_renderer),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="Performance-Profil-Reports.zip"'}
     )
@@ -0,0 +1,185 @@
+# batch_writer.py
+# ============================================================
+# Group-Commit für Schreibzugriffe (db.save_report)
+# - Aufrufer legen eine Zeile in die Queue und warten auf ihr Future
+# - ein Writer-Thread nimmt alles, was inzwischen wartet (höchstens
+#   max_rows, optional bis zu wait_s auf weitere Zeilen), und schreibt
+#   es in EINER Transaktion
+# - das Future wird erst nach dem Commit erfüllt -> der Aufrufer
+#   antwortet erst, wenn seine Zeile dauerhaft gespeichert ist
+# - schlägt ein Batch fehl, werden seine Zeilen einzeln geschrieben:
+#   nur der Aufrufer mit der fehlerhaften Zeile bekommt die Exception
+# ============================================================
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+_STOP = object()
+
+
+def _resolve(fut: Optional[Future], error: Optional[BaseException] = None):
+    if fut is None:
+        return
+    if error is None:
+        fut.set_result(None)
+    else:
+        fut.set_exception(error)
+
+
+class BatchWriter:
+    def __init__(self, write: Callable[[List[Any]], None], max_rows: int = 100,
+                 wait_s: float = 0.0, name: str = "batch-writer"):
+        self._write = write
+        self.max_rows = max(1, max_rows)
+        self.wait_s = wait_s
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {"batches": 0, "rows": 0, "max_batch": 0, "failed_batches": 0}
+
+    # ---------------- Aufrufer ----------------
+    def submit(self, row: Any) -> Future:
+        fut = Future()
+        # unter dem Lock: sonst kann die Zeile nach _STOP in der Queue landen
+        # und wird von niemandem mehr erfüllt
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._start()
+            elif self._stopping:
+                # stop() ist abgelaufen, der alte Thread hängt noch im letzten Batch
+                fut.set_exception(RuntimeError(f"{self.name}: wird beendet"))
+                return fut
+            self._queue.put((row, fut))
+        return fut
+
+    def write(self, row: Any):
+        """Blockiert bis zum Commit des Batches mit dieser Zeile."""
+        return self.submit(row).result()
+
+    async def write_async(self, row: Any):
+        """
+        Wie write. Wird der Aufrufer abgebrochen, wartet er trotzdem auf
+        den Commit (die Zeile wird ohnehin geschrieben), damit sein
+        Aufräumen (Cache, Idempotenz-Key) nicht vor dem Commit läuft.
+        """
+        fut = asyncio.wrap_future(self.submit(row))
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            while not fut.done():
+                try:
+                    await asyncio.wait([fut])
+                except asyncio.CancelledError:
+                    pass
+            raise
+
+    # ---------------- Writer-Thread ----------------
+    def _collect(self, first) -> List:
+        batch = [first]
+        deadline = time.monotonic() + self.wait_s
+        while len(batch) < self.max_rows:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)    # nach diesem Batch beenden
+                break
+            batch.append(item)
+        return batch
+
+    def _flush(self, batch: List):
+        # ab hier nicht mehr abbrechbar; auch Zeilen von Aufrufern, die
+        # inzwischen abgebrochen haben, werden geschrieben
+        batch = [(row, fut if fut.set_running_or_notify_cancel() else None)
+                 for row, fut in batch]
+        try:
+            self._write([row for row, _ in batch])
+        except Exception as e:
+            self._stats["failed_batches"] += 1
+            if len(batch) == 1:
+                _resolve(batch[0][1], e)
+                return
+            # einzeln wiederholen, damit nur die fehlerhafte Zeile scheitert
+            for row, fut in batch:
+                try:
+                    self._write([row])
+                except Exception as e:
+                    _resolve(fut, e)
+                else:
+                    _resolve(fut)
+            return
+        for _, fut in batch:
+            _resolve(fut)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = self._collect(item)
+            self._stats["batches"] += 1
+            self._stats["rows"] += len(batch)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+            try:
+                self._flush(batch)
+            except BaseException as e:
+                # der Thread muss weiterlaufen, sonst warten alle späteren
+                # Aufrufer ewig; offene Futures dieses Batches scheitern
+                self._stats["failed_batches"] += 1
+                if not isinstance(e, Exception):
+                    e = RuntimeError(f"{self.name}: Batch abgebrochen ({e!r})")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    def _fail_queued(self, error: Exception):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(error)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._start()
+
+    def _start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Schreibt, was noch in der Queue liegt, und beendet den Thread.
+        Hängt der Thread länger als timeout, scheitern die noch wartenden
+        Zeilen; der Thread endet nach seinem laufenden Batch.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self._fail_queued(RuntimeError(f"{self.name}: nicht geschrieben, stop() nach {timeout}s"))
+                self._queue.put(_STOP)
+                return      # _thread bleibt gesetzt: kein zweiter Writer daneben
+            self._fail_queued(RuntimeError(f"{self.name}: nach stop() eingereiht"))
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        s = dict(self._stats)
+        s["queued"] = self._queue.qsize()
+        s["avg_batch"] = round(s["rows"] / s["batches"], 2) if s["batches"] else 0.0
+        return s
@@ -0,0 +1,77 @@
+# benchmarks/_brevo_stub.py
+# ============================================================
+# Lokaler Brevo-Stub (POST /v3/contacts) für Benchmarks und
+# manuelle Tests des Outbox-Dispatchers.
+#
+#   stub = BrevoStub(fail_first=2, status=201, delay_s=0.05).start()
+#   BrevoDispatcher(api_key="x", api_url=stub.url).drain()
+#
+# script: pro E-Mail eine Folge von Antworten (Statuscode oder
+# "timeout" = hängt hang_s lang), danach `status`:
+#   BrevoStub(script={"a@x.de": [429, 503, 201], "b@x.de": ["timeout"]})
+# ============================================================
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class BrevoStub:
+    def __init__(self, status: int = 201, fail_first: int = 0, fail_status: int = 503,
+                 delay_s: float = 0.0, script=None, hang_s: float = 3.0):
+        self.status = status
+        self.script = {email: list(steps) for email, steps in (script or {}).items()}
+        self.hang_s = hang_s
+        self.calls = {}         # E-Mail -> Anzahl Requests
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.delay_s = delay_s
+        self.received = []
+        self.requests_num = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # Keep-Alive, damit Session-Pooling greift
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("content-length") or 0))
+                contact = json.loads(body or b"{}")
+                email = contact.get("email")
+                if stub.delay_s:
+                    time.sleep(stub.delay_s)
+                with stub._lock:
+                    stub.requests_num += 1
+                    stub.calls[email] = stub.calls.get(email, 0) + 1
+                    steps = stub.script.get(email)
+                    step = steps.pop(0) if steps else None
+                    if step is None:
+                        failing = stub.requests_num <= stub.fail_first
+                        code = stub.fail_status if failing else stub.status
+                    else:
+                        code = stub.status if step == "timeout" else step
+                    if code < 300 and step != "timeout":
+                        stub.received.append(contact)
+                if step == "timeout":
+                    time.sleep(stub.hang_s)     # Client hat bis dahin aufgegeben
+                out = b'{"id": 1}' if code < 300 else b'{"code": "error"}'
+                self.send_response(code)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v3"
+
+    def start(self) -> "BrevoStub":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,96 @@
+# benchmarks/_common.py
+# ============================================================
+# Gemeinsame Helfer für die Benchmark-Skripte
+# Aufruf immer aus dem Repo-Root: python -m benchmarks.<name>
+# ============================================================
+
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * (p / 100.0)
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def summarize(latencies_s: List[float], wall_s: float) -> Dict[str, Any]:
+    ms = [x * 1000.0 for x in latencies_s]
+    return {
+        "n": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "throughput_per_s": round(len(ms) / wall_s, 1) if wall_s > 0 else 0.0,
+    }
+
+
+def time_calls(fn, n: int, warmup: int = 3) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    lat = []
+    t_start = time.perf_counter()
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t0)
+    return summarize(lat, time.perf_counter() - t_start)
+
+
+def random_answers(questions: List[Dict[str, Any]], rng: random.Random = None) -> Dict[str, str]:
+    rng = rng or random
+    return {q["id"]: str(rng.randint(0, 10)) for q in questions}
+
+
+def load_questions() -> List[Dict[str, Any]]:
+    with (REPO_DIR / "data" / "questions.json").open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(env: Dict[str, str], port: int, workers: int = 1) -> subprocess.Popen:
+    """Startet uvicorn mit app:app als Subprozess und wartet auf /health."""
+    import requests
+
+    full_env = dict(os.environ)
+    full_env.update(env)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app",
+         "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=str(REPO_DIR), env=full_env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server ist nicht gestartet.")
+
+
+def print_json(data: Any):
+    print(json.dumps(data, indent=2, ensure_ascii=False))
@@ -0,0 +1,81 @@
+# benchmarks/bench_answers_storage.py
+# ============================================================
+# Rohantworten als JSON-Text vs. kompakte Bytes (answers_codec.py):
+# Bytes pro Zeile, SQLite-Dateigröße und Dekodieren eines Batches
+# bis zur Scoring-Matrix.
+#
+#   python -m benchmarks.bench_answers_storage
+#   python -m benchmarks.bench_answers_storage 50000
+# ============================================================
+
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from answers_codec import encode_answers, stack_answers
+from benchmarks._common import random_answers, print_json
+from questions import get_question_set
+from report_batch import answers_to_matrix
+
+
+def _fill(path: Path, column_type: str, rows) -> int:
+    con = sqlite3.connect(path)
+    con.execute(f"CREATE TABLE reports (report_id TEXT PRIMARY KEY, answers {column_type})")
+    con.executemany("INSERT INTO reports VALUES (?, ?)", rows)
+    con.commit()
+    con.execute("VACUUM")
+    con.close()
+    return path.stat().st_size
+
+
+def _read(path: Path):
+    con = sqlite3.connect(path)
+    rows = [r[0] for r in con.execute("SELECT answers FROM reports")]
+    con.close()
+    return rows
+
+
+def main(n: int = 20000):
+    qs = get_question_set()
+    qids = [q["id"] for q in qs.questions]
+    rng = random.Random(7)
+    answers = [random_answers(qs.questions, rng) for _ in range(n)]
+
+    as_json = [json.dumps(a, ensure_ascii=False, separators=(",", ":")) for a in answers]
+    as_raw = [encode_answers(a, qids) for a in answers]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        size_json = _fill(Path(tmp) / "json.db", "TEXT", [(f"{i:08x}", v) for i, v in enumerate(as_json)])
+        size_raw = _fill(Path(tmp) / "raw.db", "BLOB", [(f"{i:08x}", v) for i, v in enumerate(as_raw)])
+        rows_json = _read(Path(tmp) / "json.db")
+        rows_raw = _read(Path(tmp) / "raw.db")
+
+    t0 = time.perf_counter()
+    v1, a1 = answers_to_matrix((json.loads(r) for r in rows_json), qids)
+    decode_json = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    v2, a2 = stack_answers(rows_raw)
+    decode_raw = time.perf_counter() - t0
+
+    assert (a1 == a2).all() and (v1 == v2).all()
+    print_json({
+        "rows": n,
+        "questions": len(qids),
+        "bytes_per_row": {
+            "json": round(sum(len(s.encode("utf-8")) for s in as_json) / n, 1),
+            "raw": round(sum(len(b) for b in as_raw) / n, 1),
+        },
+        "sqlite_file_bytes": {"json": size_json, "raw": size_raw,
+                              "ratio": round(size_json / size_raw, 2)},
+        "decode_to_matrix_s": {"json": round(decode_json, 4), "raw": round(decode_raw, 4),
+                               "speedup": round(decode_json / decode_raw, 1)},
+    })
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,63 @@
+# benchmarks/bench_batch_scoring.py
+# ============================================================
+# Batch-Scoring (report_batch) vs. build_report_data in einer Schleife
+# für 1k bis 1M Antwort-Sets, inkl. Gleichheitsprüfung.
+#
+#   python -m benchmarks.bench_batch_scoring [--sizes 1000,10000,100000,1000000]
+# ============================================================
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks._common import print_json
+from questions import get_question_set
+from report_builder import build_report_data
+from report_batch import score_matrix_chunked, build_report_data_batch
+
+SCALAR_MAX = 20000   # darüber wird der Skalar-Pfad hochgerechnet
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000,1000000")
+    args = ap.parse_args()
+
+    qs = get_question_set()
+    qids = [q["id"] for q in qs.questions]
+    rng = np.random.default_rng(42)
+    out = {}
+    scalar_per_row = None
+    for n in [int(x) for x in args.sizes.split(",")]:
+        values = rng.integers(0, 11, size=(n, len(qids)), dtype=np.uint8)
+        answered = np.ones_like(values, dtype=bool)
+
+        t0 = time.perf_counter()
+        res = score_matrix_chunked(values, answered)
+        t_matrix = time.perf_counter() - t0
+
+        row = {"matrix_seconds": round(t_matrix, 4),
+               "matrix_rows_per_s": round(n / t_matrix)}
+
+        m = min(n, SCALAR_MAX)
+        dicts = [{qid: str(v) for qid, v in zip(qids, values[i].tolist())} for i in range(m)]
+        t0 = time.perf_counter()
+        build_report_data_batch(dicts)
+        row["dicts_to_batch_rows_per_s"] = round(m / (time.perf_counter() - t0))
+
+        t0 = time.perf_counter()
+        scalar = [build_report_data(d) for d in dicts]
+        scalar_per_row = (time.perf_counter() - t0) / m
+        row["scalar_seconds" + ("" if m == n else "_extrapolated")] = round(scalar_per_row * n, 4)
+        row["speedup_matrix_vs_scalar"] = round(scalar_per_row * n / t_matrix, 1)
+
+        check = min(m, 2000)
+        row["identical_rows_checked"] = check
+        row["identical"] = all(res.result(i) == scalar[i] for i in range(check))
+        out[n] = row
+    print_json(out)
+
+
+if __name__ == "__main__":
+    main()
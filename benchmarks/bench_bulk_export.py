@@ -0,0 +1,82 @@
+# benchmarks/bench_bulk_export.py
+# ============================================================
+# Durchsatz des Bulk-Exports (bulk_export.py) in PDFs pro Sekunde
+# für verschiedene Worker-Zahlen: Reports in einer temporären
+# SQLite-DB, Export als ZIP in eine temporäre Datei, ohne PDF-Cache.
+# Prüft nebenbei, dass das ZIP vollständig und lesbar ist.
+#
+#   python -m benchmarks.bench_bulk_export
+#   python -m benchmarks.bench_bulk_export 100 --workers 1 2 4 8
+# ============================================================
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from benchmarks._common import random_answers, print_json
+
+
+def _fill(n: int):
+    import db
+    from questions import get_question_set
+    from report_builder import build_report_data
+
+    db.init_db()
+    qs = get_question_set()
+    rng = random.Random(17)
+    ids = []
+    for i in range(n):
+        r = build_report_data(random_answers(qs.questions, rng))
+        rid = f"{rng.getrandbits(128):032x}"
+        db.save_report(rid, {"report_id": rid, "name": f"Kunde {i}",
+                             "email": f"k{i}@kohorte.example",
+                             "profile_type": r.profile_type,
+                             "ranked": [list(x) for x in r.ranked]})
+        ids.append(rid)
+    return ids
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", type=int, nargs="?", default=40)
+    ap.add_argument("--workers", type=int, nargs="+",
+                    default=sorted({1, min(4, os.cpu_count() or 1)}))
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # vor dem ersten Import von db setzen
+        os.environ["SQLITE_PATH"] = str(Path(tmp) / "reports.db")
+        from bulk_export import render_reports, write_zip
+        import db
+
+        ids = _fill(args.n)
+        assert len(db.find_report_ids("%@kohorte.example")) == args.n
+
+        runs = {}
+        for workers in args.workers:
+            out = Path(tmp) / f"export-{workers}.zip"
+            t0 = time.perf_counter()
+            with open(out, "wb") as f:
+                summary = write_zip(render_reports(ids + ["gibt-es-nicht"], workers, use_cache=False), f)
+            seconds = time.perf_counter() - t0
+            with zipfile.ZipFile(out) as z:
+                ok = z.testzip() is None and len(z.namelist()) == args.n + 1
+            runs[workers] = {
+                "seconds": round(seconds, 2),
+                "pdfs_per_s": round(summary["pdfs"] / seconds, 2),
+                "zip_bytes": out.stat().st_size,
+                "zip_ok": ok and summary["missing"] == ["gibt-es-nicht"],
+            }
+
+    base = runs[args.workers[0]]["pdfs_per_s"]
+    for r in runs.values():
+        r["speedup"] = round(r["pdfs_per_s"] / base, 2)
+    print_json({"reports": args.n, "workers": runs})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_compression.py
+# ============================================================
+# Komprimierung (compression.py): für typische Antworten
+# (Ergebnisseite, Fragebogen, /submit-JSON, /metrics, Report-PDF)
+# 1) Größe und CPU-Zeit pro Stufe: gzip 1/6/9, brotli 4/11 (falls
+#    installiert) -> Grundlage für COMPRESS_GZIP_LEVEL/_BR_QUALITY
+# 2) Bytes über die Leitung durch die App (Middleware bzw.
+#    vorkomprimierte Varianten), mit und ohne Accept-Encoding
+#
+#   python -m benchmarks.bench_compression
+#   python -m benchmarks.bench_compression 500
+# ============================================================
+
+import argparse
+import os
+import random
+import tempfile
+
+from benchmarks._common import time_calls, random_answers, print_json
+
+
+def _levels(body: bytes, n: int):
+    from compression import brotli, compress
+
+    out = {"identity": len(body)}
+    cases = [("gzip", lvl) for lvl in (1, 6, 9)]
+    if brotli is not None:
+        cases += [("br", q) for q in (4, 11)]
+    for enc, lvl in cases:
+        size = len(compress(body, enc, lvl))
+        t = time_calls(lambda: compress(body, enc, lvl), n, warmup=3)
+        out[f"{enc}-{lvl}"] = {"bytes": size, "ratio": round(size / len(body), 3),
+                               "p50_ms": t["p50_ms"]}
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", type=int, nargs="?", default=200)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="pp-compress-")
+    os.environ.setdefault("SQLITE_PATH", os.path.join(tmp, "reports.db"))
+    os.environ.setdefault("PDF_CACHE_DIR", os.path.join(tmp, "pdf_cache"))
+    os.environ["BREVO_API_KEY"] = ""
+
+    from fastapi.testclient import TestClient
+    import app as app_module
+    from questions import get_question_set
+
+    qs = get_question_set()
+    answers = random_answers(qs.questions, random.Random(5))
+    identity = {"Accept-Encoding": "identity"}
+    compressed = {"Accept-Encoding": "gzip, br"}
+
+    with TestClient(app_module.app) as client:
+        r = client.post("/submit", json={"name": "Bench", "email": "bench@example.com",
+                                         "answers": answers}, headers=identity)
+        r.raise_for_status()
+        rid = r.json()["report_id"]
+        paths = {"home": "/", "results": f"/r/{rid}", "metrics": "/metrics",
+                 "pdf": f"/report/{rid}.pdf"}
+        bodies = {name: client.get(p, headers=identity).content for name, p in paths.items()}
+        bodies["submit_json"] = r.content
+
+        wire = {}
+        for name, p in paths.items():
+            plain = client.get(p, headers=identity)
+            packed = client.get(p, headers=compressed)
+            assert packed.content == plain.content, name
+            wire[name] = {"identity": plain.num_bytes_downloaded,
+                          "compressed": packed.num_bytes_downloaded,
+                          "encoding": packed.headers.get("content-encoding")}
+
+    print_json({
+        "levels": {name: _levels(body, args.n) for name, body in bodies.items()},
+        "wire_bytes": wire,
+    })
+
+
+if __name__ == "__main__":
+    main()
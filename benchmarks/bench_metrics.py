@@ -0,0 +1,131 @@
+# benchmarks/bench_metrics.py
+# ============================================================
+# Overhead der Messpunkte aus metrics.py
+# 1) Mikro: Kosten einer Beobachtung (observe, with-Timer, abgeschaltet)
+# 2) Endpoints: POST /submit und GET /r/{id} über einen ASGI-Client,
+#    abwechselnd in Runden mit METRICS_ENABLED an/aus (gleiche DB,
+#    gleicher Prozess) -> Overhead in Prozent (Ziel < 1 %), dazu eine
+#    Schätzung aus Beobachtungen pro Request x Kosten eines Timers
+#
+#   python -m benchmarks.bench_metrics
+#   python -m benchmarks.bench_metrics --rounds 10 --requests 200
+# Braucht httpx (pip install httpx).
+# ============================================================
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._common import random_answers, print_json
+
+
+def _observations() -> int:
+    import metrics
+
+    return sum(sum(child.counts) for m in metrics._registry if isinstance(m, metrics.Histogram)
+               for child in m._children.values())
+
+
+def _micro(n: int = 200_000):
+    import metrics
+
+    h = metrics.Histogram("bench_metrics_seconds", "Benchmark", ("case",))
+    child = h.labels("x")
+    res = {}
+
+    def per_call_ns(fn):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return round((time.perf_counter() - t0) / n * 1e9, 1)
+
+    def timer():
+        with child.time():
+            pass
+
+    res["observe_ns"] = per_call_ns(lambda: child.observe(0.003))
+    res["labels_observe_ns"] = per_call_ns(lambda: h.labels("x").observe(0.003))
+    res["timer_ns"] = per_call_ns(timer)
+    metrics.METRICS_ENABLED = False
+    res["timer_disabled_ns"] = per_call_ns(timer)
+    metrics.METRICS_ENABLED = True
+    res["empty_loop_ns"] = per_call_ns(lambda: None)
+    return res
+
+
+async def _endpoints(rounds: int, per_round: int):
+    import httpx
+    import metrics
+    from app import app
+    from questions import get_question_set
+
+    qs = get_question_set()
+    rng = random.Random(3)
+    answers = [random_answers(qs.questions, rng) for _ in range(32)]
+    times = {True: [], False: []}
+    ids = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            async def one_round():
+                t0 = time.perf_counter()
+                for i in range(per_round):
+                    r = await c.post("/submit", json={"name": "Bench", "email": "",
+                                                      "answers": answers[i % 32]})
+                    ids.append(r.json()["report_id"])
+                    (await c.get(f"/r/{ids[rng.randrange(len(ids))]}")).raise_for_status()
+                return time.perf_counter() - t0
+
+            await one_round()   # Aufwärmen
+            n0 = _observations()
+            for i in range(rounds):
+                # Reihenfolge wechseln, damit Drift (DB wächst) beide Seiten trifft
+                for enabled in ((True, False) if i % 2 == 0 else (False, True)):
+                    metrics.METRICS_ENABLED = enabled
+                    times[enabled].append(await one_round())
+            metrics.METRICS_ENABLED = True
+            observations = _observations() - n0
+            exposition = (await c.get("/metrics")).text
+
+    on, off = statistics.median(times[True]), statistics.median(times[False])
+    return {
+        "rounds": rounds,
+        "requests_per_round": 2 * per_round,
+        "ms_per_request_on": round(on / (2 * per_round) * 1000, 4),
+        "ms_per_request_off": round(off / (2 * per_round) * 1000, 4),
+        "overhead_percent": round((on - off) / off * 100, 2),
+        "observations_per_request": round(observations / (rounds * 2 * per_round), 2),
+        "exposition_lines": exposition.count("\n"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=6)
+    ap.add_argument("--requests", type=int, default=150, help="Paare submit + Ergebnisseite pro Runde")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # vor dem ersten Import der App setzen
+        os.environ["SQLITE_PATH"] = str(Path(tmp) / "reports.db")
+        os.environ["PDF_CACHE_DIR"] = str(Path(tmp) / "pdf_cache")
+        os.environ["BREVO_API_KEY"] = ""
+        os.environ["PDF_PRERENDER"] = "0"
+        os.environ.setdefault("PDF_WORKERS", "1")
+        micro = _micro()
+        endpoints = asyncio.run(_endpoints(args.rounds, args.requests))
+    # Gemessene Differenz schwankt um einige Prozent (ein Prozess, ein Kern);
+    # stabiler ist die Schätzung: Beobachtungen pro Request x Kosten pro Timer
+    endpoints["estimated_overhead_percent"] = round(
+        endpoints["observations_per_request"] * micro["timer_ns"] / 1e6
+        / endpoints["ms_per_request_off"] * 100, 2)
+    print_json({"micro": micro, "endpoints": endpoints})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_pdf_alloc.py
+# ============================================================
+# Speicher pro PDF mit geteilten Stilen (get_styles / _table_style
+# in pdf_report.py) gegen Stile pro Rendering wie vorher:
+# - Spitzenwert laut tracemalloc
+# - neu gebaute ParagraphStyle- und TableStyle-Objekte
+# - Laufzeit (ohne tracemalloc gemessen)
+# Prüft nebenbei, dass beide Varianten byte-identische PDFs liefern.
+#
+#   python -m benchmarks.bench_pdf_alloc
+#   python -m benchmarks.bench_pdf_alloc 100
+# ============================================================
+
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from reportlab import rl_config
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import TableStyle
+
+import pdf_report
+from benchmarks._common import random_answers, print_json
+from questions import get_question_set
+from report_builder import build_report_data
+
+
+def _payloads(n: int):
+    qs = get_question_set()
+    rng = random.Random(13)
+    out = []
+    for i in range(n):
+        r = build_report_data(random_answers(qs.questions, rng))
+        out.append({"name": f"Kunde {i}", "email": f"k{i}@example.com",
+                    "profile_type": r.profile_type,
+                    "ranked": [list(x) for x in r.ranked]})
+    return out
+
+
+@contextmanager
+def _per_render_styles():
+    """Verhalten vor der Registry: Stile bei jedem Aufruf neu bauen."""
+    get_styles, table_style = pdf_report.get_styles, pdf_report._table_style
+
+    def fresh_table_style(name, background=None):
+        cmds = pdf_report._TABLE_STYLE_CMDS[name]
+        if background is not None:
+            cmds = [("BACKGROUND", (0, 0), (-1, -1), background)] + cmds
+        return TableStyle(cmds)
+
+    pdf_report.get_styles = pdf_report._build_styles
+    pdf_report._table_style = fresh_table_style
+    try:
+        yield
+    finally:
+        pdf_report.get_styles, pdf_report._table_style = get_styles, table_style
+
+
+class _StyleCounter:
+    """Zählt neu gebaute Stil-Objekte (ParagraphStyle, TableStyle)."""
+    def __init__(self):
+        self.count = 0
+
+    @contextmanager
+    def active(self):
+        originals = {cls: cls.__init__ for cls in (ParagraphStyle, TableStyle)}
+
+        def wrap(init):
+            def __init__(obj, *args, **kwargs):
+                self.count += 1
+                init(obj, *args, **kwargs)
+            return __init__
+
+        for cls, init in originals.items():
+            cls.__init__ = wrap(init)
+        try:
+            yield
+        finally:
+            for cls, init in originals.items():
+                cls.__init__ = init
+
+
+def _measure(payloads):
+    counter = _StyleCounter()
+    peaks, styles, lat = [], [], []
+    for p in payloads:
+        t0 = time.perf_counter()
+        pdf_report.build_pdf_report(p)
+        lat.append(time.perf_counter() - t0)
+
+        counter.count = 0
+        tracemalloc.start()
+        with counter.active():
+            pdf_report.build_pdf_report(p)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        styles.append(counter.count)
+    return {
+        "peak_kib_mean": round(statistics.fmean(peaks) / 1024, 1),
+        "peak_kib_max": round(max(peaks) / 1024, 1),
+        "style_objects_per_pdf": round(statistics.fmean(styles), 1),
+        "mean_ms": round(statistics.fmean(lat) * 1000, 2),
+    }
+
+
+def main(n: int = 50):
+    payloads = _payloads(n)
+    pdf_report.warm_category_fragments()
+    pdf_report.build_pdf_report(payloads[0])
+
+    # ohne Zeitstempel/ID im PDF -> Bytes direkt vergleichbar
+    rl_config.invariant = 1
+    identical = True
+    for p in payloads[:10]:
+        with _per_render_styles():
+            a = pdf_report.build_pdf_report(p)
+        identical &= a == pdf_report.build_pdf_report(p)
+    rl_config.invariant = 0
+
+    with _per_render_styles():
+        per_render = _measure(payloads)
+    shared = _measure(payloads)
+    print_json({
+        "pdfs": n,
+        "identical_output": identical,
+        "per_render_styles": per_render,
+        "shared_styles": shared,
+        "peak_ratio": round(per_render["peak_kib_mean"] / shared["peak_kib_mean"], 2),
+    })
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
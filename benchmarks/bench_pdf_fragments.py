@@ -0,0 +1,74 @@
+# benchmarks/bench_pdf_fragments.py
+# ============================================================
+# Ganzes PDF mit und ohne Fragment-Cache für die Kategorie-Seiten
+# (PDF_FRAGMENT_CACHE in pdf_report.py). Prüft nebenbei, dass beide
+# Varianten byte-identische PDFs liefern.
+#
+#   python -m benchmarks.bench_pdf_fragments
+#   python -m benchmarks.bench_pdf_fragments 200
+# ============================================================
+
+import random
+import sys
+import time
+
+from reportlab import rl_config
+
+import pdf_report
+from benchmarks._common import summarize, random_answers, print_json
+from questions import get_question_set
+from report_builder import build_report_data
+
+
+def _payloads(n: int):
+    qs = get_question_set()
+    rng = random.Random(11)
+    out = []
+    for i in range(n):
+        r = build_report_data(random_answers(qs.questions, rng))
+        out.append({"name": f"Kunde {i}", "email": f"k{i}@example.com",
+                    "profile_type": r.profile_type,
+                    "ranked": [list(x) for x in r.ranked]})
+    return out
+
+
+def _run(payloads):
+    # abwechselnd messen, damit Lastschwankungen beide Varianten gleich treffen
+    lat = {False: [], True: []}
+    wall = {False: 0.0, True: 0.0}
+    for p in payloads:
+        for cached in (False, True):
+            pdf_report.PDF_FRAGMENT_CACHE = cached
+            t0 = time.perf_counter()
+            pdf_report.build_pdf_report(p)
+            dt = time.perf_counter() - t0
+            lat[cached].append(dt)
+            wall[cached] += dt
+    return summarize(lat[False], wall[False]), summarize(lat[True], wall[True])
+
+
+def main(n: int = 100):
+    payloads = _payloads(n)
+
+    # ohne Zeitstempel/ID im PDF -> Bytes direkt vergleichbar
+    rl_config.invariant = 1
+    identical = True
+    for p in payloads[:20]:
+        pdf_report.PDF_FRAGMENT_CACHE = False
+        a = pdf_report.build_pdf_report(p)
+        pdf_report.PDF_FRAGMENT_CACHE = True
+        identical &= a == pdf_report.build_pdf_report(p)
+    rl_config.invariant = 0
+
+    uncached, cached = _run(payloads)
+    print_json({
+        "pdfs": n,
+        "identical_output": identical,
+        "without_fragment_cache": uncached,
+        "with_fragment_cache": cached,
+        "speedup_mean": round(uncached["mean_ms"] / cached["mean_ms"], 2),
+    })
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
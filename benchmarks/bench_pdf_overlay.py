@@ -0,0 +1,80 @@
+# benchmarks/bench_pdf_overlay.py
+# ============================================================
+# Durchsatz in PDFs pro Sekunde und Kern: build_pdf_report (flow)
+# gegen pdf_overlay (overlay). Jeder Prozess rendert seine Reports
+# abwechselnd in beiden Modi; die Basis für overlay wird vorher
+# einmal pro Prozess gebaut (wie im Worker-Initializer).
+#
+#   python -m benchmarks.bench_pdf_overlay
+#   python -m benchmarks.bench_pdf_overlay 100 --processes 4
+# ============================================================
+
+import argparse
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks._common import print_json
+from questions import get_question_set
+from report_builder import build_report_data
+
+
+def _payloads(n: int, seed: int):
+    qs = get_question_set()
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        r = build_report_data({q["id"]: str(rng.randint(0, 10)) for q in qs.questions})
+        out.append({"name": f"Kunde {i}", "email": f"k{i}@example.com",
+                    "profile_type": r.profile_type,
+                    "ranked": [list(x) for x in r.ranked]})
+    return out
+
+
+def _worker(n: int, seed: int):
+    import pdf_overlay
+    import pdf_report
+
+    t0 = time.perf_counter()
+    pdf_overlay.warm_base()
+    base_s = time.perf_counter() - t0
+    pdf_report.warm_category_fragments()
+
+    seconds = {"flow": 0.0, "overlay": 0.0}
+    size = {"flow": 0, "overlay": 0}
+    for payload in _payloads(n, seed):
+        for mode, build in (("flow", pdf_report.build_pdf_report),
+                            ("overlay", pdf_overlay.build_pdf_report_overlay)):
+            t = time.perf_counter()
+            data = build(payload)
+            seconds[mode] += time.perf_counter() - t
+            size[mode] += len(data)
+    return seconds, size, base_s
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", type=int, nargs="?", default=50, help="Reports pro Prozess")
+    ap.add_argument("--processes", type=int, default=1)
+    args = ap.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.processes, mp_context=ctx) as ex:
+        results = list(ex.map(_worker, [args.n] * args.processes, range(args.processes)))
+
+    out = {"reports_per_process": args.n, "processes": args.processes}
+    for mode in ("flow", "overlay"):
+        per_core = [args.n / r[0][mode] for r in results]
+        out[mode] = {
+            "pdfs_per_s_per_core": round(sum(per_core) / len(per_core), 2),
+            "ms_per_pdf": round(1000 * sum(r[0][mode] for r in results) / (args.n * args.processes), 1),
+            "avg_bytes": round(sum(r[1][mode] for r in results) / (args.n * args.processes)),
+        }
+    out["speedup"] = round(out["overlay"]["pdfs_per_s_per_core"] / out["flow"]["pdfs_per_s_per_core"], 2)
+    out["base_build_s"] = round(max(r[2] for r in results), 3)
+    print_json(out)
+
+
+if __name__ == "__main__":
+    main()
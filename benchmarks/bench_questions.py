@@ -0,0 +1,38 @@
+# benchmarks/bench_questions.py
+# ============================================================
+# Microbenchmark: questions.json pro Request laden + Index bauen
+# (altes Verhalten) vs. Fragen-Registry mit mtime-Check.
+#
+#   python -m benchmarks.bench_questions
+# ============================================================
+
+import json
+import random
+
+from benchmarks._common import REPO_DIR, time_calls, random_answers, print_json
+from questions import get_question_set
+from report_builder import build_report_data
+
+
+def _per_request_load():
+    # so lief es vorher in home() und build_report_data()
+    with (REPO_DIR / "data" / "questions.json").open("r", encoding="utf-8") as f:
+        questions = json.load(f)
+    return {q["id"]: q["function_id"] for q in questions}
+
+
+def main(n: int = 5000):
+    qs = get_question_set()
+    answers = random_answers(qs.questions, random.Random(1))
+    old = time_calls(_per_request_load, n)
+    new = time_calls(lambda: get_question_set().q_to_fid, n)
+    print_json({
+        "per_request_load": old,
+        "registry_lookup": new,
+        "saving_per_request_us": round((old["mean_ms"] - new["mean_ms"]) * 1000, 1),
+        "build_report_data": time_calls(lambda: build_report_data(answers), n),
+    })
+
+
+if __name__ == "__main__":
+    main()
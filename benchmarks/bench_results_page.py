@@ -0,0 +1,67 @@
+# benchmarks/bench_results_page.py
+# ============================================================
+# Ergebnisseite /r/{id}: vorher (TemplateResponse, Content per tojson
+# in jeder Antwort) gegen nachher (vorkompiliertes Template, Content
+# als versioniertes Asset, nur die Report-Felder eingebettet).
+# Gemessen: Bytes pro Antwort, Renderzeit im Server (ohne DB) und
+# Bytes beim ersten / wiederholten Besuch (Asset dann im Browser-Cache).
+#
+#   python -m benchmarks.bench_results_page
+#   python -m benchmarks.bench_results_page 5000
+# ============================================================
+
+import argparse
+import random
+
+from benchmarks._common import time_calls, random_answers, print_json
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", type=int, nargs="?", default=2000)
+    args = ap.parse_args()
+
+    from starlette.requests import Request
+    import app as app_module
+    from app import templates, FRONTEND_CONTENT, CONTENT_ASSET, render_result_page
+    from questions import get_question_set
+    from report_builder import build_report_data
+
+    qs = get_question_set()
+    rng = random.Random(11)
+    payloads = []
+    for i in range(32):
+        r = build_report_data(random_answers(qs.questions, rng))
+        payloads.append({"report_id": f"{rng.getrandbits(128):032x}", "result_url": "http://x/r/1",
+                         "name": f"Kunde {i}", "email": f"k{i}@example.com",
+                         "profile_type": r.profile_type, "ranked": r.ranked,
+                         "percents": r.percents, "sums": r.sums, "avgs": r.avgs})
+    request = Request({"type": "http", "method": "GET", "path": "/r/x", "headers": [], "query_string": b""})
+    it = iter(range(10 ** 9))
+
+    def before():
+        # bisheriger Weg in show_result
+        return templates.TemplateResponse("results.html", {
+            "request": request, "data": payloads[next(it) % 32], "content": FRONTEND_CONTENT,
+        }).body
+
+    def after():
+        return render_result_page(payloads[next(it) % 32]).encode("utf-8")
+
+    assert app_module.RESULTS_CONTENT_ASSET, "RESULTS_CONTENT_ASSET=0 gesetzt"
+    size_before = sum(len(before()) for _ in range(32)) / 32
+    size_after = sum(len(after()) for _ in range(32)) / 32
+    t_before = time_calls(before, args.n, warmup=20)
+    t_after = time_calls(after, args.n, warmup=20)
+    print_json({
+        "bytes_per_response": {"before": round(size_before), "after": round(size_after),
+                               "content_asset": len(CONTENT_ASSET.body)},
+        "first_visit_bytes": {"before": round(size_before),
+                              "after": round(size_after + len(CONTENT_ASSET.body))},
+        "render": {"before": t_before, "after": t_after,
+                   "speedup_p50": round(t_before["p50_ms"] / t_after["p50_ms"], 2)},
+    })
+
+
+if __name__ == "__main__":
+    main()
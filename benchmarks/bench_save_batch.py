@@ -0,0 +1,109 @@
+# benchmarks/bench_save_batch.py
+# ============================================================
+# save_report_async unter Burst-Last (Kampagnen-Mail): viele
+# gleichzeitige Submissions, je mit Antworten und Brevo-Kontakt.
+# Group-Commit (SAVE_BATCH=1, batch_writer.py) gegen eine Transaktion
+# pro Report (SAVE_BATCH=0). Gemessen: Inserts pro Sekunde, Latenz bis
+# zur Bestätigung, mittlere Batch-Größe; danach Kontrolle, dass jede
+# Zeile und jeder Outbox-Eintrag genau einmal in der DB steht.
+#
+#   python -m benchmarks.bench_save_batch                  # SQLite (temp)
+#   python -m benchmarks.bench_save_batch --levels 1,16,64 --duration 5
+#   DATABASE_URL=... python -m benchmarks.bench_save_batch
+# ============================================================
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from benchmarks._common import summarize, random_answers, load_questions, print_json
+
+
+async def _run_level(db, concurrency: int, duration: float, answers, prefix: str):
+    stop = time.perf_counter() + duration
+    lat, ids = [], []
+
+    async def worker():
+        while time.perf_counter() < stop:
+            rid = f"{prefix}-{uuid.uuid4()}"
+            payload = {"report_id": rid, "name": "Bench", "email": "bench@example.com",
+                       "profile_type": "A"}
+            contact = {"email": "bench@example.com", "attributes": {"REPORT_ID": rid}}
+            t0 = time.perf_counter()
+            await db.save_report_async(rid, payload, contact=contact, answers=answers)
+            lat.append(time.perf_counter() - t0)
+            ids.append(rid)
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    res = summarize(lat, time.perf_counter() - t_start)
+    return res, ids
+
+
+def _count(db, prefix: str):
+    like = prefix + "-%"
+    with db._get_pool().connection() as con:
+        if db.DATABASE_URL:
+            q = "SELECT COUNT(*) FROM {} WHERE report_id LIKE %s"
+        else:
+            q = "SELECT COUNT(*) FROM {} WHERE report_id LIKE ?"
+        reports = con.execute(q.format("reports"), (like,)).fetchone()[0]
+        outbox = con.execute(q.format("brevo_outbox"), (like,)).fetchone()[0]
+    return reports, outbox
+
+
+async def _main(args):
+    import db
+
+    db.init_db()
+    await db.open_async_pool()
+    rng = random.Random(7)
+    answers = random_answers(load_questions(), rng)
+    levels = [int(x) for x in args.levels.split(",")]
+    run = uuid.uuid4().hex[:8]
+    results = {}
+    try:
+        for mode in ("per_row", "batched"):
+            db.SAVE_BATCH = mode == "batched"
+            out = {}
+            for c in levels:
+                prefix = f"bench-{run}-{mode}-{c}"
+                before = db.report_writer_stats()
+                res, ids = await _run_level(db, c, args.duration, answers, prefix)
+                after = db.report_writer_stats()
+                batches = after["batches"] - before["batches"]
+                if batches:
+                    res["avg_batch"] = round((after["rows"] - before["rows"]) / batches, 1)
+                reports, outbox = _count(db, prefix)
+                res["rows_ok"] = reports == len(ids) and outbox == len(ids)
+                out[c] = res
+            results[mode] = out
+    finally:
+        await asyncio.to_thread(db.close_report_writer)
+        await db.close_async_pool()
+
+    for c in levels:
+        base = results["per_row"][c]["throughput_per_s"]
+        results["batched"][c]["speedup"] = (
+            round(results["batched"][c]["throughput_per_s"] / base, 2) if base else None)
+    print_json({"backend": "postgres" if db.DATABASE_URL else "sqlite",
+                "max_rows": db.SAVE_BATCH_MAX_ROWS, "wait_ms": db.SAVE_BATCH_WAIT_MS,
+                "inserts": results})
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--levels", default="1,8,32,128")
+    ap.add_argument("--duration", type=float, default=3.0)
+    args = ap.parse_args()
+    if not os.getenv("DATABASE_URL"):
+        os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(prefix="pp-batch-"), "reports.db"))
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/check_brevo_outbox.py
+# ============================================================
+# Fehlerpfade des BrevoDispatchers (brevo.py) gegen den Brevo-Stub:
+# pro Kontakt eine feste Antwortfolge, danach wird die Outbox
+# geprüft (status, attempts, last_error):
+#   ok       201                    -> sent, 1 Versuch
+#   rate     429, 429, 201          -> sent, 3 Versuche (Backoff)
+#   flaky    503, 201               -> sent, 2 Versuche
+#   slow     Timeout, 201           -> sent, 2 Versuche
+#   bad      400                    -> dead, 1 Versuch (kein Retry)
+#   down     503 x MAX_ATTEMPTS     -> dead nach MAX_ATTEMPTS
+#   lease    beansprucht von einem "abgestürzten" Dispatcher
+#            -> erst nach Ablauf der Lease erneut zugestellt
+# Endet mit Exit-Code 1, wenn eine Prüfung fehlschlägt.
+#
+#   python -m benchmarks.check_brevo_outbox
+# ============================================================
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks._brevo_stub import BrevoStub
+from benchmarks._common import print_json
+
+MAX_ATTEMPTS = 3
+TIMEOUT_S = 0.5
+LEASE_S = 0.5
+
+# E-Mail -> (Antwortfolge, erwarteter Status, erwartete Versuche, last_error enthält)
+CASES = {
+    "ok@example.com": ([201], "sent", 1, None),
+    "rate@example.com": ([429, 429, 201], "sent", 3, None),
+    "flaky@example.com": ([503, 201], "sent", 2, None),
+    "slow@example.com": (["timeout", 201], "sent", 2, None),
+    "bad@example.com": ([400], "dead", 1, "HTTP 400"),
+    "down@example.com": ([503] * MAX_ATTEMPTS, "dead", MAX_ATTEMPTS, "HTTP 503"),
+}
+
+
+def _outbox(db):
+    with db._get_pool().connection() as con:
+        rows = con.execute(
+            "SELECT payload_json, status, attempts, last_error FROM brevo_outbox").fetchall()
+    return {json.loads(p)["email"]: {"status": s, "attempts": a, "last_error": e}
+            for p, s, a, e in rows}
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="pp-outbox-")
+    os.environ.setdefault("SQLITE_PATH", os.path.join(tmp, "reports.db"))
+    # kurze Timeouts/Backoffs, damit Retries sofort fällig werden
+    os.environ["BREVO_TIMEOUT"] = str(TIMEOUT_S)
+    os.environ["BREVO_BACKOFF_BASE"] = "0.05"
+    os.environ["BREVO_BACKOFF_MAX"] = "0.2"
+
+    import db
+    from brevo import BrevoDispatcher, build_contact
+
+    db.init_db()
+    stub = BrevoStub(script={email: steps for email, (steps, *_) in CASES.items()},
+                     hang_s=TIMEOUT_S * 4).start()
+    dispatcher = BrevoDispatcher(api_key="check", api_url=stub.url, max_attempts=MAX_ATTEMPTS)
+    try:
+        # Lease: Eintrag wird beansprucht, der Dispatcher "stirbt" vor dem Senden
+        db.save_report("outbox-lease", {"report_id": "outbox-lease"},
+                       contact=build_contact("lease@example.com", "http://x/r/l", "A", "outbox-lease"))
+        lease_claimed = [c[1]["email"] for c in db.claim_outbox(100, LEASE_S)]
+
+        for i, email in enumerate(CASES):
+            rid = f"outbox-{i}"
+            db.save_report(rid, {"report_id": rid},
+                           contact=build_contact(email, f"http://x/r/{rid}", "A", rid))
+        dispatcher.drain()
+        lease_before_expiry = stub.calls.get("lease@example.com", 0)
+
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            dispatcher.drain()
+            state = _outbox(db)
+            if all(v["status"] != "pending" for v in state.values()):
+                break
+            time.sleep(0.1)
+        state = _outbox(db)
+    finally:
+        dispatcher.stop()
+        stub.stop()
+
+    checks = {}
+    for email, (_, status, attempts, err) in CASES.items():
+        got = state.get(email, {})
+        checks[email] = (got.get("status") == status and got.get("attempts") == attempts
+                         and (err is None or err in (got.get("last_error") or "")))
+    lease = state.get("lease@example.com", {})
+    checks["lease_not_resent_before_expiry"] = lease_claimed == ["lease@example.com"] \
+        and lease_before_expiry == 0
+    checks["lease_redelivered_after_expiry"] = lease.get("status") == "sent" \
+        and lease.get("attempts") == 2
+    checks["no_duplicate_delivery"] = sorted(c["email"] for c in stub.received) == sorted(
+        [e for e, (_, s, *_r) in CASES.items() if s == "sent"] + ["lease@example.com"])
+
+    print_json({"checks": checks, "outbox": state, "stub_calls": stub.calls})
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/check_cache_backend.py
+# ============================================================
+# Mehrere Worker-Prozesse gegen ein geteiltes Cache-Backend
+# (cache_backend.py), so wie mehrere uvicorn-Worker:
+# 1) gleichzeitiges set/get mit Werten verschiedener Größe; jeder
+#    gelesene Wert muss zu seinem Schlüssel passen, das Byte-Budget
+#    wird nach dem Aufräumen eingehalten
+# 2) load_report: ein Worker lädt, die anderen treffen den geteilten
+#    Cache; save_report in einem Worker ist in den anderen nach
+#    REPORT_CACHE_LOCAL_TTL sichtbar
+# 3) PDF-Cache: ein Worker legt ab, die anderen lesen es ohne Disk
+# Endet mit Exit-Code 1, wenn eine Prüfung fehlschlägt.
+#
+#   python -m benchmarks.check_cache_backend
+#   python -m benchmarks.check_cache_backend --workers 8 --backend redis
+# ============================================================
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._common import print_json
+
+LOCAL_TTL = 0.3
+
+
+def _value(key: str, size: int) -> bytes:
+    seed = hashlib.sha256(key.encode("utf-8")).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+def _stress(args):
+    worker, n, keys = args
+    from cache_backend import create_backend, CACHE_BACKEND
+
+    backend = create_backend(CACHE_BACKEND)
+    rng = random.Random(worker)
+    wrong = 0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        key = f"stress:{rng.randrange(keys)}"
+        if rng.random() < 0.3:
+            backend.set(key, _value(key, 1000 + hash(key) % 30000), ttl=60)
+        else:
+            data = backend.get(key)
+            if data is not None and data != _value(key, len(data)):
+                wrong += 1
+    ops = n / (time.perf_counter() - t0)
+    stats = backend.stats()
+    backend.close()
+    return {"worker": worker, "wrong": wrong, "ops_per_s": round(ops), "hits": stats["hits"]}
+
+
+def _reports(args):
+    worker, ids, barrier = args
+    import db
+    from pdf_cache import pdf_cache
+
+    # Worker 0 lädt zuerst (DB -> geteilter Cache), dann die anderen
+    if worker == 0:
+        for rid in ids:
+            db.load_report(rid)
+        pdf_cache.put("check", b"%PDF-check")
+    barrier.wait()
+    seen = [db.load_report(rid) for rid in ids]
+    ok_load = all(p is not None and p["report_id"] == rid for rid, p in zip(ids, seen))
+    pdf_hit = pdf_cache.backend.get("pdf:check") == b"%PDF-check"
+    barrier.wait()
+
+    # Worker 0 ändert einen Report, die anderen müssen es sehen
+    if worker == 0:
+        db.save_report(ids[0], {"report_id": ids[0], "version": 2})
+    barrier.wait()
+    time.sleep(LOCAL_TTL * 1.5)
+    ok_invalidate = (db.load_report(ids[0]) or {}).get("version") == 2
+    return {"worker": worker, "load_ok": ok_load, "pdf_shared": pdf_hit,
+            "invalidation_ok": ok_invalidate, "report_cache": db.report_cache_stats()}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--backend", choices=("sqlite", "redis"), default="sqlite")
+    ap.add_argument("--ops", type=int, default=3000, help="set/get pro Worker")
+    ap.add_argument("--max-mb", type=float, default=2.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # die Worker-Prozesse lesen die Konfiguration beim Import
+        os.environ["CACHE_BACKEND"] = args.backend
+        os.environ["CACHE_SQLITE_PATH"] = str(Path(tmp) / "cache.db")
+        os.environ["CACHE_MAX_MB"] = str(args.max_mb)
+        os.environ["REPORT_CACHE_LOCAL_TTL"] = str(LOCAL_TTL)
+        os.environ["SQLITE_PATH"] = str(Path(tmp) / "reports.db")
+        os.environ["PDF_CACHE_DIR"] = str(Path(tmp) / "pdf_cache")
+
+        import db
+        db.init_db()
+        ids = [f"check-{i}" for i in range(20)]
+        for rid in ids:
+            db.save_report(rid, {"report_id": rid, "version": 1})
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(args.workers) as pool:
+            stress = pool.map(_stress, [(w, args.ops, 400) for w in range(args.workers)])
+        from cache_backend import create_backend
+        backend = create_backend(args.backend)
+        if hasattr(backend, "prune"):
+            backend.prune()
+        after = backend.stats()
+
+        manager = ctx.Manager()
+        barrier = manager.Barrier(args.workers)
+        with ctx.Pool(args.workers) as pool:
+            reports = pool.map(_reports, [(w, ids, barrier) for w in range(args.workers)])
+        manager.shutdown()
+
+    checks = {
+        "values_consistent": all(r["wrong"] == 0 for r in stress),
+        "within_budget": after["max_bytes"] is None or after["bytes"] <= after["max_bytes"],
+        "load_report": all(r["load_ok"] for r in reports),
+        "shared_hits": all(r["report_cache"]["shared_hits"] >= len(ids)
+                           for r in reports if r["worker"] != 0),
+        "pdf_shared": all(r["pdf_shared"] for r in reports),
+        "invalidation": all(r["invalidation_ok"] for r in reports),
+    }
+    print_json({"backend": args.backend, "workers": args.workers, "checks": checks,
+                "stress": stress, "store": after,
+                "report_cache": [r["report_cache"] for r in reports]})
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
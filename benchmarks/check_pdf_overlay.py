@@ -0,0 +1,86 @@
+# benchmarks/check_pdf_overlay.py
+# ============================================================
+# Visueller Vergleich: pdf_overlay.build_pdf_report_overlay gegen
+# pdf_report.build_pdf_report. Beide PDFs werden Seite für Seite
+# gerastert und pixelweise verglichen, dazu Seitenzahl und Text
+# pro Seite (unabhängig von der Zeichenreihenfolge).
+# Braucht PyMuPDF (nur für diesen Check, steht in requirements-bench.txt):
+#
+#   pip install -r requirements-bench.txt
+#   python -m benchmarks.check_pdf_overlay
+#   python -m benchmarks.check_pdf_overlay 50 --dpi 150
+# ============================================================
+
+import argparse
+import random
+import sys
+
+import numpy as np
+
+import pdf_overlay
+import pdf_report
+from benchmarks._common import print_json
+from questions import get_question_set
+from report_builder import build_report_data
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+
+def _payloads(n: int):
+    qs = get_question_set()
+    rng = random.Random(21)
+    out = []
+    for i in range(n):
+        # auch einseitige Profile (alles hoch / alles niedrig)
+        lo, hi = rng.choice([(0, 10), (0, 3), (7, 10), (3, 7)])
+        answers = {q["id"]: str(rng.randint(lo, hi)) for q in qs.questions}
+        r = build_report_data(answers)
+        out.append({"name": "Kunde " * rng.randint(1, 8), "email": f"k{i}@example.com",
+                    "profile_type": r.profile_type,
+                    "ranked": [list(x) for x in r.ranked]})
+    return out
+
+
+def _pages(data: bytes, dpi: int):
+    doc = pymupdf.open(stream=data, filetype="pdf")
+    # Text als sortierte Zeilen: die Reihenfolge im Stream darf abweichen
+    return [(np.frombuffer(p.get_pixmap(dpi=dpi).samples, dtype=np.uint8),
+             sorted(p.get_text().splitlines()))
+            for p in doc]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", type=int, nargs="?", default=20)
+    ap.add_argument("--dpi", type=int, default=100)
+    ap.add_argument("--tolerance", type=int, default=8,
+                    help="max. Abweichung pro Farbkanal (Antialiasing)")
+    args = ap.parse_args()
+    if pymupdf is None:
+        sys.exit("PyMuPDF fehlt: pip install -r requirements-bench.txt (oder pip install pymupdf)")
+
+    failures = []
+    max_diff = 0
+    for i, payload in enumerate(_payloads(args.n)):
+        flow = _pages(pdf_report.build_pdf_report(payload), args.dpi)
+        overlay = _pages(pdf_overlay.build_pdf_report_overlay(payload), args.dpi)
+        if len(flow) != len(overlay):
+            failures.append({"report": i, "pages": [len(flow), len(overlay)]})
+            continue
+        for page, ((px_a, text_a), (px_b, text_b)) in enumerate(zip(flow, overlay), 1):
+            diff = int(np.abs(px_a.astype(np.int16) - px_b.astype(np.int16)).max())
+            max_diff = max(max_diff, diff)
+            if diff > args.tolerance or text_a != text_b:
+                failures.append({"report": i, "page": page, "max_pixel_diff": diff,
+                                 "text_equal": text_a == text_b})
+
+    print_json({"reports": args.n, "dpi": args.dpi, "max_pixel_diff": max_diff,
+                "failures": failures[:20], "ok": not failures})
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/check_submit_dedup.py
+# ============================================================
+# Idempotenz von /submit unter Parallelität: uvicorn mit mehreren
+# Workern (SQLite, Brevo-Stub), je Runde N gleichzeitige, identische
+# Submissions (Doppelklick / Retries):
+# 1) gleiche E-Mail + Antworten (abgeleiteter Key)
+# 2) gleicher Idempotency-Key-Header
+# 3) erneuter Versuch nach Abschluss
+# Erwartet: eine report_id pro Runde, eine Zeile in reports, ein
+# Eintrag in der Outbox und genau ein Kontakt beim Brevo-Stub.
+# Unterschiedliche Antworten bekommen eigene Reports.
+# Endet mit Exit-Code 1, wenn eine Prüfung fehlschlägt.
+#
+#   python -m benchmarks.check_submit_dedup
+#   python -m benchmarks.check_submit_dedup --parallel 32 --workers 4
+# ============================================================
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks._brevo_stub import BrevoStub
+from benchmarks._common import free_port, start_server, random_answers, load_questions, print_json
+
+
+def _fire(url: str, body, parallel: int, headers=None):
+    """parallel gleiche POSTs, möglichst gleichzeitig losgeschickt."""
+    barrier = threading.Barrier(parallel)
+
+    def one(_):
+        barrier.wait()
+        r = requests.post(url, json=body, headers=headers, timeout=60)
+        return r.status_code, (r.json() if r.status_code == 200 else None)
+
+    with ThreadPoolExecutor(parallel) as ex:
+        return list(ex.map(one, range(parallel)))
+
+
+def _round(url: str, body, parallel: int, headers=None):
+    res = _fire(url, body, parallel, headers)
+    ids = {data["report_id"] for status, data in res if status == 200}
+    return {"statuses": sorted({s for s, _ in res}), "report_ids": sorted(ids)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--parallel", type=int, default=16)
+    ap.add_argument("--workers", type=int, default=2)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="pp-dedup-")
+    db_path = os.path.join(tmp, "reports.db")
+    stub = BrevoStub().start()
+    env = {"SQLITE_PATH": db_path, "PDF_CACHE_DIR": os.path.join(tmp, "pdf_cache"),
+           "BREVO_API_KEY": "check", "BREVO_API_URL": stub.url, "PDF_PRERENDER": "0"}
+    port = free_port()
+    proc = start_server(env, port, workers=args.workers)
+    url = f"http://127.0.0.1:{port}/submit"
+    questions = load_questions()
+    rng = random.Random(3)
+
+    def body(email):
+        return {"name": "Check", "email": email, "answers": random_answers(questions, rng)}
+
+    try:
+        same = body("same@example.com")
+        rounds = {"derived_key": _round(url, same, args.parallel)}
+        rounds["retry_after_done"] = _round(url, same, 1)
+        keyed = body("keyed@example.com")
+        rounds["header_key"] = _round(url, keyed, args.parallel, {"Idempotency-Key": "check-1"})
+        # Kontrolle: verschiedene Antworten -> verschiedene Reports
+        distinct = [body("other@example.com") for _ in range(4)]
+        with ThreadPoolExecutor(4) as ex:
+            other_ids = list(ex.map(lambda b: requests.post(url, json=b, timeout=60).json()["report_id"],
+                                    distinct))
+
+        # Outbox abarbeiten lassen
+        deadline = time.time() + 15
+        while time.time() < deadline and len(stub.received) < 6:
+            time.sleep(0.2)
+        time.sleep(0.5)
+    finally:
+        proc.terminate()
+        proc.wait()
+        stub.stop()
+
+    con = sqlite3.connect(db_path)
+    n_reports = con.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+    outbox = dict(con.execute(
+        "SELECT report_id, COUNT(*) FROM brevo_outbox GROUP BY report_id").fetchall())
+    con.close()
+    contacts = {}
+    for c in stub.received:
+        contacts[c.get("email")] = contacts.get(c.get("email"), 0) + 1
+
+    first = rounds["derived_key"]["report_ids"]
+    checks = {
+        "all_ok": all(r["statuses"] == [200] for r in rounds.values()),
+        "one_id_per_round": all(len(r["report_ids"]) == 1 for r in rounds.values()),
+        "retry_same_id": rounds["retry_after_done"]["report_ids"] == first,
+        "distinct_answers_distinct_ids": len(set(other_ids)) == len(other_ids),
+        "reports_rows": n_reports == 2 + len(other_ids),
+        "one_outbox_entry_each": len(outbox) == n_reports and set(outbox.values()) == {1},
+        "one_contact_each": contacts == {"same@example.com": 1, "keyed@example.com": 1,
+                                         "other@example.com": len(other_ids)},
+    }
+    print_json({"parallel": args.parallel, "workers": args.workers, "checks": checks,
+                "rounds": rounds, "reports_rows": n_reports, "brevo_contacts": contacts})
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
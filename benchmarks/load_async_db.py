@@ -0,0 +1,145 @@
+# benchmarks/load_async_db.py
+# ============================================================
+# Lasttest: ein uvicorn-Worker, steigende Parallelität auf
+# /r/{id} und /submit. Mit Async-DB-Zugriff sollte der Durchsatz
+# mit der Parallelität wachsen, statt auf dem Niveau von
+# Parallelität 1 zu verharren.
+#
+# Gegen lokales SQLite ist eine Abfrage so schnell, dass der Worker
+# CPU-gebunden ist (Templates, JSON). Deshalb misst der Teil
+# "event_loop" zusätzlich im Prozess mit simulierter Netzwerk-Latenz
+# (--rtt-ms), wie sich blockierende und awaitete DB-Aufrufe bei
+# gleicher Parallelität verhalten.
+#
+#   python -m benchmarks.load_async_db                 # SQLite (temp)
+#   DATABASE_URL=... python -m benchmarks.load_async_db
+# ============================================================
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks._common import (
+    free_port, start_server, summarize, random_answers, load_questions, print_json
+)
+
+
+def _run_level(base: str, path_fn, method: str, body_fn, concurrency: int, duration: float):
+    stop = time.perf_counter() + duration
+    lat, lock = [], threading.Lock()
+
+    def worker():
+        s = requests.Session()
+        local = []
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            if method == "GET":
+                r = s.get(base + path_fn(), timeout=30)
+            else:
+                r = s.post(base + path_fn(), json=body_fn(), timeout=30)
+            r.raise_for_status()
+            local.append(time.perf_counter() - t0)
+        with lock:
+            lat.extend(local)
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as ex:
+        for f in [ex.submit(worker) for _ in range(concurrency)]:
+            f.result()
+    return summarize(lat, time.perf_counter() - t_start)
+
+
+def _event_loop_comparison(levels, rtt_ms: float, requests_per_level: int = 200):
+    import db
+    from report_cache import report_cache
+
+    db.init_db()
+    db.save_report("load-test", {"report_id": "load-test"})
+    real_load = db._db_load_report
+    cache_size, report_cache.max_entries = report_cache.max_entries, 0   # jede Abfrage bis zur DB
+
+    def slow_load(report_id):
+        time.sleep(rtt_ms / 1000.0)   # simulierte Round-Trip-Zeit zur DB
+        return real_load(report_id)
+
+    db._db_load_report = slow_load   # load_report_async (SQLite) ruft _db_load_report im Thread
+
+    async def blocking():
+        db.load_report("load-test")
+
+    async def awaited():
+        await db.load_report_async("load-test")
+
+    async def run(handler, concurrency):
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with sem:
+                await handler()
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(requests_per_level)])
+        return round(requests_per_level / (time.perf_counter() - t0), 1)
+
+    out = {}
+    try:
+        for c in levels:
+            out[c] = {
+                "blocking_req_per_s": asyncio.run(run(blocking, c)),
+                "async_req_per_s": asyncio.run(run(awaited, c)),
+            }
+    finally:
+        db._db_load_report = real_load
+        report_cache.max_entries = cache_size
+    return {"rtt_ms": rtt_ms, "levels": out}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--levels", default="1,4,16,64")
+    ap.add_argument("--duration", type=float, default=5.0)
+    ap.add_argument("--rtt-ms", type=float, default=5.0)
+    args = ap.parse_args()
+    levels = [int(x) for x in args.levels.split(",")]
+
+    tmp = tempfile.mkdtemp(prefix="pp-load-")
+    env = {"BREVO_API_KEY": ""}
+    if not os.getenv("DATABASE_URL"):
+        env["SQLITE_PATH"] = os.path.join(tmp, "reports.db")
+        os.environ["SQLITE_PATH"] = env["SQLITE_PATH"]
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    proc = start_server(env, port, workers=1)
+    try:
+        questions = load_questions()
+        body = lambda: {"name": "Load", "email": "", "answers": random_answers(questions)}
+        ids = [requests.post(base + "/submit", json=body(), timeout=30).json()["report_id"]
+               for _ in range(50)]
+        counter = iter(range(10**9))
+        results = {"db": "postgres" if os.getenv("DATABASE_URL") else "sqlite", "levels": {}}
+        for c in levels:
+            results["levels"][c] = {
+                "show_result": _run_level(base, lambda: f"/r/{ids[next(counter) % len(ids)]}",
+                                          "GET", None, c, args.duration),
+                "submit": _run_level(base, lambda: "/submit", "POST", body, c, args.duration),
+            }
+        base_tp = results["levels"][levels[0]]["show_result"]["throughput_per_s"]
+        for c, r in results["levels"].items():
+            r["show_result"]["speedup_vs_first_level"] = round(
+                r["show_result"]["throughput_per_s"] / base_tp, 2) if base_tp else None
+        if not os.getenv("DATABASE_URL"):
+            results["event_loop"] = _event_loop_comparison(levels, args.rtt_ms)
+        print_json(results)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
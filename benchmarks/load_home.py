@@ -0,0 +1,87 @@
+# benchmarks/load_home.py
+# ============================================================
+# Lasttest GET /: vorgerenderter Fragebogen (HOME_STATIC=1) gegen
+# Jinja pro Besuch (HOME_STATIC=0). Je ein uvicorn-Worker, gleiche
+# Parallelität; gemessen werden Durchsatz, Latenz und Bytes pro
+# Antwort (mit gzip/br, falls der Client es anbietet).
+#
+#   python -m benchmarks.load_home
+#   python -m benchmarks.load_home --levels 1,8,32 --duration 5
+# ============================================================
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks._common import free_port, start_server, summarize, print_json
+
+
+def _run_level(url: str, headers, concurrency: int, duration: float):
+    stop = time.perf_counter() + duration
+    lat, sizes, lock = [], [], threading.Lock()
+
+    def worker():
+        s = requests.Session()
+        local, local_sizes = [], []
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            r = s.get(url, headers=headers, timeout=30, stream=True)
+            raw = r.raw.read()    # Bytes wie über die Leitung (nicht dekomprimiert)
+            r.raise_for_status()
+            local.append(time.perf_counter() - t0)
+            local_sizes.append(len(raw))
+        with lock:
+            lat.extend(local)
+            sizes.extend(local_sizes)
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as ex:
+        for f in [ex.submit(worker) for _ in range(concurrency)]:
+            f.result()
+    res = summarize(lat, time.perf_counter() - t_start)
+    res["bytes_per_response"] = round(sum(sizes) / len(sizes)) if sizes else 0
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--levels", default="1,8,32")
+    ap.add_argument("--duration", type=float, default=4.0)
+    args = ap.parse_args()
+    levels = [int(x) for x in args.levels.split(",")]
+
+    tmp = tempfile.mkdtemp(prefix="pp-home-")
+    results = {}
+    for mode in ("0", "1"):
+        env = {"BREVO_API_KEY": "", "HOME_STATIC": mode,
+               "SQLITE_PATH": os.path.join(tmp, "reports.db")}
+        port = free_port()
+        proc = start_server(env, port, workers=1)
+        try:
+            url = f"http://127.0.0.1:{port}/"
+            out = {}
+            for c in levels:
+                out[c] = {
+                    "identity": _run_level(url, {"Accept-Encoding": "identity"}, c, args.duration),
+                    "compressed": _run_level(url, {"Accept-Encoding": "gzip, br"}, c, args.duration),
+                }
+            results["static" if mode == "1" else "jinja"] = out
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    for c in levels:
+        for enc in ("identity", "compressed"):
+            base = results["jinja"][c][enc]["throughput_per_s"]
+            results["static"][c][enc]["speedup"] = (
+                round(results["static"][c][enc]["throughput_per_s"] / base, 2) if base else None)
+    print_json(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+# benchmarks/suite.py
+# ============================================================
+# Benchmark-Suite für die ganze Request-Pipeline, offline:
+# - SQLite in einem Temp-Verzeichnis (oder DATABASE_URL auf ein
+#   lokales Postgres), PDF-Cache im Temp-Verzeichnis
+# - Brevo-Stub statt api.brevo.com (benchmarks/_brevo_stub.py)
+# - Endpoints im Prozess über einen ASGI-Client (httpx), inkl. Lifespan
+#
+# Fälle: build_report_data, decide_profile_type, build_pdf_report,
+# save_report / load_report (mit und ohne Cache), POST /submit, GET /r/{id},
+# GET /report/{id}.pdf (kalt = neu rendern, warm = aus dem Cache).
+# Ergebnis als JSON mit p50/p95/p99 und Durchsatz pro Fall.
+#
+#   python -m benchmarks.suite --out base.json
+#   python -m benchmarks.suite --quick --only pdf endpoints
+#   python -m benchmarks.suite --compare base.json new.json --threshold 0.1
+#
+# --compare meldet Regressionen (p50/p95 langsamer oder Durchsatz
+# niedriger als die Schwelle) und endet dann mit Exit-Code 1.
+# Braucht httpx für die Endpoint-Fälle (pip install httpx).
+# ============================================================
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List
+
+from benchmarks._common import REPO_DIR, summarize, time_calls, random_answers, print_json
+
+GROUPS = ("scoring", "pdf", "db", "endpoints")
+
+# Anzahl Aufrufe pro Fall (normal, --quick)
+SIZES = {
+    "build_report_data": (2000, 200),
+    "decide_profile_type": (20000, 2000),
+    "build_pdf_report": (20, 3),
+    "save_report": (500, 50),
+    "load_report": (2000, 200),
+    "load_report uncached": (2000, 200),
+    "POST /submit": (300, 30),
+    "GET /r/{id}": (500, 50),
+    "GET /report/{id}.pdf cold": (10, 2),
+    "GET /report/{id}.pdf warm": (300, 30),
+}
+
+
+def _env(tmp: Path, stub_url: str):
+    # vor dem ersten Import der App-Module setzen (die lesen ENV beim Import)
+    if not os.getenv("DATABASE_URL"):
+        os.environ["SQLITE_PATH"] = str(tmp / "reports.db")
+    os.environ["PDF_CACHE_DIR"] = str(tmp / "pdf_cache")
+    os.environ["BREVO_API_KEY"] = "bench"
+    os.environ["BREVO_API_URL"] = stub_url
+    os.environ.setdefault("PDF_WORKERS", "1")
+
+
+def _payloads(n: int, rng: random.Random):
+    from questions import get_question_set
+    from report_builder import build_report_data
+
+    qs = get_question_set()
+    out = []
+    for i in range(n):
+        answers = random_answers(qs.questions, rng)
+        r = build_report_data(answers)
+        out.append(({"name": f"Kunde {i}", "email": f"k{i}@example.com",
+                     "profile_type": r.profile_type, "ranked": [list(x) for x in r.ranked],
+                     "percents": r.percents}, answers))
+    return out
+
+
+# ============================================================
+# FÄLLE
+# ============================================================
+def _bench_scoring(size, rng) -> Dict[str, Any]:
+    from questions import get_question_set
+    from report_builder import build_report_data, decide_profile_type
+
+    qs = get_question_set()
+    answers = [random_answers(qs.questions, rng) for _ in range(64)]
+    percents = [build_report_data(a).percents for a in answers]
+    it = iter(range(10 ** 9))
+    return {
+        "build_report_data": time_calls(lambda: build_report_data(answers[next(it) % 64]),
+                                        size("build_report_data")),
+        "decide_profile_type": time_calls(lambda: decide_profile_type(percents[next(it) % 64]),
+                                          size("decide_profile_type")),
+    }
+
+
+def _bench_pdf(size, rng) -> Dict[str, Any]:
+    from pdf_report import build_pdf_report
+
+    payloads = [p for p, _ in _payloads(16, rng)]
+    it = iter(range(10 ** 9))
+    return {"build_pdf_report": time_calls(lambda: build_pdf_report(payloads[next(it) % 16]),
+                                           size("build_pdf_report"), warmup=1)}
+
+
+def _bench_db(size, rng) -> Dict[str, Any]:
+    import db
+
+    db.init_db()
+    items = _payloads(64, rng)
+    ids: List[str] = []
+
+    def save():
+        payload, answers = items[len(ids) % 64]
+        rid = f"{rng.getrandbits(128):032x}"
+        db.save_report(rid, payload, answers=answers)
+        ids.append(rid)
+
+    res = {"save_report": time_calls(save, size("save_report"))}
+    it = iter(range(10 ** 9))
+    res["load_report"] = time_calls(lambda: db.load_report(ids[next(it) % len(ids)]),
+                                    size("load_report"))
+    # an report_cache.py vorbei direkt zur DB
+    res["load_report uncached"] = time_calls(lambda: db._db_load_report(ids[next(it) % len(ids)]),
+                                             size("load_report uncached"))
+    return res
+
+
+async def _time_async(fn, n: int, warmup: int = 3) -> Dict[str, Any]:
+    for _ in range(warmup):
+        await fn()
+    lat = []
+    t_start = time.perf_counter()
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await fn()
+        lat.append(time.perf_counter() - t0)
+    return summarize(lat, time.perf_counter() - t_start)
+
+
+async def _bench_endpoints(size, rng) -> Dict[str, Any]:
+    import httpx
+    from app import app
+    from questions import get_question_set
+
+    qs = get_question_set()
+    answers = [random_answers(qs.questions, rng) for _ in range(64)]
+    ids: List[str] = []
+    res = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            async def submit():
+                r = await c.post("/submit", json={"name": "Bench", "email": f"b{len(ids)}@example.com",
+                                                  "answers": answers[len(ids) % 64]})
+                r.raise_for_status()
+                ids.append(r.json()["report_id"])
+
+            async def result_page():
+                r = await c.get(f"/r/{ids[rng.randrange(len(ids))]}")
+                r.raise_for_status()
+
+            fresh = iter(range(10 ** 9))
+
+            async def pdf_cold():
+                # jede ID nur einmal -> Rendering im Worker
+                r = await c.get(f"/report/{ids[next(fresh)]}.pdf")
+                r.raise_for_status()
+
+            async def pdf_warm():
+                r = await c.get(f"/report/{ids[0]}.pdf")
+                r.raise_for_status()
+
+            res["POST /submit"] = await _time_async(submit, size("POST /submit"))
+            res["GET /r/{id}"] = await _time_async(result_page, size("GET /r/{id}"))
+            res["GET /report/{id}.pdf cold"] = await _time_async(
+                pdf_cold, min(size("GET /report/{id}.pdf cold"), len(ids) - 2), warmup=1)
+            res["GET /report/{id}.pdf warm"] = await _time_async(pdf_warm, size("GET /report/{id}.pdf warm"))
+    return res
+
+
+# ============================================================
+# LAUF / VERGLEICH
+# ============================================================
+def _meta() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "db": "postgres" if os.getenv("DATABASE_URL") else "sqlite",
+    }
+
+
+def run(groups, quick: bool, seed: int) -> Dict[str, Any]:
+    from benchmarks._brevo_stub import BrevoStub
+
+    def size(name):
+        return SIZES[name][1 if quick else 0]
+
+    stub = BrevoStub().start()
+    with tempfile.TemporaryDirectory() as tmp:
+        _env(Path(tmp), stub.url)
+        rng = random.Random(seed)
+        cases: Dict[str, Any] = {}
+        if "scoring" in groups:
+            cases.update(_bench_scoring(size, rng))
+        if "pdf" in groups:
+            cases.update(_bench_pdf(size, rng))
+        if "db" in groups:
+            cases.update(_bench_db(size, rng))
+        if "endpoints" in groups:
+            cases.update(asyncio.run(_bench_endpoints(size, rng)))
+    stub.stop()
+    return {"meta": {**_meta(), "quick": quick, "seed": seed}, "cases": cases}
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    rows, regressions = {}, []
+    for name, b in base["cases"].items():
+        n = new["cases"].get(name)
+        if n is None:
+            continue
+        row = {
+            "p50_ratio": round(n["p50_ms"] / b["p50_ms"], 3) if b["p50_ms"] else None,
+            "p95_ratio": round(n["p95_ms"] / b["p95_ms"], 3) if b["p95_ms"] else None,
+            "throughput_ratio": (round(n["throughput_per_s"] / b["throughput_per_s"], 3)
+                                 if b["throughput_per_s"] else None),
+        }
+        slower = [k for k in ("p50_ratio", "p95_ratio") if row[k] and row[k] > 1 + threshold]
+        if row["throughput_ratio"] and row["throughput_ratio"] < 1 - threshold:
+            slower.append("throughput_ratio")
+        row["regression"] = bool(slower)
+        if slower:
+            regressions.append({"case": name, "metrics": slower})
+        rows[name] = row
+    return {
+        "base": base.get("meta", {}).get("commit"),
+        "new": new.get("meta", {}).get("commit"),
+        "threshold": threshold,
+        "cases": rows,
+        "regressions": regressions,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark-Suite (offline)")
+    ap.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    ap.add_argument("--quick", action="store_true", help="wenige Aufrufe pro Fall (Smoke-Test)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", help="Ergebnis zusätzlich als Datei speichern")
+    ap.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="zwei Ergebnisdateien vergleichen")
+    ap.add_argument("--threshold", type=float, default=0.10, help="erlaubte Verschlechterung (0.10 = 10 %%)")
+    args = ap.parse_args()
+
+    if args.compare:
+        base, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in args.compare)
+        result = compare(base, new, args.threshold)
+        print_json(result)
+        sys.exit(1 if result["regressions"] else 0)
+
+    result = run(args.only, args.quick, args.seed)
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print_json(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# brevo.py
+# ============================================================
+# Brevo-Kontaktsync über eine Outbox (Tabelle brevo_outbox, db.py)
+# /submit schreibt den Kontakt in derselben Transaktion wie den
+# Report; der Dispatcher hier stellt ihn im Hintergrund zu.
+# ============================================================
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import db
+from metrics import BREVO_REQUEST_SECONDS
+
+# ============================================================
+# ENV
+# ============================================================
+BREVO_API_KEY = os.getenv("BREVO_API_KEY")
+BREVO_LIST_ID = int(os.getenv("BREVO_LIST_ID", "3"))
+BREVO_API_URL = os.getenv("BREVO_API_URL", "https://api.brevo.com/v3").rstrip("/")
+
+BATCH_SIZE = int(os.getenv("BREVO_BATCH_SIZE", "50"))
+CONCURRENCY = int(os.getenv("BREVO_CONCURRENCY", "4"))
+POLL_INTERVAL = float(os.getenv("BREVO_POLL_INTERVAL", "2"))      # Sekunden
+MAX_ATTEMPTS = int(os.getenv("BREVO_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE = float(os.getenv("BREVO_BACKOFF_BASE", "5"))        # Sekunden
+BACKOFF_MAX = float(os.getenv("BREVO_BACKOFF_MAX", "3600"))
+REQUEST_TIMEOUT = float(os.getenv("BREVO_TIMEOUT", "10"))
+LEASE_S = REQUEST_TIMEOUT * 3 + 30
+
+
+def build_contact(email: str, result_url: str, profile_type: str, report_id: str) -> Dict[str, Any]:
+    return {
+        "email": email,
+        "attributes": {
+            "RESULT_URL": result_url,
+            "PROFILE_TYPE": profile_type,
+            "REPORT_ID": report_id
+        },
+        "listIds": [BREVO_LIST_ID],
+        "updateEnabled": True
+    }
+
+
+def backoff_delay(attempts: int) -> float:
+    """Exponentiell mit Jitter: 5s, 10s, 20s, ... bis BACKOFF_MAX."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _error_kind(err: str) -> str:
+    """"HTTP 503: <Body>" -> "HTTP 503", "ReadTimeout(...)" -> "ReadTimeout"."""
+    return err.split(":", 1)[0].split("(", 1)[0]
+
+
+class BrevoDispatcher:
+    """
+    Hintergrund-Thread, der fällige Outbox-Einträge in Batches abholt
+    und parallel über eine gepoolte requests.Session (Keep-Alive) an
+    Brevo sendet.
+
+    - 2xx                   -> sent
+    - 429 / 5xx / Netzwerk  -> Retry mit Backoff
+    - andere 4xx            -> dead (Dead-Letter, kein Retry)
+    - MAX_ATTEMPTS erreicht -> dead
+    """
+
+    def __init__(self, api_key: str = None, api_url: str = None,
+                 batch_size: int = BATCH_SIZE, concurrency: int = CONCURRENCY,
+                 poll_interval: float = POLL_INTERVAL, max_attempts: int = MAX_ATTEMPTS):
+        self.api_key = api_key or BREVO_API_KEY
+        self.api_url = (api_url or BREVO_API_URL).rstrip("/")
+        self.batch_size = batch_size
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "accept": "application/json",
+            "api-key": self.api_key or "",
+            "content-type": "application/json",
+        })
+        self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="brevo")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------- Zustellung ----------------
+    def _send(self, contact: Dict[str, Any]) -> Tuple[str, str]:
+        t0 = time.perf_counter()
+        outcome, err = self._post(contact)
+        BREVO_REQUEST_SECONDS.labels(outcome).observe(time.perf_counter() - t0)
+        return outcome, err
+
+    def _post(self, contact: Dict[str, Any]) -> Tuple[str, str]:
+        try:
+            r = self.session.post(f"{self.api_url}/contacts", json=contact, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            return "retry", repr(e)
+        if 200 <= r.status_code < 300:
+            return "sent", ""
+        err = f"HTTP {r.status_code}: {r.text[:500]}"
+        if r.status_code == 429 or r.status_code >= 500:
+            return "retry", err
+        return "dead", err
+
+    def dispatch_once(self) -> int:
+        """Verarbeitet einen Batch. Gibt die Anzahl der Einträge zurück."""
+        batch = db.claim_outbox(self.batch_size, LEASE_S)
+        if not batch:
+            return 0
+        results = self._executor.map(lambda e: self._send(e[1]), batch)
+        sent = []
+        for (entry_id, _, attempts), (outcome, err) in zip(batch, results):
+            if outcome == "sent":
+                sent.append(entry_id)
+                continue
+            # nur Status und Versuch loggen: der Antworttext kann Kontaktdaten
+            # enthalten und steht gekürzt nur in brevo_outbox.last_error
+            print(f"BREVO {_error_kind(err)}: Eintrag {entry_id}, Versuch {attempts}")
+            if outcome == "retry" and attempts < self.max_attempts:
+                db.retry_outbox(entry_id, err, time.time() + backoff_delay(attempts))
+            else:
+                print("BREVO dead-letter:", entry_id)
+                db.dead_letter_outbox(entry_id, err)
+        db.complete_outbox(sent)
+        return len(batch)
+
+    def drain(self) -> int:
+        """Verarbeitet Batches, bis nichts mehr fällig ist."""
+        total = 0
+        while True:
+            n = self.dispatch_once()
+            total += n
+            if n < self.batch_size:
+                return total
+
+    # ---------------- Thread ----------------
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception as e:
+                print("BREVO dispatcher exception:", repr(e))
+            self._wake.wait(self.poll_interval)
+
+    def wake(self):
+        """Nach einem neuen Outbox-Eintrag: sofort zustellen statt auf Poll warten."""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="brevo-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._executor.shutdown(wait=False)
+        self.session.close()
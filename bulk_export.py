@@ -0,0 +1,308 @@
+# bulk_export.py
+# ============================================================
+# Viele Report-PDFs auf einmal (z.B. alle Reports einer Kohorte)
+# - Payloads gebündelt aus der DB (db.load_reports, eine Abfrage pro Batch)
+# - Rendering parallel auf allen Kernen (wie pdf_worker, inkl. PDF_RENDER_MODE)
+# - fertige PDFs aus dem PDF-Cache werden nicht neu gerendert
+# - Ausgabe als ZIP, das Stück für Stück geschrieben/gestreamt wird;
+#   im Speicher sind nur ein Batch Payloads und die PDFs im Fenster
+# - alternativ ein zusammengeführtes PDF (braucht pypdf, hält alle
+#   Seiten bis zum Schluss im Speicher -> nur für kleine Kohorten)
+#
+#   python bulk_export.py --ids ID1 ID2 ... --out kohorte.zip
+#   python bulk_export.py --ids-file ids.txt --workers 8 --out kohorte.zip
+#   python bulk_export.py --email-like '%@firma.de' --format pdf --out kohorte.pdf
+#
+# HTTP: POST /export (siehe app.py, nur mit EXPORT_TOKEN)
+# ============================================================
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+BATCH_SIZE = 200
+
+
+# ============================================================
+# ZIP OHNE SEEK
+# ============================================================
+class _ChunkWriter(io.RawIOBase):
+    """Nicht-seekbares Ziel für ZipFile: sammelt die Bytes bis drain()."""
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+class ZipStream:
+    """
+    ZIP, das nach jeder Datei die fertigen Bytes herausgibt (Data
+    Descriptors statt Zurückspringen). PDFs sind schon komprimiert ->
+    ZIP_STORED.
+    """
+    def __init__(self):
+        self._out = _ChunkWriter()
+        self._zip = zipfile.ZipFile(self._out, "w", compression=zipfile.ZIP_STORED)
+
+    def add(self, name: str, data: bytes) -> bytes:
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        self._zip.writestr(info, data)
+        return self._out.drain()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._out.drain()
+
+
+def _entry_name(report_id: str) -> str:
+    return f"{report_id}.pdf"
+
+
+def _missing_note(missing: List[str]) -> bytes:
+    return ("Nicht gefunden:\n" + "\n".join(missing) + "\n").encode("utf-8")
+
+
+def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _cached_pdf(payload: Dict[str, Any]) -> Optional[bytes]:
+    from pdf_cache import cache_key, pdf_cache
+
+    found = pdf_cache.lookup(cache_key(payload))
+    if isinstance(found, Path):
+        try:
+            return found.read_bytes()
+        except FileNotFoundError:
+            return None
+    return found
+
+
+# ============================================================
+# RENDERING (CLI, eigener Prozess-Pool)
+# ============================================================
+def render_reports(report_ids: List[str], workers: int, batch_size: int = BATCH_SIZE,
+                   use_cache: bool = True) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """
+    -> (report_id, PDF-Bytes oder None für unbekannte IDs), in Eingabereihenfolge.
+    Höchstens 2 x workers PDFs sind gleichzeitig unterwegs.
+    """
+    import db
+    from pdf_worker import _render, _warm_worker
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_warm_worker) as ex:
+        window: "deque[Tuple[str, Any]]" = deque()
+
+        def resolve(item):
+            rid, pending = item
+            if isinstance(pending, Future):
+                pending = pending.result()[0]
+            return rid, pending
+
+        for batch in _chunks(report_ids, batch_size):
+            payloads = db.load_reports(batch)
+            for rid in batch:
+                payload = payloads.get(rid)
+                if payload is None:
+                    window.append((rid, None))
+                else:
+                    cached = _cached_pdf(payload) if use_cache else None
+                    window.append((rid, cached if cached is not None else ex.submit(_render, payload)))
+                while len(window) > 2 * workers:
+                    yield resolve(window.popleft())
+        while window:
+            yield resolve(window.popleft())
+
+
+def write_zip(results: Iterable[Tuple[str, Optional[bytes]]], out,
+              progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    zs = ZipStream()
+    done, size, missing = 0, 0, []
+    for rid, data in results:
+        if data is None:
+            missing.append(rid)
+        else:
+            chunk = zs.add(_entry_name(rid), data)
+            out.write(chunk)
+            size += len(data)
+        done += 1
+        if progress:
+            progress(done, len(missing))
+    if missing:
+        out.write(zs.add("fehlend.txt", _missing_note(missing)))
+    out.write(zs.close())
+    return {"pdfs": done - len(missing), "missing": missing, "pdf_bytes": size}
+
+
+def write_merged_pdf(results: Iterable[Tuple[str, Optional[bytes]]], out,
+                     progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise SystemExit("Für --format pdf wird pypdf gebraucht: "
+                         "pip install -r requirements-bench.txt (oder pip install pypdf)")
+    writer = PdfWriter()
+    done, size, missing = 0, 0, []
+    for rid, data in results:
+        if data is None:
+            missing.append(rid)
+        else:
+            writer.append(io.BytesIO(data))
+            size += len(data)
+        done += 1
+        if progress:
+            progress(done, len(missing))
+    writer.write(out)
+    return {"pdfs": done - len(missing), "missing": missing, "pdf_bytes": size}
+
+
+# ============================================================
+# HTTP (app.py): über den PdfRenderer der App
+# ============================================================
+async def _next_pdf(window: "deque[Tuple[str, asyncio.Future]]",
+                    errors: List[str]) -> Tuple[str, Optional[bytes]]:
+    """Ältestes PDF aus dem Fenster; Fehler landen in errors statt den Export abzubrechen."""
+    rid, fut = window.popleft()
+    try:
+        return rid, await fut
+    except Exception as e:
+        errors.append(f"{rid}: {type(e).__name__}: {e}")
+        return rid, None
+
+
+async def zip_export_async(report_ids: List[str], renderer, batch_size: int = BATCH_SIZE):
+    """
+    Async-Generator für StreamingResponse. Rendert über `renderer`
+    (Cache, laufende Jobs und Concurrency-Limit werden mit den normalen
+    Downloads geteilt). Fehlgeschlagene Renderings stehen in fehler.txt,
+    das Archiv bleibt vollständig lesbar.
+    """
+    import db
+    from pdf_cache import cache_key
+
+    zs = ZipStream()
+    missing: List[str] = []
+    errors: List[str] = []
+    window: "deque[Tuple[str, asyncio.Future]]" = deque()
+    t0 = time.perf_counter()
+    done = 0
+    try:
+        for batch in _chunks(report_ids, batch_size):
+            payloads = await asyncio.to_thread(db.load_reports, batch)
+            for rid in batch:
+                payload = payloads.get(rid)
+                if payload is None:
+                    missing.append(rid)
+                    continue
+                window.append((rid, asyncio.ensure_future(renderer.get(cache_key(payload), payload))))
+                while len(window) > 2 * renderer.max_concurrency:
+                    rid_done, data = await _next_pdf(window, errors)
+                    if data is not None:
+                        yield zs.add(_entry_name(rid_done), data)
+                        done += 1
+        while window:
+            rid_done, data = await _next_pdf(window, errors)
+            if data is not None:
+                yield zs.add(_entry_name(rid_done), data)
+                done += 1
+        if missing:
+            yield zs.add("fehlend.txt", _missing_note(missing))
+        if errors:
+            yield zs.add("fehler.txt", ("Nicht erzeugt:\n" + "\n".join(errors) + "\n").encode("utf-8"))
+        yield zs.close()
+    finally:
+        # Abbruch (Client weg, Fehler beim Laden): offene Jobs nicht liegen lassen
+        for _, fut in window:
+            fut.cancel()
+        if window:
+            await asyncio.gather(*(fut for _, fut in window), return_exceptions=True)
+    print(f"[export] {done} PDFs, {len(missing)} fehlend, {len(errors)} Fehler, "
+          f"{time.perf_counter() - t0:.1f}s")
+
+
+# ============================================================
+# CLI
+# ============================================================
+def _read_ids(args) -> List[str]:
+    import db
+
+    ids: List[str] = list(args.ids or [])
+    if args.ids_file:
+        text = Path(args.ids_file).read_text(encoding="utf-8")
+        ids.extend(line.strip() for line in text.splitlines() if line.strip())
+    if args.email_like:
+        ids.extend(db.find_report_ids(args.email_like, args.limit))
+    # Duplikate raus, Reihenfolge behalten
+    return list(dict.fromkeys(ids))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Viele Report-PDFs als ZIP oder ein PDF exportieren")
+    ap.add_argument("--ids", nargs="*", help="report_ids")
+    ap.add_argument("--ids-file", help="Datei mit einer report_id pro Zeile")
+    ap.add_argument("--email-like", help="SQL-LIKE-Muster auf die E-Mail, z.B. '%%@firma.de'")
+    ap.add_argument("--limit", type=int, help="max. Treffer für --email-like")
+    ap.add_argument("--format", choices=("zip", "pdf"), default="zip")
+    ap.add_argument("--out", required=True, help="Zieldatei, '-' = stdout")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    ap.add_argument("--no-cache", action="store_true", help="PDF-Cache nicht verwenden")
+    args = ap.parse_args()
+
+    ids = _read_ids(args)
+    if not ids:
+        sys.exit("Keine report_ids (--ids, --ids-file oder --email-like).")
+
+    t0 = time.perf_counter()
+
+    def progress(done: int, missing: int):
+        if done % 25 == 0 or done == len(ids):
+            rate = done / max(time.perf_counter() - t0, 1e-9)
+            print(f"[export] {done}/{len(ids)} ({missing} fehlend), {rate:.1f} PDFs/s",
+                  file=sys.stderr, flush=True)
+
+    results = render_reports(ids, max(1, args.workers), args.batch_size, not args.no_cache)
+    write = write_zip if args.format == "zip" else write_merged_pdf
+    if args.out == "-":
+        summary = write(results, sys.stdout.buffer, progress)
+    else:
+        tmp = Path(args.out).with_suffix(".part")
+        with open(tmp, "wb") as f:
+            summary = write(results, f, progress)
+        os.replace(tmp, args.out)
+
+    seconds = time.perf_counter() - t0
+    print(json.dumps({
+        **summary,
+        "requested": len(ids),
+        "seconds": round(seconds, 3),
+        "pdfs_per_s": round(summary["pdfs"] / seconds, 2) if seconds > 0 else None,
+        "workers": args.workers,
+        "format": args.format,
+    }, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+# cache_backend.py
+# ============================================================
+# Austauschbares Cache-Backend für Report-Payloads und PDFs
+# - "memory": LRU im Prozess mit Byte-Budget (Standard, wie bisher)
+# - "sqlite": eine SQLite-Datei (WAL), von allen uvicorn-Workern
+#   auf demselben Host geteilt; Eviction nach Byte-Budget (LRU
+#   über die letzte Zugriffszeit, grob auf CACHE_TOUCH_S genau)
+# - "redis":  Redis-kompatibler Server (braucht pip install redis);
+#   Eviction über maxmemory + allkeys-lru des Servers
+#
+# Werte sind immer Bytes (Payloads als JSON, PDFs roh), Schlüssel
+# mit Präfix ("report:", "pdf:"). Jeder Eintrag hat eine TTL.
+#
+#   CACHE_BACKEND=sqlite CACHE_SQLITE_PATH=/tmp/pp-cache.db
+#   CACHE_BACKEND=redis  CACHE_REDIS_URL=redis://127.0.0.1:6379/0
+# ============================================================
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ============================================================
+# KONFIGURATION (ENV)
+# ============================================================
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_MAX_BYTES = int(float(os.getenv("CACHE_MAX_MB", "256")) * 1024 * 1024)
+CACHE_SQLITE_PATH = Path(os.getenv("CACHE_SQLITE_PATH") or BASE_DIR / "data" / "cache.db")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+# Zugriffszeit höchstens so oft aktualisieren (spart Schreibzugriffe beim Lesen)
+CACHE_TOUCH_S = float(os.getenv("CACHE_TOUCH_S", "30"))
+
+
+class CacheBackend:
+    """Schnittstelle: Bytes unter einem Schlüssel, mit TTL in Sekunden."""
+    name = ""
+    shared = False      # True = für alle Prozesse sichtbar
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, *keys: str):
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# ============================================================
+# MEMORY
+# ============================================================
+class MemoryBackend(CacheBackend):
+    name = "memory"
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()   # key -> (Ablauf, Wert)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if len(value) > self.max_bytes:
+            return
+        expires = time.monotonic() + ttl if ttl else float("inf")
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (expires, value)
+            self._size += len(value)
+            self._stats["sets"] += 1
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def _drop(self, key: str):
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._size -= len(old[1])
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": self.name, **self._stats, "entries": len(self._data),
+                    "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+# ============================================================
+# SQLITE (geteilt über Prozesse auf einem Host)
+# ============================================================
+class SQLiteBackend(CacheBackend):
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: Path = CACHE_SQLITE_PATH, max_bytes: int = CACHE_MAX_BYTES,
+                 touch_s: float = CACHE_TOUCH_S):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.touch_s = touch_s
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        # grobe Summe der Bytes seit dem letzten Aufräumen (pro Prozess)
+        self._written_since_prune = 0
+        con = self._con()
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        con.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)")
+
+    def _con(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            # autocommit: jede Anweisung ist eine eigene kurze Transaktion
+            con = sqlite3.connect(str(self.path), timeout=10, isolation_level=None,
+                                  check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def _count(self, name: str, n: int = 1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def get(self, key: str) -> Optional[bytes]:
+        con = self._con()
+        now = time.time()
+        row = con.execute("SELECT value, expires_at, accessed_at FROM cache WHERE key = ?",
+                          (key,)).fetchone()
+        if row is None or row[1] <= now:
+            if row is not None:
+                con.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now))
+            self._count("misses")
+            return None
+        if now - row[2] > self.touch_s:
+            con.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        expires = now + ttl if ttl else float("inf")
+        self._con().execute(
+            """INSERT INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size,
+                   expires_at = excluded.expires_at, accessed_at = excluded.accessed_at""",
+            (key, value, len(value), expires, now)
+        )
+        self._count("sets")
+        with self._stats_lock:
+            self._written_since_prune += len(value)
+            due = self._written_since_prune >= self.max_bytes // 20
+            if due:
+                self._written_since_prune = 0
+        if due:
+            self.prune()
+
+    def delete(self, *keys: str):
+        if keys:
+            self._con().executemany("DELETE FROM cache WHERE key = ?", [(k,) for k in keys])
+
+    def prune(self):
+        """Abgelaufenes löschen, dann die ältesten Einträge bis unter das Byte-Budget."""
+        con = self._con()
+        con.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        total = con.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # auf 90 % des Budgets herunter, damit nicht jeder set() erneut aufräumt
+        target = total - int(self.max_bytes * 0.9)
+        rows = con.execute("SELECT key, size FROM cache ORDER BY accessed_at").fetchall()
+        victims, freed = [], 0
+        for key, size in rows:
+            if freed >= target:
+                break
+            victims.append((key,))
+            freed += size
+        con.executemany("DELETE FROM cache WHERE key = ?", victims)
+        self._count("evictions", len(victims))
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size = self._con().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        with self._stats_lock:
+            return {"backend": self.name, **self._stats, "entries": entries,
+                    "bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self):
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+
+# ============================================================
+# REDIS
+# ============================================================
+class RedisBackend(CacheBackend):
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str = CACHE_REDIS_URL):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis braucht das Paket redis: pip install redis")
+        self._r = redis.Redis.from_url(url)
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0}
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._r.get(key)
+        with self._stats_lock:
+            self._stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self._r.set(key, value, px=int(ttl * 1000) if ttl else None)
+        with self._stats_lock:
+            self._stats["sets"] += 1
+
+    def delete(self, *keys: str):
+        if keys:
+            self._r.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        info = self._r.info("memory")
+        with self._stats_lock:
+            return {"backend": self.name, **self._stats,
+                    "bytes": info.get("used_memory"), "max_bytes": info.get("maxmemory")}
+
+    def close(self):
+        self._r.close()
+
+
+# ============================================================
+# AUSWAHL
+# ============================================================
+_shared: Optional[CacheBackend] = None
+_shared_lock = threading.Lock()
+
+
+def create_backend(kind: str = CACHE_BACKEND) -> CacheBackend:
+    if kind == "sqlite":
+        return SQLiteBackend()
+    if kind == "redis":
+        return RedisBackend()
+    if kind == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unbekanntes CACHE_BACKEND: {kind!r} (memory, sqlite, redis)")
+
+
+def shared_backend() -> Optional[CacheBackend]:
+    """Das prozessübergreifende Backend laut CACHE_BACKEND, sonst None."""
+    global _shared
+    if CACHE_BACKEND == "memory":
+        return None
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = create_backend(CACHE_BACKEND)
+    return _shared
@@ -0,0 +1,183 @@
+# compression.py
+# ============================================================
+# Komprimierung von Antworten (gzip, brotli falls installiert)
+# - CompressionMiddleware: komprimiert HTML/JSON/Text/JS dynamisch,
+#   je nach Accept-Encoding; lässt aus:
+#     * Antworten mit Content-Encoding (z.B. vorkomprimierte Varianten)
+#     * 206/304, Content-Range
+#     * schon komprimierte Formate (PDF, ZIP, Bilder)
+#     * kleine Antworten (< COMPRESS_MIN_BYTES)
+# - vorkomprimierte Varianten (Bytes einmal komprimiert, dann immer
+#   wieder ausgeliefert): static_assets.py, PDF-Cache (.pdf.gz)
+#
+#   COMPRESS=0 schaltet die Middleware ab
+# ============================================================
+
+import gzip
+import os
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ============================================================
+# KONFIGURATION (ENV)
+# ============================================================
+COMPRESS = os.getenv("COMPRESS", "1") == "1"
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+# dynamisch (pro Request): schnelle Stufen
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BR_QUALITY = int(os.getenv("COMPRESS_BR_QUALITY", "4"))
+# vorkomprimiert (einmal pro Artefakt): höchste Stufen
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BR_QUALITY = 11
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript",
+                      "application/xml", "image/svg+xml")
+
+
+def choose_encoding(accept_encoding: Optional[str], available=ENCODINGS) -> Optional[str]:
+    """Bevorzugt br vor gzip; q=0 schließt eine Kodierung aus."""
+    if not accept_encoding or not available:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for enc in ("br", "gzip"):
+        if enc in available and accepted.get(enc, accepted.get("*", 0.0)) > 0:
+            return enc
+    return None
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BR_QUALITY if level is None else level)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL if level is None else level, mtime=0)
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """encoding -> Bytes in höchster Stufe (nur Varianten, die wirklich kleiner sind)."""
+    out = {}
+    for enc in ENCODINGS:
+        data = compress(body, enc, PRECOMPRESS_BR_QUALITY if enc == "br" else PRECOMPRESS_GZIP_LEVEL)
+        if len(data) < len(body):
+            out[enc] = data
+    return out
+
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=COMPRESS_BR_QUALITY)
+            self._feed, self._flush = self._c.process, self._c.finish
+        else:
+            self._c = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)   # 31 = gzip-Header
+            self._feed, self._flush = self._c.compress, self._c.flush
+
+    def feed(self, data: bytes) -> bytes:
+        return self._feed(data)
+
+    def finish(self) -> bytes:
+        return self._flush()
+
+
+# ============================================================
+# MIDDLEWARE
+# ============================================================
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+        await self.app(scope, receive, _Responder(send, encoding, self.minimum_size).send)
+
+
+class _Responder:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.passthrough = False
+        self.compressor: Optional[_StreamCompressor] = None
+
+    def _skip(self, message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 206, 304):
+            return True
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers or "content-range" in headers:
+            return True
+        return not _compressible(headers.get("content-type", ""))
+
+    def _encoded_start(self, start, length: Optional[int]):
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        return start
+
+    async def send(self, message):
+        kind = message["type"]
+        if kind == "http.response.start":
+            if self._skip(message):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start = message    # erst mit dem ersten Body-Teil senden
+            return
+        if kind != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if self.compressor is None and self.start is not None:
+            if not more:
+                # ganze Antwort auf einmal
+                start, self.start = self.start, None
+                if len(body) < self.minimum_size:
+                    await self._send(start)
+                    await self._send(message)
+                    return
+                data = compress(body, self.encoding)
+                await self._send(self._encoded_start(start, len(data)))
+                await self._send({"type": "http.response.body", "body": data})
+                return
+            # gestreamte Antwort
+            self.compressor = _StreamCompressor(self.encoding)
+            start, self.start = self.start, None
+            await self._send(self._encoded_start(start, None))
+
+        chunk = self.compressor.feed(body)
+        if not more:
+            chunk += self.compressor.finish()
+        if chunk or not more:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more})
@@ -2,25 +2,152 @@
 # ============================================================
 # Datenbank: PostgreSQL via Supabase (persistent)
 # Fallback auf SQLite für lokale Entwicklung
+# Verbindungen kommen aus einem Pool (siehe db_pool.py)
+# load_report liest durch einen In-Process-Cache (report_cache.py)
+# submit_keys: Idempotenz-Keys von /submit (Doppelklick, Retries)
+# save_report schreibt per Group-Commit (batch_writer.py): viele
+# gleichzeitige Reports in einer Transaktion
 # ============================================================
 
 import os
 import json
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple
+
+from answers_codec import encode_for_storage
+from batch_writer import BatchWriter
+from questions import get_question_set
+from report_cache import report_cache, MISSING
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Group-Commit für save_report (0 = eine Transaktion pro Report wie früher)
+SAVE_BATCH = os.getenv("SAVE_BATCH", "1") == "1"
+SAVE_BATCH_MAX_ROWS = int(os.getenv("SAVE_BATCH_MAX_ROWS", "100"))
+# 0: schreiben, sobald der Writer frei ist (Batches entstehen während
+# des vorherigen Commits); > 0: so lange auf weitere Zeilen warten
+SAVE_BATCH_WAIT_MS = float(os.getenv("SAVE_BATCH_WAIT_MS", "0"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_async_pool = None
+_async_pool_lock = asyncio.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _create_pool()
+    return _pool
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Pool-Statistiken (Größe, freie Verbindungen, Wartezeiten, ...)."""
+    stats = {}
+    if _pool is not None:
+        stats["sync"] = dict(_pool.get_stats())
+    if _async_pool is not None:
+        stats["async"] = dict(_async_pool.get_stats())
+    return stats
+
+
+def _answers_columns(answers: Optional[Dict[str, Any]], qs) -> Tuple[Optional[str], Optional[bytes], Optional[str]]:
+    """
+    -> (answers_json, answers_raw, answers_version)
+    Standard ist die kompakte Byte-Form (answers_codec.py); JSON nur,
+    wenn sich die Antworten nicht verlustfrei als Bytes speichern lassen.
+    """
+    raw, version, fallback = encode_for_storage(answers, qs)
+    if fallback is not None:
+        return json.dumps(fallback, ensure_ascii=False, separators=(",", ":")), None, None
+    return None, raw, version
+
+
+def _save_row(report_id: str, payload: Dict[str, Any],
+              contact: Optional[Dict[str, Any]] = None,
+              answers: Optional[Dict[str, Any]] = None) -> Tuple:
+    """
+    -> (report_id, payload_json, answers_json, answers_raw,
+        answers_version, contact_json, qids_json): fertig serialisiert,
+    damit der Writer nur noch SQL ausführt. qids_json gehört zu genau
+    dem Fragensatz, mit dem answers_raw kodiert wurde (auch wenn
+    questions.json bis zum Schreiben neu geladen wird).
+    """
+    qs = get_question_set()
+    answers_json, answers_raw, answers_version = _answers_columns(answers, qs)
+    qids_json = json.dumps([q["id"] for q in qs.questions]) if answers_version else None
+    return (report_id, json.dumps(payload, ensure_ascii=False),
+            answers_json, answers_raw, answers_version,
+            json.dumps(contact, ensure_ascii=False) if contact else None,
+            qids_json)
+
+
+# Fragenreihenfolgen, die in question_versions schon eingetragen sind
+# (erst nach dem Commit der eintragenden Transaktion)
+_known_versions = set()
+
+
+def _new_question_versions(rows: List[Tuple]) -> List[Tuple[str, str]]:
+    """-> [(version, qids_json)] der Zeilen, die noch nicht eingetragen sind."""
+    found = {r[4]: r[6] for r in rows if r[4] and r[4] not in _known_versions}
+    return list(found.items())
+
+
+# abgelaufene Idempotenz-Keys höchstens so oft aufräumen
+_SUBMIT_KEYS_PRUNE_S = 60.0
+_submit_keys_pruned_at = 0.0
+
+
+def _submit_keys_prune_due() -> bool:
+    global _submit_keys_pruned_at
+    now = time.monotonic()
+    if now - _submit_keys_pruned_at < _SUBMIT_KEYS_PRUNE_S:
+        return False
+    _submit_keys_pruned_at = now
+    return True
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
 if DATABASE_URL:
     # ============================================================
     # POSTGRESQL (Produktion auf Render + Supabase)
     # ============================================================
-    import psycopg
+    from db_pool import create_pg_pool, create_pg_async_pool
+
+    def _create_pool():
+        return create_pg_pool(DATABASE_URL)
 
-    def _get_conn():
-        return psycopg.connect(DATABASE_URL)
+    async def _get_async_pool():
+        global _async_pool
+        if _async_pool is None:
+            async with _async_pool_lock:
+                if _async_pool is None:
+                    _async_pool = await create_pg_async_pool(DATABASE_URL)
+        return _async_pool
+
+    async def open_async_pool():
+        await _get_async_pool()
+
+    async def close_async_pool():
+        global _async_pool
+        async with _async_pool_lock:
+            if _async_pool is not None:
+                await _async_pool.close()
+                _async_pool = None
 
     def init_db():
-        with _get_conn() as con:
+        with _get_pool().connection() as con:
             con.execute("""
                 CREATE TABLE IF NOT EXISTS reports (
                     report_id TEXT PRIMARY KEY,
@@ -28,21 +155,80 @@ if DATABASE_URL:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-            con.commit()
+            # Rohantworten (für Neuberechnung, siehe rescore.py):
+            # kompakt als Bytes (answers_raw + answers_version),
+            # answers_json nur als Fallback
+            con.execute("ALTER TABLE reports ADD COLUMN IF NOT EXISTS answers_json TEXT")
+            con.execute("ALTER TABLE reports ADD COLUMN IF NOT EXISTS answers_raw BYTEA")
+            con.execute("ALTER TABLE reports ADD COLUMN IF NOT EXISTS answers_version TEXT")
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS question_versions (
+                    version TEXT PRIMARY KEY,
+                    qids_json TEXT NOT NULL
+                )
+            """)
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS brevo_outbox (
+                    id BIGSERIAL PRIMARY KEY,
+                    report_id TEXT NOT NULL,
+                    payload_json TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at DOUBLE PRECISION NOT NULL,
+                    last_error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            con.execute("""
+                CREATE INDEX IF NOT EXISTS brevo_outbox_due
+                ON brevo_outbox (status, next_attempt_at)
+            """)
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS submit_keys (
+                    key TEXT PRIMARY KEY,
+                    report_id TEXT NOT NULL,
+                    created_at DOUBLE PRECISION NOT NULL
+                )
+            """)
+            con.execute("CREATE INDEX IF NOT EXISTS submit_keys_created ON submit_keys (created_at)")
 
-    def save_report(report_id: str, payload: Dict[str, Any]):
-        with _get_conn() as con:
-            con.execute(
-                """INSERT INTO reports (report_id, payload_json)
-                   VALUES (%s, %s)
-                   ON CONFLICT (report_id)
-                   DO UPDATE SET payload_json = EXCLUDED.payload_json""",
-                (report_id, json.dumps(payload, ensure_ascii=False))
-            )
-            con.commit()
+    _REGISTER_VERSION_SQL = """INSERT INTO question_versions (version, qids_json) VALUES (%s, %s)
+                               ON CONFLICT (version) DO NOTHING"""
+    _SAVE_REPORT_SQL = """INSERT INTO reports (report_id, payload_json, answers_json, answers_raw, answers_version)
+                          VALUES (%s, %s, %s, %s, %s)
+                          ON CONFLICT (report_id)
+                          DO UPDATE SET payload_json = EXCLUDED.payload_json,
+                                        answers_json = COALESCE(EXCLUDED.answers_json, reports.answers_json),
+                                        answers_raw = COALESCE(EXCLUDED.answers_raw, reports.answers_raw),
+                                        answers_version = COALESCE(EXCLUDED.answers_version, reports.answers_version)"""
+    _OUTBOX_INSERT_SQL = """INSERT INTO brevo_outbox (report_id, payload_json, next_attempt_at)
+                            VALUES (%s, %s, %s)"""
+
+    def _db_save_reports(rows: List[Tuple]):
+        """
+        Zeilen aus _save_row in einer Transaktion. executemany läuft
+        bei psycopg 3 als Pipeline (ein Roundtrip statt einer pro Zeile);
+        kein COPY, weil reports per Upsert geschrieben wird.
+        """
+        now = time.time()
+        versions = _new_question_versions(rows)
+        with _get_pool().connection() as con:
+            with con.cursor() as cur:
+                cur.executemany(_SAVE_REPORT_SQL, [r[:5] for r in rows])
+                outbox = [(r[0], r[5], now) for r in rows if r[5]]
+                if outbox:
+                    cur.executemany(_OUTBOX_INSERT_SQL, outbox)
+                if versions:
+                    cur.executemany(_REGISTER_VERSION_SQL, versions)
+        _known_versions.update(v for v, _ in versions)
 
-    def load_report(report_id: str) -> Optional[Dict[str, Any]]:
-        with _get_conn() as con:
+    def _db_save_report(report_id: str, payload: Dict[str, Any],
+                    contact: Optional[Dict[str, Any]] = None,
+                    answers: Optional[Dict[str, Any]] = None):
+        _db_save_reports([_save_row(report_id, payload, contact, answers)])
+
+    def _db_load_report(report_id: str) -> Optional[Dict[str, Any]]:
+        with _get_pool().connection() as con:
             cur = con.execute(
                 "SELECT payload_json FROM reports WHERE report_id = %s",
                 (report_id,)
@@ -52,36 +238,281 @@ if DATABASE_URL:
                 return None
             return json.loads(row[0])
 
+    # ---------------- ASYNC (psycopg AsyncConnectionPool) ----------------
+    async def _db_save_report_async(report_id: str, payload: Dict[str, Any],
+                                contact: Optional[Dict[str, Any]] = None,
+                                answers: Optional[Dict[str, Any]] = None):
+        row = _save_row(report_id, payload, contact, answers)
+        pool = await _get_async_pool()
+        versions = _new_question_versions([row])
+        async with pool.connection() as con:
+            await con.execute(_SAVE_REPORT_SQL, row[:5])
+            for version in versions:
+                await con.execute(_REGISTER_VERSION_SQL, version)
+            if row[5]:
+                await con.execute(_OUTBOX_INSERT_SQL, (report_id, row[5], time.time()))
+        _known_versions.update(v for v, _ in versions)
+
+    async def _db_load_report_async(report_id: str) -> Optional[Dict[str, Any]]:
+        pool = await _get_async_pool()
+        async with pool.connection() as con:
+            cur = await con.execute(
+                "SELECT payload_json FROM reports WHERE report_id = %s",
+                (report_id,)
+            )
+            row = await cur.fetchone()
+            if not row:
+                return None
+            return json.loads(row[0])
+
+    # ---------------- IDEMPOTENZ (/submit) ----------------
+    # Key neu oder abgelaufen -> gehört ab jetzt report_id
+    _CLAIM_KEY_SQL = """INSERT INTO submit_keys (key, report_id, created_at) VALUES (%s, %s, %s)
+                        ON CONFLICT (key) DO UPDATE
+                        SET report_id = EXCLUDED.report_id, created_at = EXCLUDED.created_at
+                        WHERE submit_keys.created_at < %s
+                        RETURNING report_id"""
+    _KEY_OWNER_SQL = """SELECT k.report_id,
+                               EXISTS (SELECT 1 FROM reports r WHERE r.report_id = k.report_id)
+                        FROM submit_keys k WHERE k.key = %s"""
+
+    async def claim_submit_key_async(key: str, report_id: str, ttl_s: float) -> Tuple[Optional[str], bool]:
+        """
+        -> (report_id, gespeichert) der Anfrage, der der Key gehört.
+        Ist es die übergebene report_id, bearbeitet der Aufrufer die
+        Anfrage; sonst ist sie ein Duplikat. (None, False): Key wurde
+        gerade freigegeben, erneut versuchen.
+        """
+        now = time.time()
+        pool = await _get_async_pool()
+        async with pool.connection() as con:
+            if _submit_keys_prune_due():
+                await con.execute("DELETE FROM submit_keys WHERE created_at < %s", (now - ttl_s,))
+            cur = await con.execute(_CLAIM_KEY_SQL, (key, report_id, now, now - ttl_s))
+            if await cur.fetchone():
+                return report_id, False
+            cur = await con.execute(_KEY_OWNER_SQL, (key,))
+            row = await cur.fetchone()
+        return (row[0], bool(row[1])) if row else (None, False)
+
+    async def release_submit_key_async(key: str, report_id: str):
+        """Gibt den Key frei, wenn die Anfrage scheitert (Retry darf neu anfangen)."""
+        pool = await _get_async_pool()
+        async with pool.connection() as con:
+            await con.execute("DELETE FROM submit_keys WHERE key = %s AND report_id = %s",
+                              (key, report_id))
+
+    # ---------------- BREVO OUTBOX ----------------
+    def claim_outbox(limit: int, lease_s: float) -> List[Tuple[int, Dict[str, Any], int]]:
+        """
+        Holt bis zu `limit` fällige Einträge und verschiebt deren
+        next_attempt_at um `lease_s` (Lease). Stirbt der Dispatcher,
+        werden die Einträge nach Ablauf der Lease erneut zugestellt.
+        """
+        now = time.time()
+        with _get_pool().connection() as con:
+            cur = con.execute(
+                """UPDATE brevo_outbox
+                   SET next_attempt_at = %s, attempts = attempts + 1
+                   WHERE id IN (
+                       SELECT id FROM brevo_outbox
+                       WHERE status = 'pending' AND next_attempt_at <= %s
+                       ORDER BY id
+                       LIMIT %s
+                       FOR UPDATE SKIP LOCKED
+                   )
+                   RETURNING id, payload_json, attempts""",
+                (now + lease_s, now, limit)
+            )
+            rows = cur.fetchall()
+        return [(r[0], json.loads(r[1]), r[2]) for r in sorted(rows)]
+
+    def complete_outbox(ids: List[int]):
+        if not ids:
+            return
+        with _get_pool().connection() as con:
+            con.execute(
+                "UPDATE brevo_outbox SET status = 'sent', last_error = NULL WHERE id = ANY(%s)",
+                (list(ids),)
+            )
+
+    def retry_outbox(entry_id: int, error: str, next_attempt_at: float):
+        with _get_pool().connection() as con:
+            con.execute(
+                "UPDATE brevo_outbox SET next_attempt_at = %s, last_error = %s WHERE id = %s",
+                (next_attempt_at, error, entry_id)
+            )
+
+    def dead_letter_outbox(entry_id: int, error: str):
+        with _get_pool().connection() as con:
+            con.execute(
+                "UPDATE brevo_outbox SET status = 'dead', last_error = %s WHERE id = %s",
+                (error, entry_id)
+            )
+
+    def outbox_stats() -> Dict[str, int]:
+        with _get_pool().connection() as con:
+            cur = con.execute("SELECT status, COUNT(*) FROM brevo_outbox GROUP BY status")
+            return {status: n for status, n in cur.fetchall()}
+
+    # ---------------- NEUBERECHNUNG (rescore.py) ----------------
+    def fetch_reports_for_rescore(after: str, limit: int, lower: str = "",
+                                  upper: Optional[str] = None) -> List[Tuple[str, str, Optional[str], Optional[bytes], Optional[str]]]:
+        """
+        Keyset-Pagination über report_id im Bereich [lower, upper):
+        nächste `limit` Zeilen mit Rohantworten nach `after`.
+        -> (report_id, payload_json, answers_json, answers_raw, answers_version)
+        """
+        sql = """SELECT report_id, payload_json, answers_json, answers_raw, answers_version FROM reports
+                 WHERE (answers_raw IS NOT NULL OR answers_json IS NOT NULL)
+                   AND report_id >= %s AND report_id > %s"""
+        params: list = [lower, after]
+        if upper is not None:
+            sql += " AND report_id < %s"
+            params.append(upper)
+        sql += " ORDER BY report_id LIMIT %s"
+        params.append(limit)
+        with _get_pool().connection() as con:
+            return con.execute(sql, params).fetchall()
+
+    def _db_update_report_payloads(rows: List[Tuple[str, Dict[str, Any]]]):
+        """Schreibt viele Payloads in einer Transaktion (executemany = Pipeline)."""
+        if not rows:
+            return
+        with _get_pool().connection() as con:
+            with con.cursor() as cur:
+                cur.executemany(
+                    "UPDATE reports SET payload_json = %s WHERE report_id = %s",
+                    [(json.dumps(p, ensure_ascii=False), rid) for rid, p in rows]
+                )
+
+    def load_question_versions() -> Dict[str, List[str]]:
+        """version -> Frage-IDs in der Reihenfolge der Byte-Positionen."""
+        with _get_pool().connection() as con:
+            rows = con.execute("SELECT version, qids_json FROM question_versions").fetchall()
+        return {v: json.loads(q) for v, q in rows}
+
+    # ---------------- BULK-EXPORT (bulk_export.py) ----------------
+    def load_reports(report_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Viele Payloads in einer Abfrage; unbekannte IDs fehlen im Ergebnis."""
+        if not report_ids:
+            return {}
+        with _get_pool().connection() as con:
+            rows = con.execute(
+                "SELECT report_id, payload_json FROM reports WHERE report_id = ANY(%s)",
+                (list(report_ids),)
+            ).fetchall()
+        return {rid: json.loads(p) for rid, p in rows}
+
+    def find_report_ids(email_like: str, limit: Optional[int] = None) -> List[str]:
+        """report_ids, deren E-Mail auf das LIKE-Muster passt (z.B. '%@firma.de')."""
+        sql = """SELECT report_id FROM reports
+                 WHERE payload_json::jsonb->>'email' ILIKE %s ORDER BY report_id"""
+        params: list = [email_like]
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        with _get_pool().connection() as con:
+            return [r[0] for r in con.execute(sql, params).fetchall()]
+
 else:
     # ============================================================
     # SQLITE (Fallback fuer lokale Entwicklung)
     # ============================================================
-    import sqlite3
     from pathlib import Path
+    from db_pool import create_sqlite_pool
 
-    DB_PATH = Path(__file__).resolve().parent / "data" / "reports.db"
+    DB_PATH = Path(
+        os.getenv("SQLITE_PATH")
+        or Path(__file__).resolve().parent / "data" / "reports.db"
+    )
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+    def _create_pool():
+        return create_sqlite_pool(DB_PATH)
+
     def init_db():
-        with sqlite3.connect(DB_PATH) as con:
+        with _get_pool().connection() as con:
             con.execute("""
                 CREATE TABLE IF NOT EXISTS reports (
                     report_id TEXT PRIMARY KEY,
                     payload_json TEXT NOT NULL
                 )
             """)
-            con.commit()
+            # Rohantworten (für Neuberechnung, siehe rescore.py):
+            # kompakt als Bytes (answers_raw + answers_version),
+            # answers_json nur als Fallback
+            cols = {r[1] for r in con.execute("PRAGMA table_info(reports)")}
+            for col, typ in (("answers_json", "TEXT"), ("answers_raw", "BLOB"),
+                             ("answers_version", "TEXT")):
+                if col not in cols:
+                    con.execute(f"ALTER TABLE reports ADD COLUMN {col} {typ}")
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS question_versions (
+                    version TEXT PRIMARY KEY,
+                    qids_json TEXT NOT NULL
+                )
+            """)
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS brevo_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    report_id TEXT NOT NULL,
+                    payload_json TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            con.execute("""
+                CREATE INDEX IF NOT EXISTS brevo_outbox_due
+                ON brevo_outbox (status, next_attempt_at)
+            """)
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS submit_keys (
+                    key TEXT PRIMARY KEY,
+                    report_id TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            con.execute("CREATE INDEX IF NOT EXISTS submit_keys_created ON submit_keys (created_at)")
 
-    def save_report(report_id: str, payload: Dict[str, Any]):
-        with sqlite3.connect(DB_PATH) as con:
-            con.execute(
-                "INSERT OR REPLACE INTO reports (report_id, payload_json) VALUES (?, ?)",
-                (report_id, json.dumps(payload, ensure_ascii=False))
+    def _db_save_reports(rows: List[Tuple]):
+        """Zeilen aus _save_row in einer Transaktion (ein Commit)."""
+        now = time.time()
+        versions = _new_question_versions(rows)
+        with _get_pool().connection() as con:
+            con.executemany(
+                """INSERT INTO reports (report_id, payload_json, answers_json, answers_raw, answers_version)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (report_id)
+                   DO UPDATE SET payload_json = excluded.payload_json,
+                                 answers_json = COALESCE(excluded.answers_json, reports.answers_json),
+                                 answers_raw = COALESCE(excluded.answers_raw, reports.answers_raw),
+                                 answers_version = COALESCE(excluded.answers_version, reports.answers_version)""",
+                [r[:5] for r in rows]
             )
-            con.commit()
+            if versions:
+                con.executemany(
+                    "INSERT OR IGNORE INTO question_versions (version, qids_json) VALUES (?, ?)",
+                    versions
+                )
+            outbox = [(r[0], r[5], now) for r in rows if r[5]]
+            if outbox:
+                con.executemany(
+                    "INSERT INTO brevo_outbox (report_id, payload_json, next_attempt_at) VALUES (?, ?, ?)",
+                    outbox
+                )
+        _known_versions.update(v for v, _ in versions)
 
-    def load_report(report_id: str) -> Optional[Dict[str, Any]]:
-        with sqlite3.connect(DB_PATH) as con:
+    def _db_save_report(report_id: str, payload: Dict[str, Any],
+                    contact: Optional[Dict[str, Any]] = None,
+                    answers: Optional[Dict[str, Any]] = None):
+        _db_save_reports([_save_row(report_id, payload, contact, answers)])
+
+    def _db_load_report(report_id: str) -> Optional[Dict[str, Any]]:
+        with _get_pool().connection() as con:
             cur = con.execute(
                 "SELECT payload_json FROM reports WHERE report_id = ?",
                 (report_id,)
@@ -90,3 +521,238 @@ else:
             if not row:
                 return None
             return json.loads(row[0])
+
+    # ---------------- IDEMPOTENZ (/submit) ----------------
+    def _claim_submit_key(key: str, report_id: str, ttl_s: float) -> Tuple[Optional[str], bool]:
+        now = time.time()
+        with _get_pool().connection() as con:
+            if _submit_keys_prune_due():
+                con.execute("DELETE FROM submit_keys WHERE created_at < ?", (now - ttl_s,))
+            row = con.execute(
+                """INSERT INTO submit_keys (key, report_id, created_at) VALUES (?, ?, ?)
+                   ON CONFLICT (key) DO UPDATE
+                   SET report_id = excluded.report_id, created_at = excluded.created_at
+                   WHERE submit_keys.created_at < ?
+                   RETURNING report_id""",
+                (key, report_id, now, now - ttl_s)
+            ).fetchone()
+            if row:
+                return report_id, False
+            row = con.execute(
+                """SELECT k.report_id,
+                          EXISTS (SELECT 1 FROM reports r WHERE r.report_id = k.report_id)
+                   FROM submit_keys k WHERE k.key = ?""",
+                (key,)
+            ).fetchone()
+        return (row[0], bool(row[1])) if row else (None, False)
+
+    def _release_submit_key(key: str, report_id: str):
+        with _get_pool().connection() as con:
+            con.execute("DELETE FROM submit_keys WHERE key = ? AND report_id = ?", (key, report_id))
+
+    # ---------------- BREVO OUTBOX ----------------
+    def claim_outbox(limit: int, lease_s: float) -> List[Tuple[int, Dict[str, Any], int]]:
+        now = time.time()
+        with _get_pool().connection() as con:
+            # IMMEDIATE: Schreibsperre sofort, damit zwei Dispatcher
+            # nicht dieselben Einträge beanspruchen
+            con.execute("BEGIN IMMEDIATE")
+            rows = con.execute(
+                """SELECT id, payload_json, attempts FROM brevo_outbox
+                   WHERE status = 'pending' AND next_attempt_at <= ?
+                   ORDER BY id LIMIT ?""",
+                (now, limit)
+            ).fetchall()
+            con.executemany(
+                "UPDATE brevo_outbox SET next_attempt_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(now + lease_s, r[0]) for r in rows]
+            )
+        return [(r[0], json.loads(r[1]), r[2] + 1) for r in rows]
+
+    def complete_outbox(ids: List[int]):
+        if not ids:
+            return
+        with _get_pool().connection() as con:
+            con.executemany(
+                "UPDATE brevo_outbox SET status = 'sent', last_error = NULL WHERE id = ?",
+                [(i,) for i in ids]
+            )
+
+    def retry_outbox(entry_id: int, error: str, next_attempt_at: float):
+        with _get_pool().connection() as con:
+            con.execute(
+                "UPDATE brevo_outbox SET next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (next_attempt_at, error, entry_id)
+            )
+
+    def dead_letter_outbox(entry_id: int, error: str):
+        with _get_pool().connection() as con:
+            con.execute(
+                "UPDATE brevo_outbox SET status = 'dead', last_error = ? WHERE id = ?",
+                (error, entry_id)
+            )
+
+    def outbox_stats() -> Dict[str, int]:
+        with _get_pool().connection() as con:
+            rows = con.execute("SELECT status, COUNT(*) FROM brevo_outbox GROUP BY status").fetchall()
+            return {status: n for status, n in rows}
+
+    # ---------------- NEUBERECHNUNG (rescore.py) ----------------
+    def fetch_reports_for_rescore(after: str, limit: int, lower: str = "",
+                                  upper: Optional[str] = None) -> List[Tuple[str, str, Optional[str], Optional[bytes], Optional[str]]]:
+        sql = """SELECT report_id, payload_json, answers_json, answers_raw, answers_version FROM reports
+                 WHERE (answers_raw IS NOT NULL OR answers_json IS NOT NULL)
+                   AND report_id >= ? AND report_id > ?"""
+        params: list = [lower, after]
+        if upper is not None:
+            sql += " AND report_id < ?"
+            params.append(upper)
+        sql += " ORDER BY report_id LIMIT ?"
+        params.append(limit)
+        with _get_pool().connection() as con:
+            return con.execute(sql, params).fetchall()
+
+    def _db_update_report_payloads(rows: List[Tuple[str, Dict[str, Any]]]):
+        if not rows:
+            return
+        with _get_pool().connection() as con:
+            con.executemany(
+                "UPDATE reports SET payload_json = ? WHERE report_id = ?",
+                [(json.dumps(p, ensure_ascii=False), rid) for rid, p in rows]
+            )
+
+    def load_question_versions() -> Dict[str, List[str]]:
+        with _get_pool().connection() as con:
+            rows = con.execute("SELECT version, qids_json FROM question_versions").fetchall()
+        return {v: json.loads(q) for v, q in rows}
+
+    # ---------------- BULK-EXPORT (bulk_export.py) ----------------
+    # SQLite erlaubt nur begrenzt viele Parameter pro Abfrage
+    _IN_CHUNK = 500
+
+    def load_reports(report_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        with _get_pool().connection() as con:
+            for i in range(0, len(report_ids), _IN_CHUNK):
+                chunk = report_ids[i:i + _IN_CHUNK]
+                rows = con.execute(
+                    f"SELECT report_id, payload_json FROM reports WHERE report_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                out.update((rid, json.loads(p)) for rid, p in rows)
+        return out
+
+    def find_report_ids(email_like: str, limit: Optional[int] = None) -> List[str]:
+        sql = """SELECT report_id FROM reports
+                 WHERE json_extract(payload_json, '$.email') LIKE ? ORDER BY report_id"""
+        params: list = [email_like]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with _get_pool().connection() as con:
+            return [r[0] for r in con.execute(sql, params).fetchall()]
+
+    # ---------------- ASYNC (Thread-Offload) ----------------
+    # sqlite3 hat keine Async-API: die Pool-Aufrufe laufen in einem
+    # Worker-Thread, der Event-Loop bleibt frei.
+    async def open_async_pool():
+        await asyncio.to_thread(_get_pool)
+
+    async def close_async_pool():
+        pass
+
+    async def _db_save_report_async(report_id: str, payload: Dict[str, Any],
+                                contact: Optional[Dict[str, Any]] = None,
+                                answers: Optional[Dict[str, Any]] = None):
+        await asyncio.to_thread(_db_save_report, report_id, payload, contact, answers)
+
+    async def _db_load_report_async(report_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(_db_load_report, report_id)
+
+    async def claim_submit_key_async(key: str, report_id: str, ttl_s: float) -> Tuple[Optional[str], bool]:
+        return await asyncio.to_thread(_claim_submit_key, key, report_id, ttl_s)
+
+    async def release_submit_key_async(key: str, report_id: str):
+        await asyncio.to_thread(_release_submit_key, key, report_id)
+
+
+# ============================================================
+# READ-THROUGH-CACHE (report_cache.py) + GROUP-COMMIT (batch_writer.py)
+# Öffentliche Funktionen für beide Datenbanken; Schreibzugriffe
+# invalidieren nach dem Commit.
+# ============================================================
+report_writer = BatchWriter(_db_save_reports, max_rows=SAVE_BATCH_MAX_ROWS,
+                            wait_s=SAVE_BATCH_WAIT_MS / 1000.0, name="report-writer")
+
+
+def _cached(report_id: str):
+    found = report_cache.get(report_id)
+    if found is MISSING:
+        return True, None
+    return found is not None, found
+
+
+def load_report(report_id: str) -> Optional[Dict[str, Any]]:
+    hit, payload = _cached(report_id)
+    if hit:
+        return payload
+    generation = report_cache.generation()
+    payload = _db_load_report(report_id)
+    report_cache.put(report_id, payload, generation)
+    return payload
+
+
+async def load_report_async(report_id: str) -> Optional[Dict[str, Any]]:
+    found = await report_cache.get_async(report_id)
+    if found is MISSING:
+        return None
+    if found is not None:
+        return found
+    generation = report_cache.generation()
+    payload = await _db_load_report_async(report_id)
+    await report_cache.put_async(report_id, payload, generation)
+    return payload
+
+
+def save_report(report_id: str, payload: Dict[str, Any],
+                contact: Optional[Dict[str, Any]] = None,
+                answers: Optional[Dict[str, Any]] = None):
+    try:
+        if SAVE_BATCH:
+            report_writer.write(_save_row(report_id, payload, contact, answers))
+        else:
+            _db_save_report(report_id, payload, contact, answers)
+    finally:
+        report_cache.invalidate(report_id)
+
+
+async def save_report_async(report_id: str, payload: Dict[str, Any],
+                            contact: Optional[Dict[str, Any]] = None,
+                            answers: Optional[Dict[str, Any]] = None):
+    try:
+        if SAVE_BATCH:
+            await report_writer.write_async(_save_row(report_id, payload, contact, answers))
+        else:
+            await _db_save_report_async(report_id, payload, contact, answers)
+    finally:
+        await report_cache.invalidate_async(report_id)
+
+
+def update_report_payloads(rows: List[Tuple[str, Dict[str, Any]]]):
+    try:
+        _db_update_report_payloads(rows)
+    finally:
+        report_cache.invalidate(*(rid for rid, _ in rows))
+
+
+def report_cache_stats() -> Dict[str, Any]:
+    return report_cache.stats()
+
+
+def report_writer_stats() -> Dict[str, Any]:
+    return report_writer.stats()
+
+
+def close_report_writer():
+    """Schreibt noch wartende Reports und beendet den Writer-Thread."""
+    report_writer.stop()
@@ -0,0 +1,304 @@
+# db_pool.py
+# ============================================================
+# Connection-Pools für db.py
+# PostgreSQL: psycopg_pool.ConnectionPool / AsyncConnectionPool
+#             (min/max, Health-Check, Idle-Recycling, Statistiken)
+# SQLite:     eigener thread-sicherer Pool mit WAL und
+#             wiederverwendeten Verbindungen (gleiche Schnittstelle)
+# Alle Pools messen Warten auf eine Verbindung und Nutzungsdauer
+# (metrics.py: db_connection_acquire_seconds / db_connection_use_seconds).
+# ============================================================
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any
+
+from metrics import DB_ACQUIRE_SECONDS, DB_USE_SECONDS
+
+# ============================================================
+# KONFIGURATION (ENV)
+# ============================================================
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))        # Sekunden
+POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))           # Warten auf freie Verbindung
+
+
+class PoolTimeout(Exception):
+    """Keine freie Verbindung innerhalb von POOL_TIMEOUT Sekunden."""
+
+
+# ============================================================
+# POSTGRESQL
+# ============================================================
+def create_pg_pool(conninfo: str):
+    from psycopg_pool import ConnectionPool
+
+    acquire, use = DB_ACQUIRE_SECONDS.labels("pg"), DB_USE_SECONDS.labels("pg")
+
+    class TimedConnectionPool(ConnectionPool):
+        @contextmanager
+        def connection(self, timeout=None):
+            t0 = time.perf_counter()
+            t1 = None
+            try:
+                with super().connection(timeout) as con:
+                    t1 = time.perf_counter()
+                    acquire.observe(t1 - t0)
+                    yield con
+            finally:
+                if t1 is not None:
+                    use.observe(time.perf_counter() - t1)
+
+    return TimedConnectionPool(
+        conninfo,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        max_idle=POOL_MAX_IDLE,
+        max_lifetime=POOL_MAX_LIFETIME,
+        timeout=POOL_TIMEOUT,
+        # Health-Check beim Ausleihen: tote Verbindungen (z.B. nach
+        # Supabase-Idle-Timeout) werden verworfen statt benutzt.
+        check=ConnectionPool.check_connection,
+        name="reports",
+        open=True,
+    )
+
+
+async def create_pg_async_pool(conninfo: str):
+    from psycopg_pool import AsyncConnectionPool
+
+    acquire, use = DB_ACQUIRE_SECONDS.labels("pg-async"), DB_USE_SECONDS.labels("pg-async")
+
+    class TimedAsyncConnectionPool(AsyncConnectionPool):
+        @asynccontextmanager
+        async def connection(self, timeout=None):
+            t0 = time.perf_counter()
+            t1 = None
+            try:
+                async with super().connection(timeout) as con:
+                    t1 = time.perf_counter()
+                    acquire.observe(t1 - t0)
+                    yield con
+            finally:
+                if t1 is not None:
+                    use.observe(time.perf_counter() - t1)
+
+    pool = TimedAsyncConnectionPool(
+        conninfo,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        max_idle=POOL_MAX_IDLE,
+        max_lifetime=POOL_MAX_LIFETIME,
+        timeout=POOL_TIMEOUT,
+        check=AsyncConnectionPool.check_connection,
+        name="reports-async",
+        open=False,
+    )
+    # Async-Pools müssen innerhalb des laufenden Event-Loops geöffnet werden
+    await pool.open()
+    return pool
+
+
+# ============================================================
+# SQLITE
+# ============================================================
+class _PooledConn:
+    __slots__ = ("con", "created_at", "returned_at")
+
+    def __init__(self, con: sqlite3.Connection):
+        self.con = con
+        self.created_at = time.monotonic()
+        self.returned_at = self.created_at
+
+
+class SQLitePool:
+    """
+    Thread-sicherer Pool für SQLite.
+    Verbindungen werden im WAL-Modus geöffnet und wiederverwendet.
+    `connection()` verhält sich wie bei psycopg_pool: Commit bei Erfolg,
+    Rollback bei Exception, danach zurück in den Pool.
+    """
+
+    def __init__(self, path, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE,
+                 max_idle: float = POOL_MAX_IDLE, max_lifetime: float = POOL_MAX_LIFETIME,
+                 timeout: float = POOL_TIMEOUT):
+        self.path = str(path)
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+
+        self._idle: deque = deque()
+        self._size = 0
+        self._m_acquire = DB_ACQUIRE_SECONDS.labels("sqlite")
+        self._m_use = DB_USE_SECONDS.labels("sqlite")
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "connections_num": 0,      # insgesamt geöffnete Verbindungen
+            "connections_lost": 0,     # beim Health-Check verworfen
+            "connections_recycled": 0, # wegen Idle/Lifetime geschlossen
+            "requests_num": 0,
+            "requests_waiting": 0,
+            "requests_wait_ms": 0,
+            "requests_errors": 0,      # Timeouts
+        }
+        with self._cond:
+            for _ in range(self.min_size):
+                self._idle.append(self._connect())
+
+    # ---------------- intern ----------------
+    def _connect(self) -> _PooledConn:
+        con = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        self._size += 1
+        self._stats["connections_num"] += 1
+        return _PooledConn(con)
+
+    def _discard(self, pc: _PooledConn):
+        self._size -= 1
+        try:
+            pc.con.close()
+        except Exception:
+            pass
+
+    def _expired(self, pc: _PooledConn, now: float) -> bool:
+        if self.max_lifetime and now - pc.created_at > self.max_lifetime:
+            return True
+        return bool(self.max_idle) and now - pc.returned_at > self.max_idle and self._size > self.min_size
+
+    @staticmethod
+    def _healthy(pc: _PooledConn) -> bool:
+        try:
+            pc.con.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _getconn(self) -> _PooledConn:
+        deadline = time.monotonic() + self.timeout
+        t0 = time.monotonic()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SQLitePool ist geschlossen.")
+            self._stats["requests_num"] += 1
+            waited = False
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    pc = self._idle.pop()  # LIFO: zuletzt benutzte zuerst
+                    if self._expired(pc, now):
+                        self._stats["connections_recycled"] += 1
+                        self._discard(pc)
+                        continue
+                    if not self._healthy(pc):
+                        self._stats["connections_lost"] += 1
+                        self._discard(pc)
+                        continue
+                    if waited:
+                        self._stats["requests_wait_ms"] += int((now - t0) * 1000)
+                    return pc
+                if self._size < self.max_size:
+                    return self._connect()
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats["requests_errors"] += 1
+                    raise PoolTimeout(f"Keine DB-Verbindung frei nach {self.timeout:.1f}s")
+                if not waited:
+                    waited = True
+                    self._stats["requests_waiting"] += 1
+                self._cond.wait(remaining)
+
+    def _putconn(self, pc: _PooledConn):
+        with self._cond:
+            if self._closed:
+                self._discard(pc)
+                return
+            pc.returned_at = time.monotonic()
+            self._idle.append(pc)
+            self._cond.notify()
+
+    def _rollback_and_put(self, pc: _PooledConn):
+        """Offene Transaktion verwerfen; klappt das nicht, Verbindung schließen."""
+        try:
+            pc.con.rollback()
+        except sqlite3.Error:
+            with self._cond:
+                self._stats["connections_lost"] += 1
+                self._discard(pc)
+                self._cond.notify()
+            return
+        self._putconn(pc)
+
+    # ---------------- öffentlich ----------------
+    @contextmanager
+    def connection(self):
+        t0 = time.perf_counter()
+        pc = self._getconn()
+        t1 = time.perf_counter()
+        self._m_acquire.observe(t1 - t0)
+        try:
+            yield pc.con
+        except BaseException:
+            self._rollback_and_put(pc)
+            raise
+        else:
+            try:
+                pc.con.commit()
+            except BaseException:
+                # z.B. SQLITE_BUSY: Transaktion (und Schreibsperre) darf
+                # nicht am nächsten Ausleiher hängen bleiben
+                self._rollback_and_put(pc)
+                raise
+            self._putconn(pc)
+        finally:
+            self._m_use.observe(time.perf_counter() - t1)
+
+    def check(self):
+        """Prüft alle freien Verbindungen und recycelt abgelaufene."""
+        with self._cond:
+            now = time.monotonic()
+            keep = deque()
+            while self._idle:
+                pc = self._idle.popleft()
+                if self._expired(pc, now):
+                    self._stats["connections_recycled"] += 1
+                    self._discard(pc)
+                elif not self._healthy(pc):
+                    self._stats["connections_lost"] += 1
+                    self._discard(pc)
+                else:
+                    keep.append(pc)
+            self._idle = keep
+            while self._size < self.min_size:
+                self._idle.append(self._connect())
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pool_min": self.min_size,
+                "pool_max": self.max_size,
+                "pool_size": self._size,
+                "pool_available": len(self._idle),
+                **self._stats,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._cond.notify_all()
+
+
+def create_sqlite_pool(path) -> SQLitePool:
+    return SQLitePool(path)
@@ -0,0 +1,220 @@
+# metrics.py
+# ============================================================
+# Metriken im Prometheus-Textformat (GET /metrics), ohne Abhängigkeit
+# - Histogram: feste Buckets, eine Beobachtung = bisect + Lock (~1 µs)
+# - Counter
+# - Collector-Callbacks für vorhandene Statistiken (Pools, Caches),
+#   die erst beim Abruf von /metrics gelesen werden
+# Werte gelten pro Prozess (mehrere uvicorn-Worker -> je eigene Zahlen).
+# METRICS_ENABLED=0 schaltet alle Messpunkte ab.
+# ============================================================
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Sekunden: von DB-Abfragen (~0.1 ms) bis PDF-Rendering (Sekunden)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (16e3, 32e3, 48e3, 64e3, 96e3, 128e3, 256e3, 512e3, 1e6)
+
+_registry: List["_Metric"] = []
+_collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._aliases: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *values):
+        child = self._aliases.get(values)
+        if child is None:
+            key = tuple(str(v) for v in values)
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+                # unter den übergebenen Werten merken -> nächstes Mal ohne str()
+                self._aliases[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+# ============================================================
+# COUNTER
+# ============================================================
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labelnames, key):
+        return [f"{name}_total{_fmt_labels(labelnames, key)} {_fmt_value(self.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+# ============================================================
+# HISTOGRAM
+# ============================================================
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # letzter Bucket = +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        if not METRICS_ENABLED:
+            return
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def render(self, name, labelnames, key):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines, acc = [], 0
+        for bound, n in zip(self.bounds + (float("inf"),), counts):
+            acc += n
+            le = 'le="' + _fmt_value(bound) + '"'
+            lines.append(f"{name}_bucket{_fmt_labels(labelnames, key, le)} {acc}")
+        lines.append(f"{name}_sum{_fmt_labels(labelnames, key)} {_fmt_value(total)}")
+        lines.append(f"{name}_count{_fmt_labels(labelnames, key)} {acc}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+
+class _Timer:
+    """with HIST.labels(...).time(): ... -> Dauer in Sekunden beobachten."""
+    __slots__ = ("child", "t0")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.t0)
+        return False
+
+
+# ============================================================
+# COLLECTORS + AUSGABE
+# ============================================================
+def register_collector(fn):
+    """
+    fn() -> [(name, typ, hilfe, [(labels, wert), ...]), ...]
+    Wird nur beim Abruf von /metrics aufgerufen.
+    """
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for fn in _collectors:
+        try:
+            families = list(fn())
+        except Exception as e:
+            lines.append(f"# collector {getattr(fn, '__name__', fn)} fehlgeschlagen: {_escape(e)}")
+            continue
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_fmt_labels(list(labels), list(labels.values()))} {_fmt_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ============================================================
+# METRIKEN DER APP
+# ============================================================
+STAGE_SECONDS = Histogram(
+    "app_stage_seconds", "Dauer der Abschnitte pro Endpoint", ("endpoint", "stage"))
+DB_ACQUIRE_SECONDS = Histogram(
+    "db_connection_acquire_seconds", "Warten auf eine Verbindung aus dem Pool", ("pool",))
+DB_USE_SECONDS = Histogram(
+    "db_connection_use_seconds", "Verbindung ausgeliehen (Abfragen + Commit)", ("pool",))
+PDF_RENDER_SECONDS = Histogram(
+    "pdf_render_seconds", "Rendering im Worker-Prozess", ("mode",))
+PDF_SIZE_BYTES = Histogram(
+    "pdf_size_bytes", "Größe gerenderter PDFs", ("mode",), buckets=SIZE_BUCKETS)
+BREVO_REQUEST_SECONDS = Histogram(
+    "brevo_request_seconds", "POST /contacts an Brevo", ("outcome",))
+SUBMIT_DEDUP = Counter(
+    "submit_dedup", "/submit nach Idempotenz-Key: new, duplicate, in_progress", ("outcome",))
+
+
+def stage(endpoint: str, name: str) -> _Timer:
+    """with stage("submit", "scoring"): ..."""
+    return STAGE_SECONDS.labels(endpoint, name).time()
@@ -0,0 +1,274 @@
+# pdf_cache.py
+# ============================================================
+# Content-adressierter PDF-Cache für /report/{report_id}.pdf
+# Schlüssel = Hash über alles, was build_pdf_report liest
+# (name, email, profile_type, ranked) + Content-/Template-Version.
+# Stufe 1: Cache-Backend (cache_backend.py: RAM-LRU mit Byte-Budget
+# oder mit CACHE_BACKEND=sqlite/redis über alle Worker geteilt),
+# Stufe 2: Festplatte.
+# Dateien der Stufe 2 können direkt gestreamt werden (lookup, pdf_stream.py).
+# Schreibt ein Worker das PDF direkt auf die Festplatte, legt file_added
+# es zusätzlich in Stufe 1 - sonst bliebe das Backend beim Streamen leer.
+# Neben jeder Datei liegt eine gzip-Variante ({key}.pdf.gz), die
+# pdf_stream.py Clients mit Accept-Encoding: gzip schickt (Fonts,
+# Metadaten und Xref sind in ReportLab-PDFs unkomprimiert, ~30 % kleiner).
+# ============================================================
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+from cache_backend import CacheBackend, MemoryBackend, shared_backend
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ============================================================
+# KONFIGURATION (ENV)
+# ============================================================
+PDF_CACHE_MEMORY_BYTES = int(float(os.getenv("PDF_CACHE_MEMORY_MB", "64")) * 1024 * 1024)
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR") or BASE_DIR / "outputs" / "pdf_cache")
+PDF_CACHE_DISK = os.getenv("PDF_CACHE_DISK", "1") == "1"
+PDF_CACHE_DISK_BYTES = int(float(os.getenv("PDF_CACHE_DISK_MB", "1024")) * 1024 * 1024)
+PDF_CACHE_GZIP = os.getenv("PDF_CACHE_GZIP", "1") == "1"
+
+# Treffer auf der Festplatte setzen die mtime neu (LRU über mtime, atime
+# ist bei noatime/relatime unbrauchbar) - höchstens einmal pro Minute
+_DISK_TOUCH_S = 60
+# .tmp-Dateien abgestürzter Worker: nach so vielen Sekunden weg
+_DISK_TMP_MAX_AGE_S = 3600
+
+# Alles, was das PDF-Layout oder die Texte bestimmt. Ändert sich eine
+# dieser Dateien, ergeben sich automatisch neue Schlüssel.
+_VERSION_SOURCES = ["pdf_report.py", "pdf_overlay.py", "report_content.py"]
+
+
+def _content_version() -> str:
+    h = hashlib.sha256()
+    h.update(os.getenv("PDF_CONTENT_VERSION", "").encode("utf-8"))
+    # flow und overlay liefern gleich aussehende, aber andere Bytes
+    h.update(os.getenv("PDF_RENDER_MODE", "flow").encode("utf-8"))
+    for name in _VERSION_SOURCES:
+        h.update((BASE_DIR / name).read_bytes())
+    return h.hexdigest()[:16]
+
+
+CONTENT_VERSION = _content_version()
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Hash der Eingaben von build_pdf_report (nicht des ganzen Payloads)."""
+    material = {
+        "v": CONTENT_VERSION,
+        "name": payload.get("name"),
+        "email": payload.get("email"),
+        "profile_type": payload.get("profile_type"),
+        "ranked": payload.get("ranked"),
+    }
+    raw = json.dumps(material, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def etag_for(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def write_gzip_variant(path: Path, data: Optional[bytes] = None):
+    """{name}.pdf -> {name}.pdf.gz (höchste Stufe, einmal pro PDF; nur wenn kleiner)."""
+    if data is None:
+        data = path.read_bytes()
+    packed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(packed) >= len(data):
+        return
+    target = path.with_name(path.name + ".gz")
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(packed)
+    os.replace(tmp, target)
+
+
+class PdfCache:
+    def __init__(self, memory_bytes: int = PDF_CACHE_MEMORY_BYTES,
+                 disk_dir: Optional[Path] = PDF_CACHE_DIR if PDF_CACHE_DISK else None,
+                 disk_bytes: int = PDF_CACHE_DISK_BYTES,
+                 backend: Optional[CacheBackend] = None):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_bytes = disk_bytes
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self.backend = backend or MemoryBackend(memory_bytes)
+        self._puts_since_prune = 0
+        self._stats = {"hits_memory": 0, "hits_disk": 0, "misses": 0,
+                       "puts": 0, "evictions_disk": 0}
+
+    # ---------------- Stufe 1 (Backend) ----------------
+    def _mem_get(self, key: str) -> Optional[bytes]:
+        data = self.backend.get("pdf:" + key)
+        if data is not None:
+            self._stats["hits_memory"] += 1
+        return data
+
+    def _mem_put(self, key: str, data: bytes):
+        self.backend.set("pdf:" + key, data)
+
+    # ---------------- Festplatte ----------------
+    def path_for(self, key: str) -> Optional[Path]:
+        if not self.disk_dir:
+            return None
+        return self.disk_dir / f"{key}.pdf"
+
+    def variant_path(self, key: str) -> Optional[Path]:
+        """Pfad der gzip-Variante (kann fehlen)."""
+        if not self.disk_dir or not PDF_CACHE_GZIP:
+            return None
+        return self.disk_dir / f"{key}.pdf.gz"
+
+    def _disk_put(self, key: str, data: bytes):
+        path = self.path_for(key)
+        if path is None:
+            return
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        if PDF_CACHE_GZIP:
+            write_gzip_variant(path, data)
+        self._count_disk_put()
+
+    def _count_disk_put(self):
+        self._puts_since_prune += 1
+        if self._puts_since_prune >= 50:
+            self._puts_since_prune = 0
+            self.prune_disk()
+
+    def _touch(self, path: Path, mtime: float):
+        """Disk-Treffer als kürzlich benutzt markieren (PDF und gzip-Variante)."""
+        now = time.time()
+        if now - mtime < _DISK_TOUCH_S:
+            return
+        for p in (path, path.with_name(path.name + ".gz")):
+            try:
+                os.utime(p, (now, now))
+            except FileNotFoundError:
+                pass
+
+    def prune_disk(self):
+        """
+        Löscht die am längsten nicht benutzten Dateien (mtime, siehe
+        _touch), bis das Disk-Budget eingehalten ist, und liegen
+        gebliebene .tmp-Dateien.
+        """
+        if not self.disk_dir:
+            return
+        entries = []
+        total = 0
+        stale = time.time() - _DISK_TMP_MAX_AGE_S
+        for e in os.scandir(self.disk_dir):
+            try:
+                st = e.stat()
+            except FileNotFoundError:
+                continue
+            if e.name.endswith(".tmp"):
+                if st.st_mtime < stale:
+                    try:
+                        os.remove(e.path)
+                    except FileNotFoundError:
+                        pass
+            elif e.name.endswith((".pdf", ".pdf.gz")):
+                entries.append((st.st_mtime, st.st_size, e.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self._stats["evictions_disk"] += 1
+            except FileNotFoundError:
+                pass
+
+    # ---------------- öffentlich ----------------
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._mem_get(key)
+        if data is not None:
+            return data
+        path = self.path_for(key)
+        if path is not None:
+            try:
+                with open(path, "rb") as f:
+                    mtime = os.fstat(f.fileno()).st_mtime
+                    data = f.read()
+            except FileNotFoundError:
+                data = None
+            if data is not None:
+                self._touch(path, mtime)
+                self._stats["hits_disk"] += 1
+                self._mem_put(key, data)
+                return data
+        self._stats["misses"] += 1
+        return None
+
+    def lookup(self, key: str) -> Union[bytes, Path, None]:
+        """Wie get, liest die Datei aber nicht ein, sondern liefert ihren Pfad (zum Streamen)."""
+        data = self._mem_get(key)
+        if data is not None:
+            return data
+        path = self.path_for(key)
+        if path is not None:
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                mtime = None
+            if mtime is not None:
+                self._touch(path, mtime)
+                self._stats["hits_disk"] += 1
+                return path
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        self._stats["puts"] += 1
+        self._mem_put(key, data)
+        self._disk_put(key, data)
+
+    def file_added(self, key: str):
+        """
+        Ein Worker hat das PDF direkt nach path_for(key) geschrieben:
+        zählen und in Stufe 1 übernehmen (liest die Datei, also nicht im
+        Event-Loop aufrufen).
+        """
+        self._stats["puts"] += 1
+        try:
+            data = self.path_for(key).read_bytes()
+        except FileNotFoundError:
+            data = None
+        if data is not None:
+            self._mem_put(key, data)
+        self._count_disk_put()
+
+    def stats(self) -> Dict[str, Any]:
+        tier1 = self.backend.stats()
+        return {**self._stats, "evictions_memory": tier1.get("evictions", 0),
+                "backend": tier1["backend"], "memory_entries": tier1.get("entries"),
+                "memory_bytes": tier1.get("bytes"), "memory_budget": tier1.get("max_bytes")}
+
+
+pdf_cache = PdfCache(backend=shared_backend())
@@ -0,0 +1,311 @@
+# pdf_overlay.py
+# ============================================================
+# PDF im Template-/Overlay-Modus (PDF_RENDER_MODE=overlay)
+# Die Kategorie-Seiten sind bis auf Prozentzeile, Balken, markierten
+# Bereich und Seitenzahl in jedem Report gleich. Einmal pro Prozess
+# wird daraus die "Basis" gerendert:
+# - jede Seite ohne Bereichs-Karten als fertig komprimierter
+#   Content-Stream
+# - jede Bereichs-Karte (11 Kategorien x 3 Bereiche, markiert und
+#   unmarkiert) als eigener Stream
+# - die Positionen aller variablen Teile
+# Pro Report werden diese Streams nur noch als Form-XObjects
+# eingesetzt; gesetzt werden lediglich Prozentzeile und Balken.
+# Cover, Übersicht, Meaning Cards, Actionplan und Kompaktauswertung
+# hängen vom Report ab und laufen wie in build_pdf_report.
+# Visuell identisch mit build_pdf_report (benchmarks/check_pdf_overlay.py).
+# ============================================================
+
+import threading
+from io import BytesIO
+from typing import Dict, Any, List, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import (
+    BaseDocTemplate, PageTemplate, Frame, NextPageTemplate,
+    Paragraph, Spacer, PageBreak, Flowable, KeepTogether
+)
+
+from report_content import FUNCTION_ORDER, get_band
+from pdf_report import (
+    MARGIN_L, MARGIN_R, PAGE_W, PAGE_H, BANDS, RoundedProgressBar,
+    write_pdf_report, get_styles, _report_fields, _story_front, _story_back,
+    _header_footer, _header_footer_static, _page_number,
+    _build_category_fragment, _esc,
+)
+
+# Feste Reihenfolge -> in Basis und Report dieselben internen
+# Fontnamen (/F1, /F2, ...), sonst passen die Basis-Streams nicht
+BASE_FONTS = ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique")
+
+# Grafikzustand vor jedem Form-XObject auf Standard setzen: die Streams
+# wurden auf frischem Zustand aufgezeichnet und lassen z.B. Schwarz weg
+_RESET_STATE = "0 g 0 G 1 w 0 J 0 j [] 0 d"
+
+# Rand um Karten-Forms (Rahmenlinie liegt halb außerhalb der Karte)
+_CARD_BLEED = 10
+
+
+class OverlayMismatch(Exception):
+    """Variabler Teil passt nicht in den Platz aus der Basis."""
+
+
+class _FixedFontsCanvas(Canvas):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for font in BASE_FONTS:
+            self._doc.getInternalFontName(font)
+
+
+class _RecordingCanvas(_FixedFontsCanvas):
+    """Hält den Content-Stream jeder Seite fest."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pages: List[bytes] = []
+
+    def showPage(self):
+        self.pages.append(_encode([self._preamble] + self._code))
+        super().showPage()
+
+
+def _encode(code: List[str]) -> bytes:
+    return pdfdoc.PDFZCompress.encode("\n".join(code))
+
+
+class _Slot(Flowable):
+    """Platzhalter in der Basis: belegt den Platz von `inner`, zeichnet nichts, merkt sich die Position."""
+    def __init__(self, key, inner, slots):
+        super().__init__()
+        self.key = key
+        self.inner = inner
+        self.slots = slots
+        self.hAlign = getattr(inner, "hAlign", "LEFT")
+
+    def wrap(self, aw, ah):
+        self._aw = aw
+        self.width, self.height = self.inner.wrap(aw, ah)
+        return self.width, self.height
+
+    def draw(self):
+        x, y = self.canv.absolutePosition(0, 0)
+        self.slots[self.key] = (self.canv.getPageNumber() - 1, x, y, self._aw, self.height)
+
+
+class _OverlayPage(Flowable):
+    """Setzt Forms und variable Flowables einer Basis-Seite an absolute Positionen."""
+    def __init__(self, forms, flowables):
+        super().__init__()
+        self.forms = forms
+        self.flowables = flowables
+
+    def wrap(self, aw, ah):
+        return 0, 0
+
+    def draw(self):
+        c = self.canv
+        x0, y0 = c.absolutePosition(0, 0)
+        c.saveState()
+        c.translate(-x0, -y0)
+        for name, x, y in self.forms:
+            c.saveState()
+            c.translate(x, y)
+            c._code.append(_RESET_STATE)
+            c.doForm(name)
+            c.restoreState()
+        for flowable, x, y, aw in self.flowables:
+            flowable.wrapOn(c, aw, PAGE_H)
+            flowable.drawOn(c, x, y)
+        c.restoreState()
+
+
+def _add_form(canv, name: str, stream: bytes, bbox):
+    # Form-XObject direkt aus den fertigen Bytes (statt beginForm/endForm),
+    # damit nichts pro Report neu komprimiert wird
+    form = pdfdoc.PDFFormXObject(*bbox)
+    form.Contents = pdfdoc.PDFStream(
+        pdfdoc.PDFDictionary({"Filter": pdfdoc.PDFArray([pdfdoc.PDFName("FlateDecode")])}),
+        stream)
+    canv._doc.addForm(name, form)
+
+
+def _doc(buf) -> BaseDocTemplate:
+    # gleiche Ränder wie SimpleDocTemplate in build_pdf_report
+    return BaseDocTemplate(
+        buf, pagesize=A4,
+        leftMargin=MARGIN_L, rightMargin=MARGIN_R,
+        topMargin=16 * mm, bottomMargin=16 * mm,
+        title="Performance Profil Report"
+    )
+
+
+def _frame(doc) -> Frame:
+    return Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id="normal")
+
+
+def _pct_paragraph(pct: int, band: str, S) -> Paragraph:
+    return Paragraph(f"Dein Wert: <b>{pct} %</b>  |  Bereich: <b>{_esc(band)}</b>", S["Muted"])
+
+
+def _pct_bar(pct: int) -> RoundedProgressBar:
+    return RoundedProgressBar(pct, width_mm=160, height_mm=6)
+
+
+# ============================================================
+# BASIS (einmal pro Prozess)
+# ============================================================
+class OverlayBase:
+    def __init__(self, pages: List[bytes], cards: Dict[Tuple, Tuple], slots: Dict[Tuple, Tuple]):
+        self.pages = pages    # komprimierter Content-Stream pro Seite
+        self.cards = cards    # (fid, band, markiert) -> (stream, bbox)
+        self.slots = slots    # key -> (seite, x, y, breite, höhe)
+
+
+def _render_base() -> OverlayBase:
+    S = get_styles()
+    slots: Dict[Tuple, Tuple] = {}
+    card_flowables: Dict[Tuple, Flowable] = {}
+    story = []
+    for fid in FUNCTION_ORDER:
+        # band=None: alle drei Bereiche unmarkiert
+        frag = _build_category_fragment(fid, None, S)
+        story.append(KeepTogether(frag["intro"] + [
+            _Slot(("pct", fid), _pct_paragraph(100, "niedrig", S), slots),
+            Spacer(1, 6),
+            _Slot(("bar", fid), _pct_bar(0), slots),
+        ] + frag["worum"]))
+        for f in frag["body"]:
+            idx = next((i for i, c in enumerate(frag["band_cards"]) if c is f), None)
+            if idx is None:
+                story.append(f)
+            else:
+                story.append(_Slot(("band", fid, BANDS[idx]), f, slots))
+        for b, card in zip(BANDS, frag["band_cards"]):
+            card_flowables[(fid, b, False)] = card
+        for b in BANDS:
+            active = _build_category_fragment(fid, b, S)["band_cards"][BANDS.index(b)]
+            card_flowables[(fid, b, True)] = active
+
+    canvases = []
+
+    def canvasmaker(*args, **kwargs):
+        canvases.append(_RecordingCanvas(*args, **kwargs))
+        return canvases[-1]
+
+    doc = _doc(BytesIO())
+    doc.addPageTemplates([PageTemplate("base", [_frame(doc)],
+                                       onPage=lambda c, d: _header_footer_static(c))])
+    doc.build(story, canvasmaker=canvasmaker)
+
+    # Karten einzeln aufzeichnen, jeweils auf frischem Grafikzustand
+    canv = _FixedFontsCanvas(BytesIO(), pagesize=A4)
+    cards = {}
+    for n, (key, card) in enumerate(card_flowables.items()):
+        aw = slots[("band",) + key[:2]][3]
+        w, h = card.wrap(aw, PAGE_H)
+        canv.beginForm(f"card_{n}")
+        card.drawOn(canv, 0, 0)
+        code = [canv._preamble] + canv._code
+        canv.endForm()
+        cards[key] = (_encode(code), (-_CARD_BLEED, -_CARD_BLEED, w + _CARD_BLEED, h + _CARD_BLEED))
+
+    used = set(canvases[-1]._doc.fontMapping) | set(canv._doc.fontMapping)
+    if not used <= set(BASE_FONTS):
+        raise RuntimeError(f"Basis nutzt Fonts außerhalb von BASE_FONTS: {sorted(used - set(BASE_FONTS))}")
+    return OverlayBase(canvases[-1].pages, cards, slots)
+
+
+_base = None
+_base_lock = threading.Lock()
+
+
+def get_base() -> OverlayBase:
+    global _base
+    if _base is None:
+        with _base_lock:
+            if _base is None:
+                _base = _render_base()
+    return _base
+
+
+def warm_base():
+    """Rendert die Basis vorab (Worker-Initializer)."""
+    get_base()
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+def build_pdf_report_overlay(payload: Dict[str, Any]) -> bytes:
+    buf = BytesIO()
+    write_pdf_report_overlay(payload, buf)
+    return buf.getvalue()
+
+
+def write_pdf_report_overlay(payload: Dict[str, Any], out) -> None:
+    try:
+        _build(payload, out)
+    except OverlayMismatch as e:
+        # kommt vor doc.build, in `out` steht noch nichts
+        print("PDF overlay fallback:", e)
+        write_pdf_report(payload, out)
+
+
+def _build(payload: Dict[str, Any], out) -> None:
+    base = get_base()
+    name, email, ptype, ranked, top3, bottom2 = _report_fields(payload)
+    S = get_styles()
+
+    # variable Teile je Basis-Seite einsammeln
+    forms: List[List[Tuple[str, float, float]]] = [[] for _ in base.pages]
+    flowables: List[List[Tuple[Flowable, float, float, float]]] = [[] for _ in base.pages]
+    used_cards = {}
+    perc_map = {fid: pct for fid, pct in ranked}
+    for fid in FUNCTION_ORDER:
+        pct = int(round(perc_map.get(fid, 0)))
+        band = get_band(pct)
+        for key, flowable in ((("pct", fid), _pct_paragraph(pct, band, S)),
+                              (("bar", fid), _pct_bar(pct))):
+            page, x, y, aw, height = base.slots[key]
+            _, h = flowable.wrap(aw, PAGE_H)
+            if abs(h - height) > 0.01:
+                raise OverlayMismatch(f"{key}: Höhe {h:.2f} statt {height:.2f}")
+            flowables[page].append((flowable, x, y, aw))
+        for b in BANDS:
+            page, x, y, _, _ = base.slots[("band", fid, b)]
+            form_name = f"card_{fid}_{b}_{int(b == band)}"
+            used_cards[form_name] = base.cards[(fid, b, b == band)]
+            forms[page].append((form_name, x, y))
+
+    doc = _doc(out)
+    frame = _frame(doc)
+    base_page = iter(range(len(base.pages)))
+
+    def on_base_page(canv, d):
+        i = next(base_page)
+        if i == 0:
+            for form_name, (stream, bbox) in used_cards.items():
+                _add_form(canv, form_name, stream, bbox)
+        _add_form(canv, f"base_{i}", base.pages[i], (0, 0, PAGE_W, PAGE_H))
+        canv.doForm(f"base_{i}")
+        _page_number(canv, d)
+
+    doc.addPageTemplates([
+        PageTemplate("normal", [frame], onPage=_header_footer),
+        PageTemplate("base", [frame], onPage=on_base_page),
+    ])
+
+    story: List[Any] = []
+    story.extend(_story_front(name, email, ranked, top3, bottom2, S))
+    story.append(NextPageTemplate("base"))
+    story.append(PageBreak())
+    for i in range(len(base.pages)):
+        story.append(_OverlayPage(forms[i], flowables[i]))
+        if i == len(base.pages) - 1:
+            story.append(NextPageTemplate("normal"))
+        story.append(PageBreak())
+    story.extend(_story_back(name, email, ptype, ranked, top3, bottom2, S))
+
+    doc.build(story, canvasmaker=_FixedFontsCanvas)
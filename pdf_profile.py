@@ -0,0 +1,253 @@
+# pdf_profile.py
+# ============================================================
+# Opt-in-Profiling für das PDF-Rendering (pdf_report / pdf_overlay)
+# Pro Messung:
+# - Story-Aufbau: Aufrufe und Zeit je Seiten-Funktion (_page_*, _story_*)
+# - Layout: wrap und split je Flowable-Klasse
+# - Zeichnen: draw je Flowable-Klasse
+# Zeiten sind inklusiv (RoundedCard.wrap enthält Table.wrap der
+# Karte) und zusätzlich "self" ohne verschachtelte Flowables. Die
+# Phasen-Summen zählen nur äußerste Aufrufe (keine Doppelzählung).
+# Optional zusätzlich ein cProfile-Dump (pstats).
+#
+# Die Hooks werden erst beim ersten Profiling installiert und messen
+# nur im Thread, der gerade profiliert.
+#
+#   python pdf_profile.py                         # 5 Beispiel-Reports, JSON
+#   python pdf_profile.py 20 --pstats render.prof # + cProfile-Dump
+#   python pdf_profile.py --mode overlay
+#   PDF_PROFILE_DIR=outputs/pdf_profile           # Worker: jeder Job (pdf_worker.py)
+# ============================================================
+
+import argparse
+import cProfile
+import functools
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+PAGE_BUILDERS = (
+    "_story_front", "_story_back",
+    "_page_cover", "_page_bar_overview", "_page_meaning_cards",
+    "_page_category", "_page_actionplan", "_page_compact_overview",
+)
+PHASES = ("wrap", "split", "draw")
+
+_state = threading.local()
+_installed = False
+_install_lock = threading.Lock()
+
+
+class RenderProfile:
+    def __init__(self):
+        self.renders = 0
+        self.total_s = 0.0
+        self.pages: Dict[str, List[float]] = {}                   # name -> [Aufrufe, s]
+        self.flowables: Dict[Tuple[str, str], List[float]] = {}   # (Klasse, Phase) -> [Aufrufe, s, self_s]
+        self.story_s = 0.0
+        self.phase_s = dict.fromkeys(PHASES, 0.0)
+        self._page_depth = 0
+        self._stack: List[list] = []    # [obj, phase, Zeit der Kinder]
+
+    # ---------------- Messpunkte ----------------
+    def _page(self, name, fn, args, kwargs):
+        self._page_depth += 1
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            dt = time.perf_counter() - t0
+            self._page_depth -= 1
+            rec = self.pages.setdefault(name, [0, 0.0])
+            rec[0] += 1
+            rec[1] += dt
+            if self._page_depth == 0:
+                self.story_s += dt
+
+    def _flowable(self, obj, phase, fn, args, kwargs):
+        stack = self._stack
+        if stack and stack[-1][0] is obj and stack[-1][1] == phase:
+            # super().wrap(...) im selben Objekt: nicht doppelt zählen
+            return fn(obj, *args, **kwargs)
+        frame = [obj, phase, 0.0]
+        stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            return fn(obj, *args, **kwargs)
+        finally:
+            dt = time.perf_counter() - t0
+            stack.pop()
+            rec = self.flowables.setdefault((type(obj).__name__, phase), [0, 0.0, 0.0])
+            rec[0] += 1
+            rec[1] += dt
+            rec[2] += dt - frame[2]
+            if stack:
+                stack[-1][2] += dt
+            else:
+                self.phase_s[phase] += dt
+
+    # ---------------- Ergebnis ----------------
+    def as_dict(self) -> Dict[str, Any]:
+        measured = self.story_s + sum(self.phase_s.values())
+        flowables: Dict[str, Dict[str, Any]] = {}
+        for (cls, phase), (calls, s, self_s) in sorted(self.flowables.items(), key=lambda x: -x[1][1]):
+            flowables.setdefault(cls, {})[phase] = {
+                "calls": calls, "ms": round(s * 1000, 3), "self_ms": round(self_s * 1000, 3),
+            }
+        return {
+            "renders": self.renders,
+            "total_ms": round(self.total_s * 1000, 3),
+            "phases_ms": {
+                "story": round(self.story_s * 1000, 3),
+                **{p: round(s * 1000, 3) for p, s in self.phase_s.items()},
+                # Seitenvorlagen, Header/Footer, PDF-Serialisierung, Hooks
+                "other": round(max(0.0, self.total_s - measured) * 1000, 3),
+            },
+            "pages": {name: {"calls": calls, "ms": round(s * 1000, 3)}
+                      for name, (calls, s) in sorted(self.pages.items(), key=lambda x: -x[1][1])},
+            "flowables": flowables,
+        }
+
+
+# ============================================================
+# HOOKS
+# ============================================================
+def _page_hook(name, fn):
+    @functools.wraps(fn)
+    def hooked(*args, **kwargs):
+        prof = getattr(_state, "profile", None)
+        if prof is None:
+            return fn(*args, **kwargs)
+        return prof._page(name, fn, args, kwargs)
+    return hooked
+
+
+def _flowable_hook(phase, fn):
+    @functools.wraps(fn)
+    def hooked(self, *args, **kwargs):
+        prof = getattr(_state, "profile", None)
+        if prof is None:
+            return fn(self, *args, **kwargs)
+        return prof._flowable(self, phase, fn, args, kwargs)
+    return hooked
+
+
+def _subclasses(cls) -> Iterator[type]:
+    yield cls
+    for sub in cls.__subclasses__():
+        yield from _subclasses(sub)
+
+
+def install():
+    """Installiert die Hooks (einmal pro Prozess, danach No-op)."""
+    global _installed
+    if _installed:
+        return
+    with _install_lock:
+        if _installed:
+            return
+        import pdf_report
+        import pdf_overlay
+        from reportlab.platypus import Flowable
+
+        for name in PAGE_BUILDERS:
+            fn = getattr(pdf_report, name)
+            hooked = _page_hook(name, fn)
+            # pdf_overlay importiert _story_front/_story_back per Namen ->
+            # dort dieselbe Funktion ebenfalls ersetzen
+            for mod in (pdf_report, pdf_overlay):
+                if getattr(mod, name, None) is fn:
+                    setattr(mod, name, hooked)
+        for cls in set(_subclasses(Flowable)):
+            for phase in PHASES:
+                fn = cls.__dict__.get(phase)
+                if callable(fn):
+                    setattr(cls, phase, _flowable_hook(phase, fn))
+        _installed = True
+
+
+@contextmanager
+def profiling(pstats_path: Optional[str] = None) -> Iterator[RenderProfile]:
+    """
+    Misst alle Renderings im Block (nur im aktuellen Thread).
+    Die Gesamtzeit läuft über den ganzen Block; renders zählt der Aufrufer.
+    """
+    install()
+    prof = RenderProfile()
+    _state.profile = prof
+    cp = cProfile.Profile() if pstats_path else None
+    t0 = time.perf_counter()
+    if cp:
+        cp.enable()
+    try:
+        yield prof
+    finally:
+        if cp:
+            cp.disable()
+        prof.total_s = time.perf_counter() - t0
+        _state.profile = None
+        if cp:
+            cp.dump_stats(pstats_path)
+
+
+def profile_render(payload: Dict[str, Any], mode: str = "flow",
+                   pstats_path: Optional[str] = None) -> Tuple[bytes, Dict[str, Any]]:
+    """Ein PDF rendern und messen -> (PDF-Bytes, Profil als Dict)."""
+    build = _builder(mode)
+    with profiling(pstats_path) as prof:
+        data = build(payload)
+        prof.renders = 1
+    return data, prof.as_dict()
+
+
+def _builder(mode: str):
+    if mode == "overlay":
+        from pdf_overlay import build_pdf_report_overlay
+        return build_pdf_report_overlay
+    from pdf_report import build_pdf_report
+    return build_pdf_report
+
+
+# ============================================================
+# CLI
+# ============================================================
+def _sample_payloads(n: int):
+    from questions import get_question_set
+    from report_builder import build_report_data
+
+    qs = get_question_set()
+    rng = random.Random(5)
+    out = []
+    for i in range(n):
+        r = build_report_data({q["id"]: str(rng.randint(0, 10)) for q in qs.questions})
+        out.append({"name": f"Kunde {i}", "email": f"k{i}@example.com",
+                    "profile_type": r.profile_type,
+                    "ranked": [list(x) for x in r.ranked]})
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PDF-Rendering profilieren")
+    ap.add_argument("n", type=int, nargs="?", default=5, help="Anzahl Beispiel-Reports")
+    ap.add_argument("--mode", choices=("flow", "overlay"), default="flow")
+    ap.add_argument("--pstats", help="cProfile-Dump hierhin schreiben")
+    ap.add_argument("--cold", action="store_true",
+                    help="ohne Aufwärmen (Fragmente, Overlay-Basis) messen")
+    args = ap.parse_args()
+
+    build = _builder(args.mode)
+    payloads = _sample_payloads(args.n)
+    if not args.cold:
+        build(payloads[0])
+    with profiling(args.pstats) as prof:
+        for p in payloads:
+            build(p)
+        prof.renders = len(payloads)
+    print(json.dumps(prof.as_dict(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
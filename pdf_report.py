@@ -1,4 +1,6 @@
 from __future__ import annotations
+import os
+import threading
 from io import BytesIO
 from typing import Dict, Any, List, Tuple
 from reportlab.lib.pagesizes import A4
@@ -33,10 +35,47 @@ MARGIN_L = 18 * mm
 MARGIN_R = 18 * mm
 CONTENT_W = PAGE_W - MARGIN_L - MARGIN_R
 
+# Kategorie-Seiten aus vorgebauten Fragmenten zusammensetzen (siehe unten)
+PDF_FRAGMENT_CACHE = os.getenv("PDF_FRAGMENT_CACHE", "1") == "1"
+
 # ============================================================
 # PUBLIC API
 # ============================================================
 def build_pdf_report(payload: Dict[str, Any]) -> bytes:
+    buf = BytesIO()
+    write_pdf_report(payload, buf)
+    return buf.getvalue()
+
+def write_pdf_report(payload: Dict[str, Any], out) -> None:
+    """Wie build_pdf_report, schreibt aber direkt in `out` (Dateiname oder Datei-Objekt)."""
+    name, email, ptype, ranked, top3, bottom2 = _report_fields(payload)
+
+    doc = SimpleDocTemplate(
+        out, pagesize=A4,
+        leftMargin=MARGIN_L, rightMargin=MARGIN_R,
+        topMargin=16 * mm, bottomMargin=16 * mm,
+        title="Performance Profil Report"
+    )
+    S = get_styles()
+    story: List[Any] = []
+
+    # Seite 1-3: Einstieg, Gesamtübersicht, Meaning Cards
+    story.extend(_story_front(name, email, ranked, top3, bottom2, S))
+    story.append(PageBreak())
+
+    # Seite 4-24: 11 Kategorien im Detail
+    perc_map = {fid: pct for fid, pct in ranked}
+    for fid in FUNCTION_ORDER:
+        pct = int(round(perc_map.get(fid, 0)))
+        story.extend(_page_category(fid, pct, S))
+
+    # Actionplan + Kompaktauswertung
+    story.append(PageBreak())
+    story.extend(_story_back(name, email, ptype, ranked, top3, bottom2, S))
+
+    doc.build(story, onFirstPage=_header_footer, onLaterPages=_header_footer)
+
+def _report_fields(payload):
     name = (payload.get("name") or "").strip() or "Kunde"
     email = (payload.get("email") or "").strip()
     ptype = (payload.get("profile_type") or "").strip() or "-"
@@ -47,17 +86,10 @@ def build_pdf_report(payload: Dict[str, Any]) -> bytes:
         ranked = [(fid, 0) for fid in FUNCTION_ORDER]
     top3 = ranked[:3]
     bottom2 = list(reversed(ranked[-2:]))
+    return name, email, ptype, ranked, top3, bottom2
 
-    buf = BytesIO()
-    doc = SimpleDocTemplate(
-        buf, pagesize=A4,
-        leftMargin=MARGIN_L, rightMargin=MARGIN_R,
-        topMargin=16 * mm, bottomMargin=16 * mm,
-        title="Performance Profil Report"
-    )
-    S = _build_styles()
-    story: List[Any] = []
-
+def _story_front(name, email, ranked, top3, bottom2, S):
+    story = []
     # Seite 1: Einstieg (mit Hinweis auf Kompaktauswertung am Ende)
     story.extend(_page_cover(name, email, S))
     story.append(PageBreak())
@@ -68,28 +100,36 @@ def build_pdf_report(payload: Dict[str, Any]) -> bytes:
 
     # Seite 3: Meaning Cards (Top-Hebel + Reibungszonen)
     story.extend(_page_meaning_cards(top3, bottom2, S))
-    story.append(PageBreak())
-
-    # Seite 4-24: 11 Kategorien im Detail
-    perc_map = {fid: pct for fid, pct in ranked}
-    for fid in FUNCTION_ORDER:
-        pct = int(round(perc_map.get(fid, 0)))
-        story.extend(_page_category(fid, pct, S))
+    return story
 
+def _story_back(name, email, ptype, ranked, top3, bottom2, S):
+    story = []
     # Actionplan
-    story.append(PageBreak())
     story.extend(_page_actionplan(top3, bottom2, S))
 
     # LETZTE SEITE: Kompaktauswertung (One-Pager)
     story.append(PageBreak())
     story.extend(_page_compact_overview(name, email, ptype, ranked, top3, bottom2, S))
-
-    doc.build(story, onFirstPage=_header_footer, onLaterPages=_header_footer)
-    return buf.getvalue()
+    return story
 
 # ============================================================
 # STYLES
+# Absatz- und Tabellenstile werden einmal pro Prozess gebaut und von
+# allen Renderings geteilt (auch über Threads hinweg): ReportLab liest
+# sie beim Layout nur. Deshalb nie verändern - für Abweichungen einen
+# eigenen Stil ableiten.
 # ============================================================
+_styles = None
+_styles_lock = threading.Lock()
+
+def get_styles():
+    global _styles
+    if _styles is None:
+        with _styles_lock:
+            if _styles is None:
+                _styles = _build_styles()
+    return _styles
+
 def _build_styles():
     base = getSampleStyleSheet()
     return {
@@ -134,10 +174,122 @@ def _build_styles():
             spaceBefore=0, spaceAfter=0, textColor=DARK),
     }
 
+_TABLE_STYLE_CMDS = {
+    "plain": [
+        ("VALIGN",(0,0),(-1,-1),"TOP"),
+        ("LEFTPADDING",(0,0),(-1,-1),0),
+        ("RIGHTPADDING",(0,0),(-1,-1),0),
+        ("TOPPADDING",(0,0),(-1,-1),0),
+        ("BOTTOMPADDING",(0,0),(-1,-1),0),
+    ],
+    "score_list": [
+        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ("ALIGN",(1,0),(1,-1),"RIGHT"),
+        ("LINEBELOW",(0,0),(-1,-1), 0.4, BORDER),
+        ("LEFTPADDING",(0,0),(-1,-1),0),
+        ("RIGHTPADDING",(0,0),(-1,-1),0),
+        ("TOPPADDING",(0,0),(-1,-1),3),
+        ("BOTTOMPADDING",(0,0),(-1,-1),3),
+    ],
+    "mini_bars": [
+        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ("ALIGN",(2,0),(2,-1),"RIGHT"),
+        ("LEFTPADDING",(0,0),(-1,-1),0),
+        ("RIGHTPADDING",(0,0),(-1,-1),0),
+        ("TOPPADDING",(0,0),(-1,-1),2),
+        ("BOTTOMPADDING",(0,0),(-1,-1),2),
+    ],
+    "overview_bars": [
+        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ("ALIGN",(2,0),(2,-1),"RIGHT"),
+        ("LINEBELOW",(0,0),(-1,-1), 0.3, BORDER),
+        ("LEFTPADDING",(0,0),(-1,-1),0),
+        ("RIGHTPADDING",(0,0),(-1,-1),0),
+        ("TOPPADDING",(0,0),(-1,-1),6),
+        ("BOTTOMPADDING",(0,0),(-1,-1),6),
+    ],
+    "snapshot_top": [
+        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ("ALIGN",(1,0),(1,0),"RIGHT"),
+        ("BACKGROUND",(0,0),(-1,-1), LIGHT_GREEN),
+        ("LEFTPADDING",(0,0),(-1,-1),8),
+        ("RIGHTPADDING",(0,0),(-1,-1),8),
+        ("TOPPADDING",(0,0),(-1,-1),6),
+        ("BOTTOMPADDING",(0,0),(-1,-1),6),
+        ("ROUNDEDCORNERS", [4,4,4,4]),
+    ],
+    "snapshot_low": [
+        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ("ALIGN",(1,0),(1,0),"RIGHT"),
+        ("BACKGROUND",(0,0),(-1,-1), LIGHT_BG),
+        ("LEFTPADDING",(0,0),(-1,-1),8),
+        ("RIGHTPADDING",(0,0),(-1,-1),8),
+        ("TOPPADDING",(0,0),(-1,-1),6),
+        ("BOTTOMPADDING",(0,0),(-1,-1),6),
+    ],
+    "praxis": [
+        ("VALIGN",(0,0),(-1,-1),"TOP"),
+        ("LEFTPADDING",(0,0),(-1,-1),0),
+        ("RIGHTPADDING",(0,0),(-1,-1),0),
+        ("TOPPADDING",(0,0),(-1,-1),3),
+        ("BOTTOMPADDING",(0,0),(-1,-1),3),
+    ],
+    # Hintergrund kommt aus _card(fillColor=...)
+    "card": [
+        ("LEFTPADDING",(0,0),(-1,-1), 10),
+        ("RIGHTPADDING",(0,0),(-1,-1), 10),
+        ("TOPPADDING",(0,0),(-1,0), 8),
+        ("BOTTOMPADDING",(0,0),(-1,0), 5),
+        ("TOPPADDING",(0,1),(-1,-1), 4),
+        ("BOTTOMPADDING",(0,-1),(-1,-1), 8),
+        ("LINEBELOW",(0,0),(-1,0), 0.4, BORDER),
+    ],
+    "accent": [
+        ("BACKGROUND",(0,0),(-1,-1), LIGHT_GREEN),
+        ("LEFTPADDING",(0,0),(-1,-1), 12),
+        ("RIGHTPADDING",(0,0),(-1,-1), 10),
+        ("TOPPADDING",(0,0),(-1,0), 8),
+        ("BOTTOMPADDING",(0,-1),(-1,-1), 8),
+    ],
+    "meaning_head": [
+        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ("ALIGN",(1,0),(1,0),"RIGHT"),
+        ("LEFTPADDING",(0,0),(-1,-1),0),
+        ("RIGHTPADDING",(0,0),(-1,-1),0),
+        ("BOTTOMPADDING",(0,0),(-1,-1),4),
+        ("LINEBELOW",(0,0),(-1,-1),0.4,BORDER),
+    ],
+    "meaning": [
+        ("BACKGROUND",(0,0),(-1,-1), LIGHT_BG),
+        ("LEFTPADDING",(0,0),(-1,-1),10),
+        ("RIGHTPADDING",(0,0),(-1,-1),10),
+        ("TOPPADDING",(0,0),(-1,-1),4),
+        ("BOTTOMPADDING",(0,-1),(-1,-1),6),
+    ],
+}
+
+_table_styles: Dict[Tuple, TableStyle] = {}
+
+def _table_style(name, background=None):
+    """Geteilter TableStyle aus _TABLE_STYLE_CMDS, optional mit Hintergrund (vorne)."""
+    key = (name, background)
+    ts = _table_styles.get(key)
+    if ts is None:
+        # ohne Lock: bauen zwei Threads gleichzeitig, gewinnt einer, beide sind gleich
+        cmds = _TABLE_STYLE_CMDS[name]
+        if background is not None:
+            cmds = [("BACKGROUND",(0,0),(-1,-1), background)] + cmds
+        ts = _table_styles[key] = TableStyle(cmds)
+    return ts
+
 # ============================================================
 # HEADER / FOOTER
 # ============================================================
 def _header_footer(canvas, doc):
+    _header_footer_static(canvas)
+    _page_number(canvas, doc)
+
+def _header_footer_static(canvas):
     canvas.saveState()
     # Green accent line top
     canvas.setStrokeColor(GREEN)
@@ -147,6 +299,12 @@ def _header_footer(canvas, doc):
     canvas.setFillColor(MUTED_CLR)
     canvas.setFont("Helvetica", 7.5)
     canvas.drawString(MARGIN_L, 10*mm, "Performance Profil  |  Individuelle Auswertung")
+    canvas.restoreState()
+
+def _page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFillColor(MUTED_CLR)
+    canvas.setFont("Helvetica", 7.5)
     canvas.drawRightString(PAGE_W - MARGIN_R, 10*mm, f"Seite {doc.page}")
     canvas.restoreState()
 
@@ -208,13 +366,7 @@ def _page_compact_overview(name, email, ptype, ranked, top3, bottom2, S):
         [Paragraph(f"<b>Dein Arbeitsmodus:</b>", S["Ps"]),
          Paragraph(f"<b>{_esc(t['name'])}</b> ({_esc(t.get('label',''))})", S["Ps"])],
     ], colWidths=[45*mm, None])
-    typ_content.setStyle(TableStyle([
-        ("VALIGN", (0,0), (-1,-1), "TOP"),
-        ("LEFTPADDING", (0,0), (-1,-1), 0),
-        ("RIGHTPADDING", (0,0), (-1,-1), 0),
-        ("TOPPADDING", (0,0), (-1,-1), 0),
-        ("BOTTOMPADDING", (0,0), (-1,-1), 0),
-    ]))
+    typ_content.setStyle(_table_style("plain"))
     story.append(_green_accent_card([
         typ_content,
         Spacer(1, 1),
@@ -230,15 +382,7 @@ def _page_compact_overview(name, email, ptype, ranked, top3, bottom2, S):
             Paragraph(f"<b>{int(pct)}%</b>", S["Ps"]),
         ])
     top_tbl = Table(top_rows, colWidths=[None, 14*mm])
-    top_tbl.setStyle(TableStyle([
-        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
-        ("ALIGN",(1,0),(1,-1),"RIGHT"),
-        ("LINEBELOW",(0,0),(-1,-1), 0.4, BORDER),
-        ("LEFTPADDING",(0,0),(-1,-1),0),
-        ("RIGHTPADDING",(0,0),(-1,-1),0),
-        ("TOPPADDING",(0,0),(-1,-1),3),
-        ("BOTTOMPADDING",(0,0),(-1,-1),3),
-    ]))
+    top_tbl.setStyle(_table_style("score_list"))
 
     bot_rows = []
     for fid, pct in bottom2:
@@ -247,27 +391,13 @@ def _page_compact_overview(name, email, ptype, ranked, top3, bottom2, S):
             Paragraph(f"<b>{int(pct)}%</b>", S["Ps"]),
         ])
     bot_tbl = Table(bot_rows, colWidths=[None, 14*mm])
-    bot_tbl.setStyle(TableStyle([
-        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
-        ("ALIGN",(1,0),(1,-1),"RIGHT"),
-        ("LINEBELOW",(0,0),(-1,-1), 0.4, BORDER),
-        ("LEFTPADDING",(0,0),(-1,-1),0),
-        ("RIGHTPADDING",(0,0),(-1,-1),0),
-        ("TOPPADDING",(0,0),(-1,-1),3),
-        ("BOTTOMPADDING",(0,0),(-1,-1),3),
-    ]))
+    bot_tbl.setStyle(_table_style("score_list"))
 
     left_card = _card("Deine Top-Hebel", [top_tbl], S)
     right_card = _card("Deine Reibungszonen", [bot_tbl], S)
 
     grid = Table([[left_card, Spacer(4*mm, 1), right_card]], colWidths=[None, 4*mm, None])
-    grid.setStyle(TableStyle([
-        ("VALIGN",(0,0),(-1,-1),"TOP"),
-        ("LEFTPADDING",(0,0),(-1,-1),0),
-        ("RIGHTPADDING",(0,0),(-1,-1),0),
-        ("TOPPADDING",(0,0),(-1,-1),0),
-        ("BOTTOMPADDING",(0,0),(-1,-1),0),
-    ]))
+    grid.setStyle(_table_style("plain"))
     story.append(grid)
     story.append(Spacer(1, 6))
 
@@ -282,14 +412,7 @@ def _page_compact_overview(name, email, ptype, ranked, top3, bottom2, S):
             Paragraph(f"{int(pct)}%", S["MutedS"]),
         ])
     bar_tbl = Table(bar_rows, colWidths=[52*mm, None, 12*mm])
-    bar_tbl.setStyle(TableStyle([
-        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
-        ("ALIGN",(2,0),(2,-1),"RIGHT"),
-        ("LEFTPADDING",(0,0),(-1,-1),0),
-        ("RIGHTPADDING",(0,0),(-1,-1),0),
-        ("TOPPADDING",(0,0),(-1,-1),2),
-        ("BOTTOMPADDING",(0,0),(-1,-1),2),
-    ]))
+    bar_tbl.setStyle(_table_style("mini_bars"))
     story.append(bar_tbl)
     story.append(Spacer(1, 6))
 
@@ -362,16 +485,7 @@ def _page_result_snapshot(name, email, ptype, top3, bottom2, S):
             Paragraph(f"<b>{_esc(FUNCTION_NAMES.get(fid, fid))}</b>", S["P"]),
             Paragraph(f"<b>{int(pct)}%</b>", S["P"]),
         ]], colWidths=[None, 16*mm])
-        row.setStyle(TableStyle([
-            ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
-            ("ALIGN",(1,0),(1,0),"RIGHT"),
-            ("BACKGROUND",(0,0),(-1,-1), LIGHT_GREEN),
-            ("LEFTPADDING",(0,0),(-1,-1),8),
-            ("RIGHTPADDING",(0,0),(-1,-1),8),
-            ("TOPPADDING",(0,0),(-1,-1),6),
-            ("BOTTOMPADDING",(0,0),(-1,-1),6),
-            ("ROUNDEDCORNERS", [4,4,4,4]),
-        ]))
+        row.setStyle(_table_style("snapshot_top"))
         story.append(row)
         story.append(Spacer(1, 3))
 
@@ -385,15 +499,7 @@ def _page_result_snapshot(name, email, ptype, top3, bottom2, S):
             Paragraph(f"<b>{_esc(FUNCTION_NAMES.get(fid, fid))}</b>", S["P"]),
             Paragraph(f"<b>{int(pct)}%</b>", S["P"]),
         ]], colWidths=[None, 16*mm])
-        row.setStyle(TableStyle([
-            ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
-            ("ALIGN",(1,0),(1,0),"RIGHT"),
-            ("BACKGROUND",(0,0),(-1,-1), LIGHT_BG),
-            ("LEFTPADDING",(0,0),(-1,-1),8),
-            ("RIGHTPADDING",(0,0),(-1,-1),8),
-            ("TOPPADDING",(0,0),(-1,-1),6),
-            ("BOTTOMPADDING",(0,0),(-1,-1),6),
-        ]))
+        row.setStyle(_table_style("snapshot_low"))
         story.append(row)
         story.append(Spacer(1, 3))
 
@@ -419,15 +525,7 @@ def _page_bar_overview(ranked, S):
             Paragraph(f"<b>{int(pct)}%</b>", S["Ps"]),
         ])
     tbl = Table(rows, colWidths=[55*mm, None, 14*mm])
-    tbl.setStyle(TableStyle([
-        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
-        ("ALIGN",(2,0),(2,-1),"RIGHT"),
-        ("LINEBELOW",(0,0),(-1,-1), 0.3, BORDER),
-        ("LEFTPADDING",(0,0),(-1,-1),0),
-        ("RIGHTPADDING",(0,0),(-1,-1),0),
-        ("TOPPADDING",(0,0),(-1,-1),6),
-        ("BOTTOMPADDING",(0,0),(-1,-1),6),
-    ]))
+    tbl.setStyle(_table_style("overview_bars"))
     story.append(tbl)
     story.append(Spacer(1, 14))
 
@@ -472,35 +570,88 @@ def _page_meaning_cards(top3, bottom2, S):
 # PAGE: CATEGORY (11x)
 # ============================================================
 def _page_category(fid, pct, S):
+    band = get_band(pct)
+    frag = _category_fragment(fid, band, S)
+    story = []
+
+    # Nur Prozentzeile und Balken hängen vom einzelnen Report ab
+    header = KeepTogether(frag["intro"] + [
+        Paragraph(f"Dein Wert: <b>{pct} %</b>  |  Bereich: <b>{_esc(band)}</b>", S["Muted"]),
+        Spacer(1, 6),
+        RoundedProgressBar(pct, width_mm=160, height_mm=6),
+    ] + frag["worum"])
+    story.append(header)
+    story.extend(frag["body"])
+    return story
+
+# ============================================================
+# CATEGORY FRAGMENTS
+# Alles auf einer Kategorie-Seite außer Prozentzeile und Balken
+# hängt nur von (fid, Band) ab -> 11 x 3 Fragmente, einmal gebaut
+# und in jedem Report wiederverwendet. Flowables werden beim Layout
+# verändert, deshalb ein Cache pro Thread.
+# ============================================================
+_fragments = threading.local()
+
+BANDS = ("hoch", "mittel", "niedrig")
+
+def _category_fragment(fid, band, S):
+    if not PDF_FRAGMENT_CACHE:
+        return _build_category_fragment(fid, band, S)
+    cache = getattr(_fragments, "cache", None)
+    if cache is None:
+        cache = _fragments.cache = {}
+    frag = cache.get((fid, band))
+    if frag is None:
+        frag = cache[(fid, band)] = _build_category_fragment(fid, band, S)
+    else:
+        _reset_fragment(frag)
+    return frag
+
+def _reset_fragment(frag):
+    # Layout-Zustand aus dem vorigen Build entfernen: _postponed würde
+    # beim nächsten Seitenumbruch sonst einen LayoutError auslösen,
+    # _frame hält den alten Frame fest
+    for part in frag.values():
+        for f in part:
+            f.__dict__.pop("_postponed", None)
+            f.__dict__.pop("_frame", None)
+
+def warm_category_fragments(S=None):
+    """Baut alle Fragmente vorab (Worker-Initializer)."""
+    S = S or get_styles()
+    for fid in FUNCTION_ORDER:
+        for band in BANDS:
+            _category_fragment(fid, band, S)
+
+def _build_category_fragment(fid, band, S):
     t = CATEGORY_TEXT.get(fid)
     if not t:
         t = {"title": FUNCTION_NAMES.get(fid, fid), "worum": ["(Text fehlt)"],
              "hoch": ["(Text fehlt)"], "mittel": ["(Text fehlt)"],
              "niedrig": ["(Text fehlt)"], "praxis": ["(Text fehlt)"]*3,
              "merksatz": "(Text fehlt)"}
-    band = get_band(pct)
-    story = []
 
-    header = KeepTogether([
+    intro = [
         Paragraph("KATEGORIE", S["Label"]),
         Spacer(1, 4),
         Paragraph(_esc(t["title"]), S["H0"]),
         Spacer(1, 4),
-        Paragraph(f"Dein Wert: <b>{pct} %</b>  |  Bereich: <b>{_esc(band)}</b>", S["Muted"]),
-        Spacer(1, 6),
-        RoundedProgressBar(pct, width_mm=160, height_mm=6),
+    ]
+    worum = [
         Spacer(1, 10),
-        _card("Worum es hier wirklich geht", [_lines_to_para(t["worum"], S)], S),
+        _card("Worum es hier wirklich geht", [_lines_to_para(t["worum"], S)], S, cache_wrap=True),
         Spacer(1, 8),
-    ])
-    story.append(header)
+    ]
+    body = []
+    band_cards = []
 
     titles = {
         "hoch":    "Wenn der Wert hoch ist (75-100 %)",
         "mittel":  "Wenn der Wert im mittleren Bereich liegt (25-75 %)",
         "niedrig": "Wenn der Wert niedrig ist (0-25 %)",
     }
-    for b in ["hoch", "mittel", "niedrig"]:
+    for b in BANDS:
         is_active = (b == band)
         fill = LIGHT_GREEN if is_active else CARD_BG
         stroke_c = GREEN if is_active else BORDER
@@ -508,10 +659,12 @@ def _page_category(fid, pct, S):
         title = titles[b]
         if is_active:
             title = "DEIN BEREICH  |  " + title
-        story.append(_card(title,
+        card = _card(title,
             [_lines_to_para(t[b], S)], S,
-            fillColor=fill, strokeColor=stroke_c, strokeWidth=sw))
-        story.append(Spacer(1, 6))
+            fillColor=fill, strokeColor=stroke_c, strokeWidth=sw, cache_wrap=True)
+        band_cards.append(card)
+        body.append(card)
+        body.append(Spacer(1, 6))
 
     # Praxisregeln
     pr = t.get("praxis", [])[:3]
@@ -522,21 +675,15 @@ def _page_category(fid, pct, S):
             Paragraph(_esc(line), S["P"]),
         ])
     pr_tbl = Table(pr_rows, colWidths=[8*mm, None])
-    pr_tbl.setStyle(TableStyle([
-        ("VALIGN",(0,0),(-1,-1),"TOP"),
-        ("LEFTPADDING",(0,0),(-1,-1),0),
-        ("RIGHTPADDING",(0,0),(-1,-1),0),
-        ("TOPPADDING",(0,0),(-1,-1),3),
-        ("BOTTOMPADDING",(0,0),(-1,-1),3),
-    ]))
-    story.append(_card("Praxisregeln - so steuerst du diesen Hebel", [pr_tbl], S))
-    story.append(Spacer(1, 6))
+    pr_tbl.setStyle(_table_style("praxis"))
+    body.append(_card("Praxisregeln - so steuerst du diesen Hebel", [pr_tbl], S, cache_wrap=True))
+    body.append(Spacer(1, 6))
 
-    story.append(_green_accent_card([
+    body.append(_green_accent_card([
         Paragraph(f"<b>Merksatz:</b> {_esc(t.get('merksatz', ''))}", S["P"]),
-    ], S))
-    story.append(Spacer(1, 16))
-    return story
+    ], S, cache_wrap=True))
+    body.append(Spacer(1, 16))
+    return {"intro": intro, "worum": worum, "body": body, "band_cards": band_cards}
 
 # ============================================================
 # PAGE: ACTIONPLAN + OUTRO
@@ -598,39 +745,27 @@ def _page_actionplan(top3, bottom2, S):
 # ============================================================
 # CARD COMPONENTS
 # ============================================================
-def _card(title, content_list, S, fillColor=CARD_BG, strokeColor=BORDER, strokeWidth=0.6):
+def _card(title, content_list, S, fillColor=CARD_BG, strokeColor=BORDER, strokeWidth=0.6,
+          cache_wrap=False):
     head = Paragraph(f"<b>{_esc(title)}</b>", S["Label"])
     rows = [[head]]
     for c in content_list:
         rows.append([c])
     t = Table(rows, colWidths=[None])
-    t.setStyle(TableStyle([
-        ("BACKGROUND",(0,0),(-1,-1), fillColor),
-        ("LEFTPADDING",(0,0),(-1,-1), 10),
-        ("RIGHTPADDING",(0,0),(-1,-1), 10),
-        ("TOPPADDING",(0,0),(-1,0), 8),
-        ("BOTTOMPADDING",(0,0),(-1,0), 5),
-        ("TOPPADDING",(0,1),(-1,-1), 4),
-        ("BOTTOMPADDING",(0,-1),(-1,-1), 8),
-        ("LINEBELOW",(0,0),(-1,0), 0.4, BORDER),
-    ]))
+    t.setStyle(_table_style("card", background=fillColor))
     return RoundedCard(t, radius=5, stroke=strokeWidth,
-                       strokeColor=strokeColor, fillColor=fillColor, padding=5)
+                       strokeColor=strokeColor, fillColor=fillColor, padding=5,
+                       cache_wrap=cache_wrap)
 
-def _green_accent_card(content_list, S):
+def _green_accent_card(content_list, S, cache_wrap=False):
     rows = []
     for c in content_list:
         rows.append([c])
     t = Table(rows, colWidths=[None])
-    t.setStyle(TableStyle([
-        ("BACKGROUND",(0,0),(-1,-1), LIGHT_GREEN),
-        ("LEFTPADDING",(0,0),(-1,-1), 12),
-        ("RIGHTPADDING",(0,0),(-1,-1), 10),
-        ("TOPPADDING",(0,0),(-1,0), 8),
-        ("BOTTOMPADDING",(0,-1),(-1,-1), 8),
-    ]))
+    t.setStyle(_table_style("accent"))
     return RoundedCard(t, radius=5, stroke=1.5,
-                       strokeColor=GREEN, fillColor=LIGHT_GREEN, padding=5)
+                       strokeColor=GREEN, fillColor=LIGHT_GREEN, padding=5,
+                       cache_wrap=cache_wrap)
 
 def _meaning_card(fid, pct, mode, S):
     tag = "Top-Hebel" if mode == "top" else "Reibungszone"
@@ -643,14 +778,7 @@ def _meaning_card(fid, pct, mode, S):
         Paragraph(f"<b>{_esc(tag)}</b>", S["LabelGreen"] if mode == "top" else S["Label"]),
         Paragraph(f"<b>{int(pct)}%</b>", S["Label"]),
     ]], colWidths=[None, 18*mm])
-    head.setStyle(TableStyle([
-        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
-        ("ALIGN",(1,0),(1,0),"RIGHT"),
-        ("LEFTPADDING",(0,0),(-1,-1),0),
-        ("RIGHTPADDING",(0,0),(-1,-1),0),
-        ("BOTTOMPADDING",(0,0),(-1,-1),4),
-        ("LINEBELOW",(0,0),(-1,-1),0.4,BORDER),
-    ]))
+    head.setStyle(_table_style("meaning_head"))
 
     rows = [
         [head],
@@ -660,13 +788,7 @@ def _meaning_card(fid, pct, mode, S):
         [Paragraph(f"<b>Steuerung:</b> {_esc(steer)}", S["MutedS"])],
     ]
     t = Table(rows, colWidths=[None])
-    t.setStyle(TableStyle([
-        ("BACKGROUND",(0,0),(-1,-1), LIGHT_BG),
-        ("LEFTPADDING",(0,0),(-1,-1),10),
-        ("RIGHTPADDING",(0,0),(-1,-1),10),
-        ("TOPPADDING",(0,0),(-1,-1),4),
-        ("BOTTOMPADDING",(0,-1),(-1,-1),6),
-    ]))
+    t.setStyle(_table_style("meaning"))
     return RoundedCard(t, radius=5, stroke=0.5, strokeColor=BORDER, fillColor=LIGHT_BG, padding=5)
 
 # ============================================================
@@ -782,14 +904,21 @@ class Badge(Flowable):
 
 class RoundedCard(Flowable):
     def __init__(self, inner, radius=5, stroke=0.6, strokeColor=BORDER,
-                 fillColor=CARD_BG, padding=6):
+                 fillColor=CARD_BG, padding=6, cache_wrap=False):
         super().__init__()
         self.inner = inner; self.radius = radius; self.stroke = stroke
         self.strokeColor = strokeColor; self.fillColor = fillColor; self.padding = padding
+        # cache_wrap: Inhalt ist fest (Fragment-Cache) -> bei gleicher Breite
+        # nicht erneut umbrechen, das Layout vom letzten wrap gilt weiter
+        self.cache_wrap = cache_wrap
+        self._wrapped_aw = None
     def wrap(self, aw, ah):
+        if self.cache_wrap and aw == self._wrapped_aw:
+            return self.width, self.height
         iw, ih = self.inner.wrap(aw - 2*self.padding, ah)
         self.width = aw
         self.height = ih + 2*self.padding
+        self._wrapped_aw = aw
         return self.width, self.height
     def draw(self):
         c = self.canv
@@ -0,0 +1,129 @@
+# pdf_stream.py
+# ============================================================
+# Antworten für /report/{report_id}.pdf ohne zusätzliche Kopien
+# - Cache-Datei wird in Blöcken gestreamt (kein read_bytes)
+# - Bytes aus dem RAM-Cache gehen unverändert in die Response
+# - HTTP Range (ein Bereich) für fortsetzbare Downloads, If-Range
+#   über den ETag. Mehrere Bereiche -> ganze Datei (RFC 9110 erlaubt das)
+# - ohne Range und mit Accept-Encoding: gzip die vorkomprimierte
+#   Variante aus dem PDF-Cache (.pdf.gz), mit eigenem ETag
+# ============================================================
+
+import os
+from pathlib import Path
+from typing import Mapping, Optional, Tuple, Union
+
+from fastapi.responses import Response, StreamingResponse
+
+from compression import choose_encoding
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """Range liegt komplett hinter dem Dateiende (-> 416)."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    "bytes=a-b" / "bytes=a-" / "bytes=-n" -> (start, end) inklusive.
+    None = ganze Datei (kein, ungültiger oder mehrteiliger Range-Header).
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if not sep or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+    if first == "":
+        # Suffix: die letzten n Bytes
+        if last == "":
+            return None
+        n = int(last)
+        if n == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - n), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def _iter_file(f, offset: int, length: int):
+    with f:
+        f.seek(offset)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def gzip_etag(etag: str) -> str:
+    return etag[:-1] + '-gzip"'
+
+
+def _gzip_response(gzip_path: Optional[Path], request_headers: Mapping[str, str],
+                   headers: Mapping[str, str]) -> Optional[Response]:
+    if gzip_path is None or request_headers.get("range"):
+        return None
+    if choose_encoding(request_headers.get("accept-encoding"), ("gzip",)) != "gzip":
+        return None
+    try:
+        f = open(gzip_path, "rb")
+    except FileNotFoundError:
+        return None
+    size = os.fstat(f.fileno()).st_size
+    headers = {**headers, "ETag": gzip_etag(headers["ETag"]), "Content-Encoding": "gzip",
+               "Content-Length": str(size)}
+    return StreamingResponse(_iter_file(f, 0, size), media_type="application/pdf", headers=headers)
+
+
+def pdf_response(source: Union[bytes, Path], request_headers: Mapping[str, str],
+                 headers: Mapping[str, str], gzip_path: Optional[Path] = None) -> Response:
+    """
+    Response für PDF-Bytes oder eine PDF-Datei, mit Range-Unterstützung.
+    `headers` muss den ETag enthalten. Dateien werden hier schon
+    geöffnet: FileNotFoundError (Datei inzwischen weggeräumt) geht an
+    den Aufrufer.
+    """
+    headers = {**headers, "Accept-Ranges": "bytes", "Vary": "Accept-Encoding"}
+    packed = _gzip_response(gzip_path, request_headers, headers)
+    if packed is not None:
+        return packed
+    f = None
+    if isinstance(source, Path):
+        f = open(source, "rb")
+        size = os.fstat(f.fileno()).st_size
+    else:
+        size = len(source)
+
+    rng = None
+    if_range = request_headers.get("if-range")
+    if if_range is None or if_range.strip() == headers.get("ETag"):
+        try:
+            rng = parse_range(request_headers.get("range"), size)
+        except RangeNotSatisfiable:
+            if f is not None:
+                f.close()
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    start, end = rng or (0, size - 1)
+    status = 206 if rng else 200
+    if rng:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if f is None:
+        body = source if rng is None else source[start:end + 1]
+        return Response(content=body, status_code=status,
+                        media_type="application/pdf", headers=headers)
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(_iter_file(f, start, end - start + 1), status_code=status,
+                             media_type="application/pdf", headers=headers)
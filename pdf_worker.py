@@ -0,0 +1,284 @@
+# pdf_worker.py
+# ============================================================
+# PDF-Rendering im Prozess-Pool
+# build_pdf_report ist reine CPU-Arbeit (ReportLab) und läuft deshalb
+# nicht im Event-Loop, sondern in vorgewärmten Worker-Prozessen.
+# - Vorab-Rendering direkt nach /submit (PDF_PRERENDER=1)
+# - report_pdf wartet auf einen laufenden Job statt doppelt zu rendern
+# - Backpressure: ist die Warteschlange voll, wird nicht vorgerendert
+#   (das PDF entsteht dann wie bisher beim ersten Download)
+# - Timeout pro Job, Begrenzung gleichzeitiger Renderings, Metriken
+# - mit Festplatten-Cache schreibt der Worker das PDF direkt in die
+#   Cache-Datei; der Elternprozess streamt sie nur noch (pdf_stream.py)
+# ============================================================
+
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Union
+
+from metrics import PDF_RENDER_SECONDS, PDF_SIZE_BYTES
+from pdf_cache import PdfCache, pdf_cache, write_gzip_variant, PDF_CACHE_GZIP
+
+# ============================================================
+# KONFIGURATION (ENV)
+# ============================================================
+PDF_PRERENDER = os.getenv("PDF_PRERENDER", "0") == "1"
+PDF_RENDER_MODE = os.getenv("PDF_RENDER_MODE", "flow")   # flow | overlay (pdf_overlay.py)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+PDF_MAX_QUEUE = int(os.getenv("PDF_MAX_QUEUE", "32"))
+PDF_MAX_CONCURRENCY = int(os.getenv("PDF_MAX_CONCURRENCY", "0")) or PDF_WORKERS
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "60"))   # Sekunden
+# 1 = Worker schreibt in die Cache-Datei, Download wird daraus gestreamt
+# (nur mit PDF_CACHE_DISK=1); 0 = Bytes über die Prozessgrenze wie bisher
+PDF_STREAM_FROM_DISK = os.getenv("PDF_STREAM_FROM_DISK", "1") == "1"
+# Profiling (pdf_profile.py): pro Job ein JSON (+ .prof mit PDF_PROFILE_PSTATS=1)
+PDF_PROFILE_DIR = os.getenv("PDF_PROFILE_DIR", "")
+PDF_PROFILE_PSTATS = os.getenv("PDF_PROFILE_PSTATS", "0") == "1"
+
+
+class PdfRenderTimeout(Exception):
+    """Rendering hat länger als PDF_RENDER_TIMEOUT gedauert."""
+
+
+# ============================================================
+# WORKER-PROZESS
+# ============================================================
+def _warm_worker():
+    # Initializer: Module einmal pro Prozess importieren und ReportLab
+    # (Fonts, Stylesheet) aufwärmen, damit der erste Job nicht zahlt.
+    import report_content  # noqa: F401
+    import pdf_report
+    pdf_report.warm_category_fragments()
+    if PDF_RENDER_MODE == "overlay":
+        import pdf_overlay
+        pdf_overlay.warm_base()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _render(payload: Dict[str, Any], path: Optional[Path] = None) -> Tuple[Union[bytes, Path], int, float]:
+    """-> (PDF-Bytes oder `path`, Größe, Sekunden)"""
+    if PDF_RENDER_MODE == "overlay":
+        from pdf_overlay import write_pdf_report_overlay as write_pdf_report
+    else:
+        from pdf_report import write_pdf_report
+    if PDF_PROFILE_DIR:
+        write_pdf_report = _profiled(write_pdf_report)
+    t0 = time.perf_counter()
+    if path is None:
+        buf = BytesIO()
+        write_pdf_report(payload, buf)
+        data = buf.getvalue()
+        return data, len(data), time.perf_counter() - t0
+    # direkt in die Datei: keine Kopie im BytesIO, nichts durch die Pipe
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            write_pdf_report(payload, f)
+            size = f.tell()
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    seconds = time.perf_counter() - t0
+    if PDF_CACHE_GZIP:
+        # noch im Worker-Prozess, nicht im Event-Loop
+        write_gzip_variant(path)
+    return path, size, seconds
+
+
+def _profiled(write):
+    def run(payload, out):
+        import json
+        from pdf_profile import profiling
+
+        out_dir = Path(PDF_PROFILE_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{int(time.time() * 1000)}-{os.getpid()}"
+        pstats_path = str(out_dir / f"{name}.prof") if PDF_PROFILE_PSTATS else None
+        with profiling(pstats_path) as prof:
+            write(payload, out)
+            prof.renders = 1
+        (out_dir / f"{name}.json").write_text(json.dumps(prof.as_dict()), encoding="utf-8")
+    return run
+
+
+def _log_failure(fut: asyncio.Future):
+    if not fut.cancelled() and fut.exception() is not None:
+        print("PDF prerender exception:", repr(fut.exception()))
+
+
+# ============================================================
+# RENDERER
+# ============================================================
+class PdfRenderer:
+    def __init__(self, cache: PdfCache = pdf_cache, workers: int = PDF_WORKERS,
+                 max_queue: int = PDF_MAX_QUEUE, max_concurrency: int = PDF_MAX_CONCURRENCY,
+                 timeout: float = PDF_RENDER_TIMEOUT):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiting = 0
+        self._running = 0
+        self._render_times = deque(maxlen=512)
+        self._stats = {
+            "prerender_queued": 0, "prerender_rejected": 0, "joined_inflight": 0,
+            "renders": 0, "render_errors": 0, "render_timeouts": 0,
+            "render_seconds_total": 0.0, "queue_wait_seconds_total": 0.0,
+            "bytes_total": 0,
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn statt fork: der Elternprozess hat DB- und Dispatcher-Threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._executor
+
+    async def start(self):
+        """Startet alle Worker sofort (statt beim ersten Download)."""
+        loop = asyncio.get_running_loop()
+        ex = self._get_executor()
+        await asyncio.gather(*[loop.run_in_executor(ex, _ping) for _ in range(self.workers)])
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._sem
+
+    async def _render(self, payload: Dict[str, Any], path: Optional[Path] = None) -> Union[bytes, Path]:
+        loop = asyncio.get_running_loop()
+        t_queued = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._semaphore().acquire()
+        finally:
+            self._waiting -= 1
+        self._stats["queue_wait_seconds_total"] += time.perf_counter() - t_queued
+        self._running += 1
+        try:
+            fut = loop.run_in_executor(self._get_executor(), _render, payload, path)
+        except BaseException:
+            self._release_slot()
+            raise
+        # Slot erst freigeben, wenn der Worker wirklich fertig ist - auch
+        # nach einem Timeout rechnet er weiter und darf nicht schon den
+        # nächsten Job annehmen (der sonst in der Executor-Queue auf seinen
+        # eigenen Timeout wartet)
+        fut.add_done_callback(self._job_done)
+        try:
+            # shield: wait_for soll bei Timeout nur den Aufrufer freigeben
+            result, size, seconds = await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+        except asyncio.TimeoutError:
+            self._stats["render_timeouts"] += 1
+            raise PdfRenderTimeout(f"PDF-Rendering > {self.timeout:.0f}s")
+        except Exception:
+            self._stats["render_errors"] += 1
+            raise
+        self._stats["renders"] += 1
+        self._stats["render_seconds_total"] += seconds
+        self._stats["bytes_total"] += size
+        self._render_times.append(seconds)
+        PDF_RENDER_SECONDS.labels(PDF_RENDER_MODE).observe(seconds)
+        PDF_SIZE_BYTES.labels(PDF_RENDER_MODE).observe(size)
+        return result
+
+    def _release_slot(self):
+        self._running -= 1
+        self._semaphore().release()
+
+    def _job_done(self, fut: asyncio.Future):
+        self._release_slot()
+        if not fut.cancelled():
+            fut.exception()     # abgerufen, auch wenn der Aufrufer schon weg ist
+
+    def _schedule(self, key: str, payload: Dict[str, Any]) -> asyncio.Future:
+        async def job():
+            try:
+                path = self.cache.path_for(key) if PDF_STREAM_FROM_DISK else None
+                result = await self._render(payload, path)
+                if path is None:
+                    await asyncio.to_thread(self.cache.put, key, result)
+                else:
+                    await asyncio.to_thread(self.cache.file_added, key)
+                return result
+            finally:
+                self._inflight.pop(key, None)
+
+        fut = asyncio.ensure_future(job())
+        self._inflight[key] = fut
+        return fut
+
+    def prerender(self, key: str, payload: Dict[str, Any]) -> bool:
+        """Stellt das Rendering in die Warteschlange. False bei Backpressure."""
+        if key in self._inflight:
+            return True
+        if len(self._inflight) >= self.max_queue:
+            self._stats["prerender_rejected"] += 1
+            return False
+        self._stats["prerender_queued"] += 1
+        self._schedule(key, payload).add_done_callback(_log_failure)
+        return True
+
+    async def fetch(self, key: str, payload: Dict[str, Any]) -> Union[bytes, Path]:
+        """PDF als Bytes (RAM-Cache) oder als Pfad der Cache-Datei (zum Streamen)."""
+        # Festplatte und geteiltes Backend: nicht im Event-Loop
+        found = await asyncio.to_thread(
+            self.cache.lookup if PDF_STREAM_FROM_DISK else self.cache.get, key)
+        if found is not None:
+            return found
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self._stats["joined_inflight"] += 1
+        else:
+            fut = self._schedule(key, payload)
+        # shield: bricht der Client ab, läuft der Job für den Cache weiter
+        return await asyncio.shield(fut)
+
+    async def get(self, key: str, payload: Dict[str, Any]) -> bytes:
+        result = await self.fetch(key, payload)
+        if isinstance(result, Path):
+            return await asyncio.to_thread(result.read_bytes)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        times = sorted(self._render_times)
+
+        def pct(p):
+            return round(times[min(len(times) - 1, int(len(times) * p))], 4) if times else 0.0
+
+        return {
+            **self._stats,
+            "queue_depth": self._waiting,
+            "running": self._running,
+            "inflight": len(self._inflight),
+            "render_seconds_p50": pct(0.50),
+            "render_seconds_p95": pct(0.95),
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pdf_renderer = PdfRenderer()
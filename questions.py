@@ -0,0 +1,67 @@
+# questions.py
+# ============================================================
+# Fragen-Registry: questions.json wird einmal geladen und nur
+# neu eingelesen, wenn sich mtime/Größe der Datei ändern.
+# Enthält den vorberechneten Index Frage -> Funktion und die
+# Anzahl Fragen pro Funktion.
+# ============================================================
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, NamedTuple
+
+BASE_DIR = Path(__file__).resolve().parent
+QUESTIONS_PATH = BASE_DIR / "data" / "questions.json"
+
+
+class QuestionSet(NamedTuple):
+    questions: List[Dict[str, Any]]
+    q_to_fid: Dict[str, str]        # Frage-ID -> function_id
+    fid_counts: Dict[str, int]      # function_id -> Anzahl Fragen
+    version: str                    # Hash über (id, function_id) in Dateireihenfolge
+
+
+def _build(questions: List[Dict[str, Any]]) -> QuestionSet:
+    q_to_fid = {}
+    fid_counts: Dict[str, int] = {}
+    for q in questions:
+        qid = q["id"]
+        fid = q.get("function_id")
+        if not fid:
+            raise ValueError(f"Frage {qid} hat keine function_id in questions.json.")
+        q_to_fid[qid] = fid
+        fid_counts[fid] = fid_counts.get(fid, 0) + 1
+    order = json.dumps([[q["id"], q["function_id"]] for q in questions], separators=(",", ":"))
+    version = hashlib.sha256(order.encode("utf-8")).hexdigest()[:12]
+    return QuestionSet(questions, q_to_fid, fid_counts, version)
+
+
+class QuestionRegistry:
+    def __init__(self, path: Path = QUESTIONS_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._current: QuestionSet = None
+        self.reloads = 0
+
+    def get(self) -> QuestionSet:
+        st = os.stat(self.path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    with self.path.open("r", encoding="utf-8") as f:
+                        self._current = _build(json.load(f))
+                    self._stamp = stamp
+                    self.reloads += 1
+        return self._current
+
+
+registry = QuestionRegistry()
+
+
+def get_question_set() -> QuestionSet:
+    return registry.get()
@@ -0,0 +1,177 @@
+# report_batch.py
+# ============================================================
+# Batch-Scoring mit NumPy: N Antwort-Sets auf einmal auswerten
+# (z.B. Neuberechnung gespeicherter Reports nach Gewichtsänderungen).
+# Liefert dieselben Werte wie build_report_data / decide_profile_type
+# in report_builder.py - bit-identisch für Antworten auf der
+# Slider-Skala (ganze Zahlen 0-10, so wie /submit sie bekommt).
+# ============================================================
+
+from dataclasses import dataclass
+from typing import Dict, Any, List, Iterable, Tuple
+
+import numpy as np
+
+from report_content import FUNCTION_NAMES
+from report_builder import ReportResult, TYPE_WEIGHTS
+from questions import get_question_set, QuestionSet
+
+# Spaltenreihenfolge der Funktionen = Reihenfolge in FUNCTION_NAMES
+# (so iteriert auch build_report_data, wichtig für stabiles Ranking)
+FIDS: List[str] = list(FUNCTION_NAMES.keys())
+TYPES: List[str] = list(TYPE_WEIGHTS.keys())
+
+
+# ============================================================
+# MATRIZEN
+# ============================================================
+def incidence_matrix(qs: QuestionSet = None) -> Tuple[List[str], np.ndarray]:
+    """Fragen x Funktionen (0/1), Zeilen in questions.json-Reihenfolge."""
+    qs = qs or get_question_set()
+    qids = [q["id"] for q in qs.questions]
+    col = {fid: j for j, fid in enumerate(FIDS)}
+    m = np.zeros((len(qids), len(FIDS)), dtype=np.float64)
+    for i, qid in enumerate(qids):
+        j = col.get(qs.q_to_fid[qid])
+        if j is not None:
+            m[i, j] = 1.0
+    return qids, m
+
+
+def type_weight_matrix() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Typen x Funktionen: Gewichte und Invertierungs-Maske aus TYPE_WEIGHTS.
+    Score_t = sum_f W[t,f] * (100 - p_f if INV[t,f] else p_f)
+    """
+    w = np.zeros((len(TYPES), len(FIDS)), dtype=np.float64)
+    inv = np.zeros((len(TYPES), len(FIDS)), dtype=bool)
+    col = {fid: j for j, fid in enumerate(FIDS)}
+    for t, ptype in enumerate(TYPES):
+        for fid, weight, inverted in TYPE_WEIGHTS[ptype]:
+            w[t, col[fid]] = weight
+            inv[t, col[fid]] = inverted
+    return w, inv
+
+
+def answers_to_matrix(answers_list: Iterable[Dict[str, Any]],
+                      qids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Antwort-Dicts -> (Werte N x Q, beantwortet N x Q).
+    Gleiche Regeln wie build_report_data: unbekannte Fragen werden
+    ignoriert, nicht-numerische Werte zählen als 0.0 (aber als beantwortet).
+    """
+    answers_list = list(answers_list)
+    pos = {qid: i for i, qid in enumerate(qids)}
+    values = np.zeros((len(answers_list), len(qids)), dtype=np.float64)
+    answered = np.zeros((len(answers_list), len(qids)), dtype=bool)
+    for n, answers in enumerate(answers_list):
+        row_v = values[n]
+        row_a = answered[n]
+        for qid, val in answers.items():
+            i = pos.get(qid)
+            if i is None:
+                continue
+            try:
+                row_v[i] = float(val)
+            except (TypeError, ValueError):
+                row_v[i] = 0.0
+            row_a[i] = True
+    return values, answered
+
+
+# ============================================================
+# ERGEBNIS
+# ============================================================
+@dataclass
+class BatchReportResult:
+    sums: np.ndarray          # N x F float64
+    avgs: np.ndarray          # N x F float64 (auf 2 Stellen gerundet)
+    percents: np.ndarray      # N x F int64
+    ranked: np.ndarray        # N x F Spaltenindizes, absteigend nach Prozent
+    profile_type: np.ndarray  # N Typ-Buchstaben
+
+    def __len__(self):
+        return len(self.profile_type)
+
+    def result(self, i: int) -> ReportResult:
+        """Zeile i als ReportResult (dieselben Python-Typen wie der Skalar-Pfad)."""
+        percents = {fid: int(self.percents[i, j]) for j, fid in enumerate(FIDS)}
+        ranked = [(FIDS[j], percents[FIDS[j]]) for j in self.ranked[i]]
+        return ReportResult(
+            profile_type=str(self.profile_type[i]),
+            ranked=ranked,
+            percents=percents,
+            sums={fid: float(self.sums[i, j]) for j, fid in enumerate(FIDS)},
+            avgs={fid: float(self.avgs[i, j]) for j, fid in enumerate(FIDS)},
+            top_categories=[FUNCTION_NAMES[fid] for fid, _ in ranked[:3]],
+        )
+
+
+def _round2(avgs: np.ndarray) -> np.ndarray:
+    # np.round(x, 2) rechnet über x*100 und weicht dadurch in Einzelfällen
+    # von Pythons korrekt gerundetem round(x, 2) ab. Die Zahl der
+    # verschiedenen Durchschnitte ist klein -> Python-round auf den
+    # eindeutigen Werten, dann zurückverteilen.
+    uniq, inverse = np.unique(avgs, return_inverse=True)
+    rounded = np.array([round(float(x), 2) for x in uniq], dtype=np.float64)
+    return rounded[inverse].reshape(avgs.shape)
+
+
+def score_matrix(values: np.ndarray, answered: np.ndarray,
+                 qs: QuestionSet = None) -> BatchReportResult:
+    _, inc = incidence_matrix(qs)
+    w, inv = type_weight_matrix()
+
+    sums = (values * answered) @ inc
+    counts = answered.astype(np.float64) @ inc
+    counts[counts == 0] = 1.0
+    avg = sums / counts
+    percents = np.rint((avg / 10.0) * 100).astype(np.int64)
+    ranked = np.argsort(-percents, axis=1, kind="stable")
+
+    # Typ-Scores Term für Term in der Reihenfolge von TYPE_WEIGHTS,
+    # damit die Gleitkomma-Rundung exakt der von decide_profile_type entspricht
+    p = percents.astype(np.float64)
+    col = {fid: j for j, fid in enumerate(FIDS)}
+    scores = np.empty((len(p), len(TYPES)), dtype=np.float64)
+    for t, ptype in enumerate(TYPES):
+        score = None
+        for fid, _, _ in TYPE_WEIGHTS[ptype]:
+            j = col[fid]
+            v = p[:, j]
+            term = w[t, j] * (100 - v) if inv[t, j] else w[t, j] * v
+            score = term if score is None else score + term
+        scores[:, t] = score
+    profile_type = np.array(TYPES)[np.argmax(scores, axis=1)]
+
+    return BatchReportResult(
+        sums=sums,
+        avgs=_round2(avg),
+        percents=percents,
+        ranked=ranked,
+        profile_type=profile_type,
+    )
+
+
+def score_matrix_chunked(values: np.ndarray, answered: np.ndarray,
+                         chunk_rows: int = 65536, qs: QuestionSet = None) -> BatchReportResult:
+    """Wie score_matrix, aber blockweise (begrenzt Zwischenspeicher bei Millionen Zeilen)."""
+    parts = [score_matrix(values[i:i + chunk_rows], answered[i:i + chunk_rows], qs)
+             for i in range(0, len(values), chunk_rows)]
+    if len(parts) == 1:
+        return parts[0]
+    return BatchReportResult(
+        sums=np.concatenate([r.sums for r in parts]),
+        avgs=np.concatenate([r.avgs for r in parts]),
+        percents=np.concatenate([r.percents for r in parts]),
+        ranked=np.concatenate([r.ranked for r in parts]),
+        profile_type=np.concatenate([r.profile_type for r in parts]),
+    )
+
+
+def build_report_data_batch(answers_list: Iterable[Dict[str, Any]]) -> BatchReportResult:
+    """Batch-Gegenstück zu build_report_data für eine Liste von Antwort-Dicts."""
+    qs = get_question_set()
+    qids = [q["id"] for q in qs.questions]
+    values, answered = answers_to_matrix(answers_list, qids)
+    return score_matrix(values, answered, qs)
@@ -5,13 +5,9 @@
 # ============================================================
 
 from dataclasses import dataclass
-from pathlib import Path
-import json
 
 from report_content import FUNCTION_NAMES, FUNCTION_ORDER
-
-BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR / "data"
+from questions import get_question_set
 
 
 @dataclass
@@ -24,10 +20,26 @@ class ReportResult:
     top_categories: list  # Top-3 Klartext-Namen
 
 
-def _load_questions():
-    path = DATA_DIR / "questions.json"
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+# Gewichte je Typ: (function_id, Gewicht, invertiert)
+# invertiert = der Wert geht als (100 - Prozent) ein.
+# Die Terme werden in dieser Reihenfolge aufsummiert (wichtig für
+# bit-identische Ergebnisse in report_batch.py).
+TYPE_WEIGHTS = {
+    # A Stabilitätsmodus: STR + MOR stark, wenig AKT
+    "A": [("STR", 0.40, False), ("MOR", 0.40, False), ("AKT", 0.20, True)],
+
+    # B Druckmodus: DST + AKT stark, wenig STR
+    "B": [("DST", 0.40, False), ("AKT", 0.30, False), ("STR", 0.30, True)],
+
+    # C Gestaltungsmodus: IND + INF stark, mittlere STR
+    "C": [("IND", 0.40, False), ("INF", 0.35, False), ("STR", 0.25, True)],
+
+    # D Vergleichsmodus: COM + AUF + STA stark
+    "D": [("COM", 0.35, False), ("AUF", 0.35, False), ("STA", 0.30, False)],
+
+    # E Kontrollmodus: MAC + STR + INF stark
+    "E": [("MAC", 0.40, False), ("STR", 0.30, False), ("INF", 0.30, False)],
+}
 
 
 def decide_profile_type(p: dict) -> str:
@@ -36,36 +48,20 @@ def decide_profile_type(p: dict) -> str:
     Berechnet für jeden der 5 Typen einen Score.
     Der höchste Score gewinnt.
     """
-    scores = {
-        # A Stabilitätsmodus: STR + MOR stark, wenig AKT
-        "A": 0.40 * p.get("STR", 0) + 0.40 * p.get("MOR", 0) + 0.20 * (100 - p.get("AKT", 0)),
-
-        # B Druckmodus: DST + AKT stark, wenig STR
-        "B": 0.40 * p.get("DST", 0) + 0.30 * p.get("AKT", 0) + 0.30 * (100 - p.get("STR", 0)),
-
-        # C Gestaltungsmodus: IND + INF stark, mittlere STR
-        "C": 0.40 * p.get("IND", 0) + 0.35 * p.get("INF", 0) + 0.25 * (100 - p.get("STR", 0)),
-
-        # D Vergleichsmodus: COM + AUF + STA stark
-        "D": 0.35 * p.get("COM", 0) + 0.35 * p.get("AUF", 0) + 0.30 * p.get("STA", 0),
-
-        # E Kontrollmodus: MAC + STR + INF stark
-        "E": 0.40 * p.get("MAC", 0) + 0.30 * p.get("STR", 0) + 0.30 * p.get("INF", 0),
-    }
+    scores = {}
+    for ptype, terms in TYPE_WEIGHTS.items():
+        score = None
+        for fid, w, inverted in terms:
+            v = p.get(fid, 0)
+            term = w * (100 - v) if inverted else w * v
+            score = term if score is None else score + term
+        scores[ptype] = score
 
     return max(scores, key=scores.get)
 
 
 def build_report_data(answers: dict) -> ReportResult:
-    questions = _load_questions()
-
-    q_to_fid = {}
-    for q in questions:
-        qid = q["id"]
-        fid = q.get("function_id")
-        if not fid:
-            raise ValueError(f"Frage {qid} hat keine function_id in questions.json.")
-        q_to_fid[qid] = fid
+    q_to_fid = get_question_set().q_to_fid
 
     sums = {fid: 0.0 for fid in FUNCTION_NAMES.keys()}
     counts = {fid: 0 for fid in FUNCTION_NAMES.keys()}
@@ -0,0 +1,177 @@
+# report_cache.py
+# ============================================================
+# Read-Through-Cache für db.load_report (decodierte Payloads)
+# - LRU mit maximaler Anzahl Einträge und TTL
+# - Negativ-Cache für unbekannte IDs (kurze TTL, z.B. /health "ping")
+# - save_report / update_report_payloads invalidieren (db.py)
+# - optional zweite Stufe in einem geteilten Backend (cache_backend.py,
+#   CACHE_BACKEND=sqlite/redis), Payloads dort als JSON. Dann gilt für
+#   die erste Stufe im Prozess nur REPORT_CACHE_LOCAL_TTL, damit
+#   Invalidierungen anderer Worker schnell ankommen.
+# Ohne geteiltes Backend gilt der Cache pro Prozess: Änderungen aus
+# anderen Prozessen (rescore.py, weitere uvicorn-Worker) sieht er erst
+# nach Ablauf der TTL.
+# Async-Varianten (get_async, put_async, invalidate_async) fragen die
+# geteilte Stufe im Thread; die erste Stufe bleibt synchron.
+# Gecachte Payloads werden geteilt -> nicht verändern.
+# REPORT_CACHE_SIZE=0 schaltet den Cache ab.
+# ============================================================
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from cache_backend import CacheBackend, shared_backend
+
+# ============================================================
+# KONFIGURATION (ENV)
+# ============================================================
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "2000"))
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "300"))
+REPORT_CACHE_NEGATIVE_TTL = float(os.getenv("REPORT_CACHE_NEGATIVE_TTL", "5"))
+REPORT_CACHE_LOCAL_TTL = float(os.getenv("REPORT_CACHE_LOCAL_TTL", "5"))
+
+# Marker für "gibt es nicht" (None heißt "nicht im Cache")
+MISSING = object()
+
+
+class ReportCache:
+    def __init__(self, max_entries: int = REPORT_CACHE_SIZE, ttl: float = REPORT_CACHE_TTL,
+                 negative_ttl: float = REPORT_CACHE_NEGATIVE_TTL,
+                 backend: Optional[CacheBackend] = None,
+                 local_ttl: float = REPORT_CACHE_LOCAL_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.backend = backend
+        self.local_ttl = local_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()  # id -> (Ablauf, Payload|MISSING)
+        self._lock = threading.Lock()
+        # Zähler für Invalidierungen: ein Ladevorgang, der vor einer
+        # Invalidierung begonnen hat, darf sein Ergebnis nicht mehr ablegen
+        self._generation = 0
+        self._stats = {"hits": 0, "negative_hits": 0, "shared_hits": 0, "misses": 0,
+                       "evictions": 0, "expired": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, report_id: str):
+        """-> Payload, MISSING (bekannt unbekannt) oder None (nicht im Cache)."""
+        if not self.enabled:
+            return None
+        value, generation = self._get_local(report_id)
+        if value is not None:
+            return value
+        return self._get_shared(report_id, generation)
+
+    async def get_async(self, report_id: str):
+        """Wie get; die geteilte Stufe (SQLite/Redis) wird im Thread gefragt."""
+        if not self.enabled:
+            return None
+        value, generation = self._get_local(report_id)
+        if value is not None or self.backend is None:
+            return value if value is not None else self._get_shared(report_id, generation)
+        return await asyncio.to_thread(self._get_shared, report_id, generation)
+
+    def _get_local(self, report_id: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(report_id)
+            if entry is not None and entry[0] <= now:
+                del self._entries[report_id]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                value = entry[1]
+                self._entries.move_to_end(report_id)
+                self._stats["negative_hits" if value is MISSING else "hits"] += 1
+                return value, self._generation
+            return None, self._generation
+
+    def _get_shared(self, report_id: str, generation: int):
+        if self.backend is not None:
+            data = self.backend.get("report:" + report_id)
+            if data is not None:
+                payload = json.loads(data)
+                with self._lock:
+                    self._stats["shared_hits"] += 1
+                self._put_local(report_id, payload, generation)
+                return MISSING if payload is None else payload
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, report_id: str, payload: Optional[Dict[str, Any]], generation: int):
+        """Ergebnis von load_report ablegen (None -> Negativ-Eintrag)."""
+        if not self.enabled:
+            return
+        ttl = self.ttl if payload is not None else self.negative_ttl
+        if ttl <= 0 or generation != self._generation:
+            return
+        if self.backend is not None:
+            self.backend.set("report:" + report_id,
+                             json.dumps(payload, ensure_ascii=False).encode("utf-8"), ttl)
+        self._put_local(report_id, payload, generation)
+
+    async def put_async(self, report_id: str, payload: Optional[Dict[str, Any]], generation: int):
+        if self.backend is None:
+            self.put(report_id, payload, generation)
+        else:
+            await asyncio.to_thread(self.put, report_id, payload, generation)
+
+    def _put_local(self, report_id: str, payload: Optional[Dict[str, Any]], generation: int):
+        ttl = self.ttl if payload is not None else self.negative_ttl
+        if self.backend is not None:
+            ttl = min(ttl, self.local_ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[report_id] = (time.monotonic() + ttl, MISSING if payload is None else payload)
+            self._entries.move_to_end(report_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *report_ids: str):
+        self._invalidate_local(report_ids)
+        if self.backend is not None and report_ids:
+            self.backend.delete(*("report:" + rid for rid in report_ids))
+
+    async def invalidate_async(self, *report_ids: str):
+        self._invalidate_local(report_ids)
+        if self.backend is not None and report_ids:
+            await asyncio.to_thread(self.backend.delete, *("report:" + rid for rid in report_ids))
+
+    def _invalidate_local(self, report_ids):
+        with self._lock:
+            self._generation += 1
+            for rid in report_ids:
+                self._entries.pop(rid, None)
+            self._stats["invalidations"] += len(report_ids)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["hits"] + self._stats["negative_hits"] + self._stats["shared_hits"]
+            lookups = hits + self._stats["misses"]
+            return {**self._stats, "entries": len(self._entries), "max_entries": self.max_entries,
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                    "backend": self.backend.name if self.backend is not None else "memory"}
+
+
+report_cache = ReportCache(backend=shared_backend())
@@ -0,0 +1,236 @@
+# rescore.py
+# ============================================================
+# Neuberechnung gespeicherter Reports
+# Nach Änderungen an TYPE_WEIGHTS oder questions.json werden
+# profile_type, ranked, percents, sums und avgs aus den gespeicherten
+# Rohantworten neu berechnet.
+#
+# - liest per Keyset-Pagination (report_id) in Batches
+# - bewertet jeden Batch mit report_batch (NumPy); kompakt gespeicherte
+#   Antworten (answers_raw) gehen ohne Umweg über Dicts in die Matrix
+# - schreibt geänderte Payloads gebündelt in einer Transaktion
+# - Checkpoint pro Shard -> nach Abbruch einfach erneut starten;
+#   ändern sich TYPE_WEIGHTS oder die Fragen, beginnt der Shard neu
+# - --workers N teilt den report_id-Raum auf N Prozesse auf
+#
+#   python rescore.py --workers 4 --batch-size 2000
+#   python rescore.py --reset          # Checkpoints verwerfen
+#   python rescore.py --dry-run        # nur zählen, nichts schreiben
+# ============================================================
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_CHECKPOINT_DIR = BASE_DIR / "outputs" / "rescore"
+
+DERIVED_FIELDS = ("profile_type", "ranked", "percents", "sums", "avgs")
+
+
+def shard_bounds(workers: int) -> List[Tuple[str, Optional[str]]]:
+    """
+    Teilt den report_id-Raum (uuid4, Hex-Kleinbuchstaben) anhand der
+    ersten zwei Zeichen in `workers` zusammenhängende Bereiche [lower, upper).
+    """
+    cuts = [f"{(i * 256) // workers:02x}" for i in range(1, workers)]
+    lowers = [""] + cuts
+    uppers = cuts + [None]
+    return list(zip(lowers, uppers))
+
+
+# ============================================================
+# CHECKPOINTS
+# ============================================================
+def _checkpoint_path(checkpoint_dir: Path, shard: int, workers: int) -> Path:
+    return checkpoint_dir / f"shard-{shard}-of-{workers}.json"
+
+
+def scoring_fingerprint() -> str:
+    """Hash über das, was die Bewertung bestimmt (TYPE_WEIGHTS, Fragenversion)."""
+    from questions import get_question_set
+    from report_builder import TYPE_WEIGHTS
+
+    h = hashlib.sha256()
+    h.update(json.dumps(TYPE_WEIGHTS, sort_keys=True).encode("utf-8"))
+    h.update(get_question_set().version.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _read_checkpoint(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"after": "", "scanned": 0, "changed": 0, "done": False}
+
+
+def _write_checkpoint(path: Path, state: Dict[str, Any]):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ============================================================
+# SHARD-WORKER
+# ============================================================
+def _answers_matrix(rows, versions: Dict[str, List[str]]):
+    """
+    Rohantworten der Zeilen -> (Werte, beantwortet) in aktueller Fragenreihenfolge.
+    Blobs der aktuellen Version werden direkt gestapelt (ohne Dicts),
+    ältere Versionen und JSON-Fallbacks über answers_to_matrix.
+    """
+    import numpy as np
+    from answers_codec import stack_answers, decode_to_dict
+    from questions import get_question_set
+    from report_batch import answers_to_matrix
+
+    qs = get_question_set()
+    qids = [q["id"] for q in qs.questions]
+    values = np.zeros((len(rows), len(qids)), dtype=np.float64)
+    answered = np.zeros((len(rows), len(qids)), dtype=bool)
+
+    fast, slow, slow_dicts = [], [], []
+    for i, (_, _, answers_json, raw, version) in enumerate(rows):
+        if raw is not None and version == qs.version:
+            fast.append(i)
+        elif raw is not None:
+            old_qids = versions.get(version)
+            if old_qids is None:
+                raise RuntimeError(f"Unbekannte Fragen-Version {version!r} (question_versions)")
+            slow.append(i)
+            slow_dicts.append(decode_to_dict(raw, old_qids))
+        else:
+            slow.append(i)
+            slow_dicts.append(json.loads(answers_json))
+
+    if fast:
+        v, a = stack_answers([bytes(rows[i][3]) for i in fast])
+        values[fast], answered[fast] = v, a
+    if slow:
+        v, a = answers_to_matrix(slow_dicts, qids)
+        values[slow], answered[slow] = v, a
+    return values, answered, qs
+
+
+def _rescore_rows(rows, versions: Optional[Dict[str, List[str]]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    from report_batch import score_matrix
+
+    payloads = [json.loads(r[1]) for r in rows]
+    values, answered, qs = _answers_matrix(rows, versions or {})
+    result = score_matrix(values, answered, qs)
+    changed = []
+    for i, report_id in enumerate(r[0] for r in rows):
+        new = result.result(i)
+        old = payloads[i]
+        updated = dict(old)
+        updated.update({
+            "profile_type": new.profile_type,
+            "ranked": [list(x) for x in new.ranked],
+            "percents": new.percents,
+            "sums": new.sums,
+            "avgs": new.avgs,
+        })
+        # Vergleich nach JSON-Rundreise (Tupel -> Listen)
+        if any(old.get(k) != updated[k] for k in DERIVED_FIELDS):
+            changed.append((report_id, updated))
+    return changed
+
+
+def run_shard(shard: int, workers: int, batch_size: int, checkpoint_dir: str,
+              dry_run: bool = False) -> Dict[str, Any]:
+    import db
+
+    lower, upper = shard_bounds(workers)[shard]
+    cp_path = _checkpoint_path(Path(checkpoint_dir), shard, workers)
+    state = _read_checkpoint(cp_path)
+    fingerprint = scoring_fingerprint()
+    if state.get("fingerprint") != fingerprint:
+        # Checkpoint stammt von anderen Gewichten/Fragen -> von vorn
+        if cp_path.exists():
+            print(f"[shard {shard}/{workers}] Bewertung geändert, Checkpoint verworfen", flush=True)
+        state = {"after": "", "scanned": 0, "changed": 0, "done": False,
+                 "fingerprint": fingerprint}
+    if state.get("done"):
+        return {"shard": shard, **state, "scanned_this_run": 0, "skipped": True}
+
+    t0 = time.perf_counter()
+    scanned = 0
+    versions = db.load_question_versions()
+    while True:
+        rows = db.fetch_reports_for_rescore(state["after"], batch_size, lower, upper)
+        if not rows:
+            break
+        changed = _rescore_rows(rows, versions)
+        if not dry_run:
+            db.update_report_payloads(changed)
+        scanned += len(rows)
+        state["after"] = rows[-1][0]
+        state["scanned"] += len(rows)
+        state["changed"] += len(changed)
+        if not dry_run:
+            _write_checkpoint(cp_path, state)
+        rate = scanned / max(time.perf_counter() - t0, 1e-9)
+        print(f"[shard {shard}/{workers}] {state['scanned']} gelesen, "
+              f"{state['changed']} geändert, {rate:,.0f} Zeilen/s", flush=True)
+
+    state["done"] = True
+    if not dry_run:
+        _write_checkpoint(cp_path, state)
+    return {"shard": shard, **state, "scanned_this_run": scanned,
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main():
+    ap = argparse.ArgumentParser(description="Reports aus Rohantworten neu berechnen")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--batch-size", type=int, default=1000)
+    ap.add_argument("--checkpoint-dir", default=str(DEFAULT_CHECKPOINT_DIR))
+    ap.add_argument("--reset", action="store_true", help="Checkpoints löschen und neu beginnen")
+    ap.add_argument("--dry-run", action="store_true", help="nichts schreiben")
+    args = ap.parse_args()
+
+    cp_dir = Path(args.checkpoint_dir)
+    cp_dir.mkdir(parents=True, exist_ok=True)
+    if args.reset:
+        for f in cp_dir.glob("shard-*.json"):
+            f.unlink()
+
+    workers = max(1, min(args.workers, 256))
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = [run_shard(0, 1, args.batch_size, str(cp_dir), args.dry_run)]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=ctx) as ex:
+            futures = [ex.submit(run_shard, i, workers, args.batch_size, str(cp_dir), args.dry_run)
+                       for i in range(workers)]
+            results = [f.result() for f in futures]
+
+    seconds = time.perf_counter() - t0
+    scanned = sum(r["scanned"] for r in results)
+    changed = sum(r["changed"] for r in results)
+    this_run = sum(r["scanned_this_run"] for r in results)
+    if all(r.get("skipped") for r in results):
+        print("[rescore] Warnung: alle Shards laut Checkpoint schon fertig, nichts gelesen "
+              f"({cp_dir}); für einen neuen Lauf --reset", flush=True)
+    print(json.dumps({
+        "scanned": scanned,
+        "changed": changed,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(this_run / seconds) if seconds > 0 else None,
+        "dry_run": args.dry_run,
+        "shards": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# static_assets.py
+# ============================================================
+# Vorab erzeugte Antworten, die für alle Besucher gleich sind
+# - StaticAsset: Bytes + ETag, dazu vorkomprimierte Varianten
+#   (compression.py: gzip, brotli falls installiert), Auswahl nach
+#   Accept-Encoding
+# - versionierte Assets: Version = Hash über den Inhalt -> steht im
+#   URL-Pfad, daher darf der Browser ein Jahr lang cachen (immutable)
+# - PrerenderedPage: eine Jinja-Seite einmal gerendert, neu erzeugt
+#   erst, wenn sich eine ihrer Quelldateien ändert
+#
+# content.{version}.js: FUNCTION_NAMES, TYPE_MAP, MEANING_CARDS für
+# results.html (statt pro Request per tojson eingebettet)
+# ============================================================
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from fastapi.responses import Response
+
+from compression import choose_encoding, compress_variants
+from pdf_cache import etag_matches
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# gleiche URL, Inhalt kann sich ändern -> immer mit ETag nachfragen
+REVALIDATE = "public, no-cache"
+
+# Quelldateien höchstens so oft auf Änderungen prüfen
+STATIC_CHECK_S = float(os.getenv("STATIC_CHECK_S", "2"))
+
+
+class StaticAsset:
+    def __init__(self, name: str, ext: str, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.version = hashlib.sha256(body).hexdigest()[:12]
+        self.etag = f'"{self.version}"'
+        self.filename = f"{name}.{self.version}.{ext}"
+        self.variants = compress_variants(body)
+
+    def response(self, request_headers: Mapping[str, str],
+                 cache_control: str = IMMUTABLE) -> Response:
+        enc = choose_encoding(request_headers.get("accept-encoding"), self.variants)
+        # eigener ETag pro Kodierung (starke ETags gelten für genau diese Bytes)
+        etag = f'"{self.version}-{enc}"' if enc else self.etag
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if enc:
+            headers["Content-Encoding"] = enc
+            return Response(self.variants[enc], media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
+
+
+def json_for_script(value: Any) -> str:
+    """JSON, das gefahrlos in <script> steht (wie Jinjas tojson)."""
+    text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return (text.replace("<", "\\u003c").replace(">", "\\u003e")
+                .replace("&", "\\u0026").replace("'", "\\u0027"))
+
+
+def content_script(content: Dict[str, Any]) -> StaticAsset:
+    body = f"window.__PP_CONTENT__={json_for_script(content)};\n".encode("utf-8")
+    return StaticAsset("content", "js", body, "application/javascript; charset=utf-8")
+
+
+# ============================================================
+# VORGERENDERTE SEITE
+# ============================================================
+class PrerenderedPage:
+    """
+    render() -> HTML; wird beim Start einmal aufgerufen und wieder,
+    sobald sich mtime/Größe einer Datei aus sources ändert. Der Neubau
+    läuft in einem Thread, bis dahin wird die alte Fassung ausgeliefert.
+    """
+    def __init__(self, name: str, render: Callable[[], str], sources: List[Path]):
+        self.name = name
+        self._render = render
+        self.sources = [Path(p) for p in sources]
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple] = None
+        self._asset: Optional[StaticAsset] = None
+        self._checked_at = 0.0
+        self._rebuilding = False
+        self.renders = 0
+
+    def _sources_stamp(self) -> Tuple:
+        stamp = []
+        for p in self.sources:
+            st = os.stat(p)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def _build(self, stamp: Tuple):
+        html = self._render()
+        asset = StaticAsset(self.name, "html", html.encode("utf-8"), "text/html; charset=utf-8")
+        with self._lock:
+            self._asset = asset
+            self._stamp = stamp
+            self.renders += 1
+
+    def _rebuild(self, stamp: Tuple):
+        try:
+            self._build(stamp)
+        except Exception as e:
+            # alte Fassung bleibt, nächster Versuch nach STATIC_CHECK_S
+            print(f"[static] {self.name}: Neubau fehlgeschlagen: {type(e).__name__}: {e}")
+        finally:
+            self._rebuilding = False
+
+    def asset(self) -> StaticAsset:
+        now = time.monotonic()
+        if self._asset is not None and now - self._checked_at < STATIC_CHECK_S:
+            return self._asset
+        stamp = self._sources_stamp()
+        self._checked_at = now
+        if stamp == self._stamp:
+            return self._asset
+        if self._asset is None:
+            # erster Aufruf (Start): es gibt noch nichts Altes zum Ausliefern
+            self._build(stamp)
+            return self._asset
+        with self._lock:
+            start, self._rebuilding = not self._rebuilding, True
+        if start:
+            threading.Thread(target=self._rebuild, args=(stamp,),
+                             name=f"prerender-{self.name}", daemon=True).start()
+        return self._asset
+
+    def response(self, request_headers: Mapping[str, str]) -> Response:
+        return self.asset().response(request_headers, cache_control=REVALIDATE)